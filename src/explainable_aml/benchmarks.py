@@ -0,0 +1,239 @@
+import io
+import gc
+import json
+import time
+import shutil
+import platform
+import tempfile
+import contextlib
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Union
+from explainable_aml.config import CONFIG
+
+# Suites in the order they run; each adds metrics to the results
+SUITES = ('data_generation', 'training', 'explain_transaction', 'batch', 'nlp', 'log_event')
+
+DEFAULT_BATCH_SIZES = (1, 16, 256, 4096)
+DEFAULT_TRAIN_ROWS = (5000, 20000)
+
+
+def _metric(value: float, unit: str, better: str) -> Dict[str, Any]:
+    return {'value': float(value), 'unit': unit, 'better': better}
+
+
+@contextlib.contextmanager
+def _benchmark_config(work_dir: Path) -> Iterator[None]:
+    """
+    Point logs and models at work_dir and measure uncached, fully explained calls.
+
+    The process-wide audit sink is set aside for the duration, so benchmark events land in
+    work_dir even when the process has already logged elsewhere.
+    """
+    from explainable_aml.utils.logging import flush_audit_log, set_audit_sink
+    overrides = {
+        'log_path': work_dir / 'logs' / 'aml_events.log',
+        'audit_store_path': work_dir / 'logs' / 'audit',
+        'explanation_cache': {**CONFIG.get('explanation_cache', {}), 'enabled': False},
+        'explanation_policy': {'mode': 'always'},
+    }
+    saved = {key: CONFIG.get(key) for key in overrides}
+    flush_audit_log()
+    saved_sink = set_audit_sink(None)
+    CONFIG.update(overrides)
+    try:
+        yield
+    finally:
+        CONFIG.update(saved)
+        benchmark_sink = set_audit_sink(saved_sink)
+        if benchmark_sink is not None:
+            benchmark_sink.close()
+
+
+def _best_seconds(func: Callable[[], Any], repeats: int) -> float:
+    """Minimum wall time over repeats, the least noisy estimate of the cost."""
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def run_benchmarks(n_customers: int = 5000, batch_sizes: Sequence[int] = DEFAULT_BATCH_SIZES,
+                   train_rows: Sequence[int] = DEFAULT_TRAIN_ROWS, repeats: int = 5, n_single: int = 200,
+                   suites: Optional[Sequence[str]] = None, work_dir: Optional[Union[str, Path]] = None) -> Dict[str, Any]:
+    """
+    Run the benchmark suites offline on seeded synthetic data.
+
+    Args:
+        n_customers: Customers in the synthetic dataset (about 5.5 transactions each)
+        batch_sizes: Batch sizes for the batch throughput suite
+        train_rows: Training set sizes for the training suite
+        repeats: Repetitions per throughput measurement; the best is reported
+        n_single: Single-transaction calls for the warm latency and log_event suites
+        suites: Subset of SUITES to run, defaults to all
+        work_dir: Scratch directory for data, models and logs, a temporary one by default
+
+    Returns:
+        dict: 'meta' (versions, parameters, timestamp) and 'metrics', each metric a dict
+            with value, unit and better ('lower' or 'higher')
+    """
+    from explainable_aml.data.generate_data import generate_synthetic_data
+    from explainable_aml.model.train_model import train_risk_model
+    from explainable_aml.explainability.engine import get_engine, clear_engines, batch_to_explanations
+    from explainable_aml.explainability.explain import explain_transaction
+    from explainable_aml.nlp.generate_explanation import generate_nlp_explanation, generate_nlp_explanations
+    from explainable_aml.utils.logging import log_event, flush_audit_log, format_audit_line
+
+    suites = list(SUITES if suites is None else suites)
+    unknown = [s for s in suites if s not in SUITES]
+    if unknown:
+        raise ValueError(f"Unknown benchmark suites {unknown}. Expected some of {SUITES}")
+
+    own_work_dir = work_dir is None
+    work_dir = Path(tempfile.mkdtemp(prefix='aml-bench-') if own_work_dir else work_dir)
+    work_dir.mkdir(parents=True, exist_ok=True)
+    metrics: Dict[str, Dict[str, Any]] = {}
+
+    try:
+        with _benchmark_config(work_dir), contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            df = generate_synthetic_data(n_customers=n_customers, seed=42)
+            if 'data_generation' in suites:
+                metrics['generate_synthetic_data.rows_per_sec'] = _metric(
+                    len(df) / (time.perf_counter() - start), 'rows/s', 'higher')
+
+            data_path = work_dir / 'transactions.csv'
+            model_path = work_dir / 'model_bundle'
+            df.to_csv(data_path, index=False)
+
+            if 'training' in suites:
+                for n_rows in train_rows:
+                    n_rows = min(n_rows, len(df))
+                    train_path = work_dir / f'train_{n_rows}.csv'
+                    df.head(n_rows).to_csv(train_path, index=False)
+                    start = time.perf_counter()
+                    train_risk_model(str(train_path), str(work_dir / 'train_model'))
+                    metrics[f'train_risk_model.seconds.rows_{n_rows}'] = _metric(time.perf_counter() - start, 's', 'lower')
+            train_risk_model(str(data_path), str(model_path))
+
+            features = ['transaction_amount', 'amount_deviation', 'transaction_frequency', 'country_risk', 'customer_age']
+            X = df[features].to_numpy(dtype=np.float64)
+            rows = df[features].head(n_single).to_dict(orient='records')
+
+            if 'explain_transaction' in suites:
+                clear_engines()
+                gc.collect()
+                start = time.perf_counter()
+                explain_transaction(rows[0], model_path=str(model_path), data_path=str(data_path))
+                metrics['explain_transaction.cold_ms'] = _metric((time.perf_counter() - start) * 1000, 'ms', 'lower')
+
+                latencies = []
+                for row in rows:
+                    start = time.perf_counter()
+                    explain_transaction(row, model_path=str(model_path), data_path=str(data_path))
+                    latencies.append(time.perf_counter() - start)
+                latency_ms = np.array(latencies) * 1000
+                metrics['explain_transaction.warm_p50_ms'] = _metric(np.percentile(latency_ms, 50), 'ms', 'lower')
+                metrics['explain_transaction.warm_p95_ms'] = _metric(np.percentile(latency_ms, 95), 'ms', 'lower')
+
+            engine = get_engine(str(model_path), str(data_path))
+            if 'batch' in suites:
+                for batch_size in batch_sizes:
+                    batch = np.resize(X, (batch_size, X.shape[1]))
+                    for method in ('score_batch', 'explain_batch'):
+                        seconds = _best_seconds(lambda: getattr(engine, method)(batch), repeats)
+                        metrics[f'{method}.rows_per_sec.bs_{batch_size}'] = _metric(batch_size / seconds, 'rows/s', 'higher')
+
+            if 'nlp' in suites:
+                explanations = batch_to_explanations(engine.explain_batch(X[:n_single]))
+                seconds = _best_seconds(
+                    lambda: [generate_nlp_explanation(e, r) for e, r in zip(explanations, rows)], repeats)
+                metrics['generate_nlp_explanation.ops_per_sec'] = _metric(len(explanations) / seconds, 'ops/s', 'higher')
+                explained = engine.explain_batch(X)
+                seconds = _best_seconds(lambda: generate_nlp_explanations(explained, X), repeats)
+                metrics['generate_nlp_explanations.rows_per_sec'] = _metric(len(X) / seconds, 'rows/s', 'higher')
+
+            if 'log_event' in suites:
+                flush_audit_log()
+                payloads = [{'features': r, **e} for r, e in zip(rows, batch_to_explanations(engine.score_batch(X[:n_single])))]
+                start = time.perf_counter()
+                for payload in payloads:
+                    log_event('benchmark_event', payload)
+                metrics['log_event.us_per_call'] = _metric(
+                    (time.perf_counter() - start) / len(payloads) * 1e6, 'us', 'lower')
+                flush_audit_log()
+
+                # Work moved onto the audit writer thread, per event
+                timestamp = datetime.now()
+                seconds = _best_seconds(
+                    lambda: [format_audit_line(timestamp, 'benchmark_event', p) for p in payloads], repeats)
+                metrics['audit_serialize.us_per_event'] = _metric(seconds / len(payloads) * 1e6, 'us', 'lower')
+    finally:
+        clear_engines()
+        if own_work_dir:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    return {
+        'meta': {
+            'timestamp': datetime.now().isoformat(),
+            'python': platform.python_version(),
+            'xgboost': xgb.__version__,
+            'numpy': np.__version__,
+            'pandas': pd.__version__,
+            'n_customers': n_customers,
+            'n_rows': len(df),
+            'repeats': repeats,
+            'suites': suites,
+        },
+        'metrics': metrics,
+    }
+
+
+def compare_results(baseline: Dict[str, Any], current: Dict[str, Any], threshold_pct: float = 10.0) -> List[Dict[str, Any]]:
+    """
+    Find metrics that got worse than the baseline by more than threshold_pct.
+
+    Metrics missing from either result are ignored.
+
+    Args:
+        baseline: Earlier run_benchmarks result
+        current: New run_benchmarks result
+        threshold_pct: Allowed slowdown in percent
+
+    Returns:
+        list: One dict per regression with metric, baseline, current and change_pct (positive is worse)
+    """
+    regressions = []
+    for name, metric in current['metrics'].items():
+        base = baseline['metrics'].get(name)
+        if base is None or base['value'] == 0:
+            continue
+        change = (metric['value'] - base['value']) / base['value'] * 100
+        worse = change if metric['better'] == 'lower' else -change
+        if worse > threshold_pct:
+            regressions.append({
+                'metric': name,
+                'baseline': base['value'],
+                'current': metric['value'],
+                'change_pct': worse,
+            })
+    return regressions
+
+
+def write_results(results: Dict[str, Any], path: Union[str, Path]) -> None:
+    """Write benchmark results as indented JSON with sorted metric names, so runs diff cleanly."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+        f.write('\n')
+
+
+def read_results(path: Union[str, Path]) -> Dict[str, Any]:
+    with open(path, 'r') as f:
+        return json.load(f)
@@ -0,0 +1,297 @@
+import argparse
+import json
+import sys
+from typing import List, Optional
+
+
+def _score(args: argparse.Namespace) -> None:
+    from explainable_aml.explainability.batch_score import score_file
+
+    def progress(stats: dict) -> None:
+        print(f"Scored chunk {stats['chunks']}: {stats['rows']} rows, {stats['rows_per_sec']:.0f} rows/sec")
+
+    stats = score_file(
+        args.input,
+        args.output,
+        model_path=args.model_path,
+        data_path=args.data_path,
+        chunk_size=args.chunk_size,
+        n_workers=args.workers,
+        top_k=args.top_k,
+        include_nlp=args.nlp,
+        resume=args.resume,
+        explain_all=args.explain_all,
+        progress=progress,
+    )
+    print(f"Scored {stats['rows']} rows in {stats['seconds']:.1f}s ({stats['rows_per_sec']:.0f} rows/sec), "
+          f"skipped {stats['skipped_chunks']} completed chunks. Output written to {args.output}")
+
+
+def _calibrate(args: argparse.Namespace) -> None:
+    from explainable_aml.model.calibrate import calibrate_threshold
+
+    result = calibrate_threshold(
+        model_path=args.model_path,
+        data_path=args.data_path,
+        output_path=args.output,
+        alert_budget=args.alert_budget,
+        min_recall=args.min_recall,
+        write=not args.dry_run,
+    )
+    previous, recommended = result['previous'], result['recommended']
+    print(f"Scored {result['rows']} held-out rows ({result['positives']} positive) in {result['seconds']:.1f}s")
+    for name, point in (('Current', previous), ('Recommended', recommended)):
+        print(f"{name} threshold {point['threshold']:.4f}: alert rate {point['alert_rate']:.2%}, "
+              f"precision {point['precision']:.3f}, recall {point['recall']:.3f}")
+    if not args.dry_run:
+        print(f"Threshold written to {result['model_path']}")
+
+
+def _report(args: argparse.Namespace) -> None:
+    from explainable_aml.explainability.global_report import build_global_report, default_report_path
+
+    output = args.output if args.output is not None else default_report_path(args.model_path)
+    report = build_global_report(
+        args.input,
+        output,
+        model_path=args.model_path,
+        data_path=args.data_path,
+        chunk_size=args.chunk_size,
+        n_workers=args.workers,
+    )
+    ranking = ', '.join(f"{f['feature']} {f['mean_abs_shap']:.4f}" for f in report['features'])
+    print(f"Summarized {report['rows']} rows in {report['seconds']:.1f}s. Mean |SHAP|: {ranking}. Report written to {output}")
+
+
+def _generate_data(args: argparse.Namespace) -> None:
+    from explainable_aml.data.generate_data import write_synthetic_data
+
+    metadata = write_synthetic_data(
+        args.output,
+        n_customers=args.customers,
+        max_tx_per_customer=args.max_tx_per_customer,
+        version=args.version,
+        seed=args.seed,
+    )
+    print(f"Generated {metadata['n_rows']} transactions and saved to {args.output}")
+
+
+def _serve(args: argparse.Namespace) -> None:
+    import asyncio
+    from explainable_aml.serving.server import serve
+
+    try:
+        asyncio.run(serve(args.host, args.port, model_path=args.model_path, data_path=args.data_path,
+                          n_workers=args.workers))
+    except KeyboardInterrupt:
+        pass
+
+
+def _tune(args: argparse.Namespace) -> None:
+    from explainable_aml.model.tune import tune_risk_model
+
+    summary = tune_risk_model(
+        data_path=args.data_path,
+        model_path=args.model_path,
+        output_path=args.output,
+        n_trials=args.trials,
+        n_workers=args.workers,
+    )
+    print(f"Best {summary['metric']} {summary['best_score']:.4f} with {summary['best_params']} "
+          f"({len(summary['leaderboard'])} evaluations). Model saved to {summary['model_path']}")
+
+
+def _retrain(args: argparse.Namespace) -> None:
+    from explainable_aml.model.feedback import retrain_from_feedback
+
+    result = retrain_from_feedback(
+        model_path=args.model_path,
+        output_path=args.output,
+        rounds=args.rounds,
+        validation_path=args.validation_path,
+    )
+    if result['status'] == 'skipped':
+        print(f"Skipped: {result['n_cases']} new feedback cases")
+        return
+    print(f"{result['status'].capitalize()} update on {result['n_train']} feedback cases. "
+          f"Hold-out baseline {result['baseline']}, candidate {result['candidate']}")
+    if result['status'] == 'rejected':
+        sys.exit(1)
+
+
+def _registry(args: argparse.Namespace) -> None:
+    from explainable_aml.model.registry import ModelRegistry, get_model_registry
+
+    registry = ModelRegistry(args.registry) if args.registry else get_model_registry()
+    if registry is None:
+        sys.exit("No registry given: pass --registry or set model_registry.path")
+
+    if args.registry_command == 'publish':
+        version = registry.publish(args.bundle, activate=args.activate)
+        print(f"Published {args.bundle} as {version}{' (active)' if args.activate else ''}")
+    elif args.registry_command == 'activate':
+        registry.activate(args.version)
+        print(f"Activated {args.version}")
+    else:
+        active = registry.active_version()
+        for version in registry.versions():
+            print(f"{'*' if version == active else ' '} {version}")
+
+
+def _audit_query(args: argparse.Namespace) -> None:
+    from explainable_aml.config import CONFIG
+    from explainable_aml.utils.audit_store import query_events
+    from explainable_aml.utils.logging import json_default
+
+    alert_flag = None if args.alert_flag is None else args.alert_flag == 'true'
+    events = query_events(
+        args.store or CONFIG['audit_store_path'],
+        start=args.start,
+        end=args.end,
+        event_type=args.event_type,
+        alert_flag=alert_flag,
+        risk_band=args.risk_band,
+        pattern_id=args.pattern_id,
+        limit=args.limit,
+    )
+    for event in events:
+        sys.stdout.write(json.dumps(event, default=json_default) + '\n')
+
+
+def _bench(args: argparse.Namespace) -> None:
+    from explainable_aml.benchmarks import run_benchmarks, compare_results, write_results, read_results
+
+    results = run_benchmarks(
+        n_customers=args.customers,
+        batch_sizes=args.batch_sizes,
+        train_rows=args.train_rows,
+        repeats=args.repeats,
+        suites=args.suites,
+    )
+    write_results(results, args.output)
+    for name, metric in sorted(results['metrics'].items()):
+        print(f"{name:<45} {metric['value']:>14.2f} {metric['unit']}")
+    print(f"Results written to {args.output}")
+
+    if args.compare:
+        regressions = compare_results(read_results(args.compare), results, args.threshold)
+        for r in regressions:
+            print(f"REGRESSION {r['metric']}: {r['baseline']:.2f} -> {r['current']:.2f} ({r['change_pct']:.1f}% worse)")
+        if regressions:
+            sys.exit(1)
+        print(f"No metric regressed by more than {args.threshold}% against {args.compare}")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog='explainable-aml', description='Explainable AML command line tools')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    score = subparsers.add_parser('score', help='Score a CSV/Parquet file of transactions in parallel chunks')
+    score.add_argument('input', help='Input CSV or Parquet file')
+    score.add_argument('output', help='Output CSV or Parquet file')
+    score.add_argument('--model-path', help='Model bundle, defaults to the configured model_path')
+    score.add_argument('--data-path', help='Background data for legacy bundles without a stored background')
+    score.add_argument('--chunk-size', type=int, help='Rows per chunk (default: batch_scoring.chunk_size)')
+    score.add_argument('--workers', type=int, help='Worker processes (default: batch_scoring.n_workers)')
+    score.add_argument('--top-k', type=int, default=5, help='Top contributing features per row')
+    score.add_argument('--nlp', action='store_true', help='Also write the plain-English explanation per row')
+    score.add_argument('--explain-all', action='store_true',
+                       help='Explain every row instead of only those selected by explanation_policy')
+    score.add_argument('--resume', action='store_true', help='Resume from the chunks completed by a previous run')
+    score.set_defaults(func=_score)
+
+    calibrate = subparsers.add_parser('calibrate', help='Recommend an alert threshold from held-out scores and write it into the bundle')
+    calibrate.add_argument('--model-path', help='Bundle to calibrate, defaults to the active registry version or model_path')
+    calibrate.add_argument('--data-path', help='Labelled file to score (default: calibration.validation_path, '
+                                               'else the training eval split)')
+    calibrate.add_argument('--output', help='Where to write the calibrated bundle (default: replace --model-path)')
+    calibrate.add_argument('--alert-budget', type=float, help='Largest fraction of transactions to alert, e.g. 0.02')
+    calibrate.add_argument('--min-recall', type=float, help='Smallest acceptable recall, e.g. 0.9')
+    calibrate.add_argument('--dry-run', action='store_true', help='Report the recommendation without writing it')
+    calibrate.set_defaults(func=_calibrate)
+
+    report = subparsers.add_parser('report', help='Summarize SHAP contributions over a whole dataset for model governance')
+    report.add_argument('input', help='Input CSV or Parquet file')
+    report.add_argument('--output', help='JSON report (default: global_report.output_path, or next to the bundle)')
+    report.add_argument('--model-path', help='Model bundle, defaults to the configured model_path')
+    report.add_argument('--data-path', help='Background data for legacy bundles without a stored background')
+    report.add_argument('--chunk-size', type=int, help='Rows per chunk (default: global_report.chunk_size)')
+    report.add_argument('--workers', type=int, help='Worker processes (default: global_report.n_workers)')
+    report.set_defaults(func=_report)
+
+    generate = subparsers.add_parser('generate-data', help='Write a synthetic transaction dataset (CSV or Parquet)')
+    generate.add_argument('output', help='Output CSV or Parquet file')
+    generate.add_argument('--customers', type=int, default=5000, help='Number of customers')
+    generate.add_argument('--max-tx-per-customer', type=int, default=10, help='Maximum transactions per customer')
+    generate.add_argument('--version', default='1.0', help='Data version recorded in the file metadata')
+    generate.add_argument('--seed', type=int, default=42, help='Random seed')
+    generate.set_defaults(func=_generate_data)
+
+    serve = subparsers.add_parser('serve', help='Run the micro-batching HTTP scoring service')
+    serve.add_argument('--host', help='Interface to bind (default: serving.host)')
+    serve.add_argument('--port', type=int, help='Port to bind (default: serving.port)')
+    serve.add_argument('--model-path', help='Model bundle, defaults to the configured model_path')
+    serve.add_argument('--data-path', help='Background data for legacy bundles without a stored background')
+    serve.add_argument('--workers', type=int, help='Forked scoring workers sharing the model (default: serving.workers)')
+    serve.set_defaults(func=_serve)
+
+    bench = subparsers.add_parser('bench', help='Run the offline benchmark suite on synthetic data')
+    bench.add_argument('--output', default='benchmark_results.json', help='JSON file for the results')
+    bench.add_argument('--customers', type=int, default=5000, help='Customers in the synthetic dataset')
+    bench.add_argument('--batch-sizes', type=int, nargs='+', default=[1, 16, 256, 4096])
+    bench.add_argument('--train-rows', type=int, nargs='+', default=[5000, 20000])
+    bench.add_argument('--repeats', type=int, default=5, help='Repetitions per throughput measurement')
+    bench.add_argument('--suites', nargs='+', help='Subset of suites to run (default: all)')
+    bench.add_argument('--compare', help='Baseline results JSON; exit 1 if any metric regressed')
+    bench.add_argument('--threshold', type=float, default=10.0, help='Allowed regression in percent')
+    bench.set_defaults(func=_bench)
+
+    tune = subparsers.add_parser('tune', help='Search XGBoost hyperparameters and save the best model bundle')
+    tune.add_argument('--data-path', help='Training data, defaults to the configured data_path')
+    tune.add_argument('--model-path', help='Where to save the best bundle, defaults to the configured model_path')
+    tune.add_argument('--output', help='JSON file for the leaderboard (default: tuning_results.json next to the bundle)')
+    tune.add_argument('--trials', type=int, help='Configurations in the first rung (default: tuning.n_trials)')
+    tune.add_argument('--workers', type=int, help='Worker processes (default: tuning.n_workers)')
+    tune.set_defaults(func=_tune)
+
+    retrain = subparsers.add_parser('retrain', help='Warm-start the model on new analyst feedback, gated on a hold-out')
+    retrain.add_argument('--model-path', help='Current bundle, defaults to the configured model_path')
+    retrain.add_argument('--output', help='Where to write the new bundle version (default: replace --model-path)')
+    retrain.add_argument('--rounds', type=int, help='Boosting rounds to add (default: feedback.rounds)')
+    retrain.add_argument('--validation-path', help='Labelled CSV added to the hold-out (default: feedback.validation_path)')
+    retrain.set_defaults(func=_retrain)
+
+    registry = subparsers.add_parser('registry', help='Publish and activate versioned model bundles')
+    registry.add_argument('--registry', help='Registry directory (default: model_registry.path)')
+    registry_commands = registry.add_subparsers(dest='registry_command', required=True)
+    publish = registry_commands.add_parser('publish', help='Copy a bundle directory in as the next version')
+    publish.add_argument('bundle', help='Bundle directory')
+    publish.add_argument('--activate', action='store_true', help='Serve it right away')
+    activate = registry_commands.add_parser('activate', help='Point scoring processes at a version (also rolls back)')
+    activate.add_argument('version', help="e.g. 'v0003'")
+    registry_commands.add_parser('list', help='List versions; the active one is starred')
+    registry.set_defaults(func=_registry)
+
+    audit = subparsers.add_parser('audit', help='Query the segmented audit store')
+    audit_commands = audit.add_subparsers(dest='audit_command', required=True)
+    query = audit_commands.add_parser('query', help='Print matching audit events as JSON lines')
+    query.add_argument('--store', help='Audit store directory (default: audit_store_path)')
+    query.add_argument('--start', help='Inclusive ISO timestamp lower bound, e.g. 2024-05-14T00:00:00')
+    query.add_argument('--end', help='Inclusive ISO timestamp upper bound; a date alone covers that whole day')
+    query.add_argument('--event-type', help="e.g. 'decision_logged'")
+    query.add_argument('--alert-flag', choices=['true', 'false'])
+    query.add_argument('--risk-band', choices=['Low', 'Borderline', 'High'])
+    query.add_argument('--pattern-id')
+    query.add_argument('--limit', type=int)
+    query.set_defaults(func=_audit_query)
+
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = build_parser().parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
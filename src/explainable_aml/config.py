@@ -14,7 +14,7 @@ def load_config():
             config = yaml.safe_load(f)
             
         # Resolve paths
-        for key in ['data_path', 'model_path', 'log_path']:
+        for key in ['data_path', 'model_path', 'log_path', 'audit_store_path']:
             if key in config:
                 p = Path(config[key])
                 if not p.is_absolute():
@@ -25,14 +25,23 @@ def load_config():
         # Ensure log_path exists
         if 'log_path' not in config:
              config['log_path'] = PROJECT_ROOT / 'src' / 'explainable_aml' / 'logs' / 'aml_events.log'
+        if 'audit_store_path' not in config:
+             config['audit_store_path'] = Path(config['log_path']).parent / 'audit'
              
         return config
     else:
         return {
             # File paths
             'data_path': PROJECT_ROOT / 'src' / 'explainable_aml' / 'data' / 'transactions.csv',
-            'model_path': PROJECT_ROOT / 'src' / 'explainable_aml' / 'model' / 'risk_model_bundle.pkl',
+            'model_path': PROJECT_ROOT / 'src' / 'explainable_aml' / 'model' / 'risk_model_bundle',
             'log_path': PROJECT_ROOT / 'src' / 'explainable_aml' / 'logs' / 'aml_events.log',
+            'audit_store_path': PROJECT_ROOT / 'src' / 'explainable_aml' / 'logs' / 'audit',
+
+            # Versioned bundles with an ACTIVE pointer; when set, served instead of model_path
+            'model_registry': {
+                'path': None,
+                'poll_interval_seconds': 2
+            },
 
             # Model hyperparameters
             'model_params': {
@@ -42,14 +51,141 @@ def load_config():
                 'random_state': 42
             },
 
+            # Training ('in_memory' or chunked out-of-core 'streaming')
+            'training': {
+                'mode': 'in_memory',
+                'chunk_size': 100000,
+                'n_jobs': -1,
+                'tree_method': 'hist',
+                'max_bin': 256,
+                'eval_fraction': 0.2
+            },
+            'tuning': {
+                'n_trials': 27,
+                'n_workers': 4,
+                'min_rounds': 25,
+                'max_rounds': 400,
+                'reduction_factor': 3,
+                'early_stopping_rounds': 20,
+                'metric': 'aucpr'
+            },
+
+            # Warm-start retraining from analyst feedback (explainable-aml retrain)
+            'feedback': {
+                'store_path': 'src/explainable_aml/data/feedback_cases.csv',
+                'min_cases': 20,
+                'rounds': 10,
+                'learning_rate': 0.05,
+                'holdout_fraction': 0.25,
+                'validation_path': None,
+                'tolerance': 0.01
+            },
+
             # Decision threshold
             'threshold': 0.35,
 
             # SHAP parameters
             'shap_background_samples': 100,
+            'explanation_backend': 'shap',
+
+            # Which scored transactions get SHAP up front ('always' or 'tiered')
+            'explanation_policy': {
+                'mode': 'tiered',
+                'explain_alerted': True,
+                'explain_risk_bands': ['Borderline', 'High'],
+                'explain_ood': False
+            },
+
+            # LRU/TTL cache of SHAP contributions per model version and feature vector
+            'explanation_cache': {
+                'enabled': True,
+                'max_entries': 10000,
+                'ttl_seconds': 3600,
+                'max_batch_rows': 256,
+                'disk_path': None
+            },
+
+            # Batch scoring (explainable-aml score)
+            'batch_scoring': {
+                'chunk_size': 50000,
+                'n_workers': 4
+            },
+
+            # Live feature/score drift against the bundle's training reference (model/drift.py)
+            'drift': {
+                'enabled': True,
+                'bins': 10,
+                'reference_samples': 100000,
+                'window_seconds': 300,
+                'n_windows': 12,
+                'min_rows': 500,
+                'psi_threshold': 0.2,
+                'ks_threshold': 0.1,
+                'check_interval_seconds': 60
+            },
+
+            # Dataset-wide SHAP summaries (explainability/global_report.py)
+            'global_report': {
+                'chunk_size': 50000,
+                'n_workers': 4,
+                'shap_buckets_per_doubling': 4,
+                'shap_min_abs': 1e-4,
+                'dependence_bins': 20,
+                'output_path': None
+            },
+
+            # Stage latency histograms and counters (utils/metrics.py)
+            'metrics': {
+                'enabled': True,
+                'dump_path': None
+            },
+
+            # HTTP scoring service (explainable-aml serve)
+            'serving': {
+                'host': '127.0.0.1',
+                'port': 8000,
+                'max_batch_size': 64,
+                'max_wait_ms': 5,
+                'workers': 0
+            },
+
+            # Threshold recommendation from held-out scores (model/calibrate.py)
+            'calibration': {
+                'validation_path': None,
+                'alert_budget': None,
+                'min_recall': None,
+                'cost_false_positive': 1.0,
+                'cost_false_negative': 20.0,
+                'chunk_size': 100000,
+                'curve_points': 101
+            },
+
+            # Forked scoring workers sharing one model copy (explainability/worker_pool.py)
+            'worker_pool': {
+                'n_workers': None,
+                'max_tasks_per_worker': None
+            },
+
+            # Streaming per-customer feature state (features/streaming.py)
+            'feature_engine': {
+                'max_customers': 1000000,
+                'idle_days': 30
+            },
 
             # Logging configuration
-            'logging_level': 'INFO'
+            'logging_level': 'INFO',
+
+            # Audit log writer (queue-backed, batched)
+            'audit_log': {
+                'async': True,
+                'queue_size': 10000,
+                'batch_size': 256,
+                'flush_interval_seconds': 0.5,
+                'overflow': 'block',
+                'store': 'file',
+                'max_segment_mb': 64,
+                'max_segment_seconds': 3600
+            }
         }
 
 CONFIG = load_config()
\ No newline at end of file
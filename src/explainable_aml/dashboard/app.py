@@ -1,39 +1,30 @@
+import os
 import streamlit as st
 import pandas as pd
+from explainable_aml.explainability.engine import ScoringEngine, EngineManager, get_engine_manager
 from explainable_aml.explainability.explain import explain_transaction
+from explainable_aml.explainability.global_report import default_report_path, load_global_report
 from explainable_aml.nlp.generate_explanation import generate_nlp_explanation
 from explainable_aml.utils.logging import log_decision, log_event
+from explainable_aml.dashboard.case_queue import ScoringJob, read_uploaded_cases, filter_cases, page_cases, case_features
 
 # Health check logic
 if "health" in st.query_params:
     st.write("OK")
     st.stop()
 
-st.title("Explainable AML System")
-
-st.sidebar.header("Transaction Details")
 
-transaction_amount = st.sidebar.number_input("Transaction Amount", min_value=0.0, value=1000.0)
-amount_deviation = st.sidebar.number_input("Amount Deviation", min_value=0.0, value=100.0)
-transaction_frequency = st.sidebar.number_input("Transaction Frequency", min_value=1, value=1)
-country_risk = st.sidebar.slider("Country Risk", 0.0, 1.0, 0.1)
-customer_age = st.sidebar.number_input("Customer Age", min_value=18, value=30)
+@st.cache_resource
+def load_engine_manager() -> EngineManager:
+    """Shared by every session and rerun; new model versions are swapped in on a background thread."""
+    return get_engine_manager()
 
-if st.sidebar.button("Analyze Transaction"):
-    features = {
-        'transaction_amount': transaction_amount,
-        'amount_deviation': amount_deviation,
-        'transaction_frequency': transaction_frequency,
-        'country_risk': country_risk,
-        'customer_age': customer_age
-    }
 
-    explanation = explain_transaction(features)
-    nlp_text = generate_nlp_explanation(explanation, features)
+def load_engine() -> ScoringEngine:
+    return load_engine_manager().current()
 
-    # Log the decision
-    log_decision(features, explanation['risk_score'], explanation['alert_flag'], explanation, nlp_text)
 
+def render_explanation(explanation, nlp_text):
     st.subheader("Risk Assessment")
     st.write(f"Risk Score: {explanation['risk_score']:.4f}")
     st.write(f"Risk Band: {explanation.get('risk_band', 'Unknown')}")
@@ -47,7 +38,40 @@ if st.sidebar.button("Analyze Transaction"):
     st.bar_chart(contrib_df.set_index('feature')['contribution'])
 
     st.subheader("Explanation")
-    st.write(nlp_text)
+    st.write(nlp_text['text'])
+
+
+def render_single_transaction():
+    st.sidebar.header("Transaction Details")
+
+    transaction_amount = st.sidebar.number_input("Transaction Amount", min_value=0.0, value=1000.0)
+    amount_deviation = st.sidebar.number_input("Amount Deviation", min_value=0.0, value=100.0)
+    transaction_frequency = st.sidebar.number_input("Transaction Frequency", min_value=1, value=1)
+    country_risk = st.sidebar.slider("Country Risk", 0.0, 1.0, 0.1)
+    customer_age = st.sidebar.number_input("Customer Age", min_value=18, value=30)
+
+    if st.sidebar.button("Analyze Transaction"):
+        features = {
+            'transaction_amount': transaction_amount,
+            'amount_deviation': amount_deviation,
+            'transaction_frequency': transaction_frequency,
+            'country_risk': country_risk,
+            'customer_age': customer_age
+        }
+
+        explanation = explain_transaction(features)
+        nlp_text = generate_nlp_explanation(explanation, features)
+
+        # Log the decision
+        log_decision(features, explanation['risk_score'], explanation['alert_flag'], explanation, nlp_text)
+
+        # Kept across reruns, so the feedback button below still sees the assessment
+        st.session_state.assessment = (features, explanation, nlp_text)
+
+    if 'assessment' not in st.session_state:
+        return
+    features, explanation, nlp_text = st.session_state.assessment
+    render_explanation(explanation, nlp_text)
 
     st.subheader("Analyst Feedback")
     feedback = st.radio("Is this assessment valid?", ("Valid", "Invalid"))
@@ -59,4 +83,117 @@ if st.sidebar.button("Analyze Transaction"):
             'alert_flag': explanation['alert_flag'],
             'feedback': feedback
         })
-        st.write("Feedback submitted.")
\ No newline at end of file
+        st.write("Feedback submitted.")
+
+
+@st.fragment(run_every=1)
+def render_scoring_progress():
+    # Reruns on its own every second; the scoring itself runs on the job's thread
+    job = st.session_state.case_job
+    st.progress(job.progress, text=f"Scored {job.scored_rows:,} of {job.total_rows:,} transactions")
+    if job.done:
+        st.rerun()
+
+
+def render_case_queue():
+    uploaded = st.file_uploader("Upload a case queue (CSV or Parquet)", type=['csv', 'parquet'])
+    if uploaded is not None and st.session_state.get('case_file') != (uploaded.name, uploaded.size):
+        st.session_state.case_file = (uploaded.name, uploaded.size)
+        previous = st.session_state.pop('case_job', None)
+        if previous is not None:
+            previous.cancel()  # Stop scoring the replaced file instead of leaving its thread running
+        try:
+            cases = read_uploaded_cases(uploaded, uploaded.name)
+            st.session_state.case_job = ScoringJob(cases, load_engine()).start()
+        except (ValueError, ImportError) as e:
+            st.session_state.pop('case_job', None)
+            st.error(f"Could not load {uploaded.name}: {e}")
+
+    job = st.session_state.get('case_job')
+    if job is None:
+        st.info("Upload a file of transactions to score them as a case queue.")
+        return
+    if not job.done:
+        render_scoring_progress()
+        return
+    if job.error is not None:
+        st.error(f"Scoring failed: {job.error}")
+        return
+
+    cases = job.result
+    st.write(f"{len(cases):,} cases, {int(cases['alert_flag'].sum()):,} alerted")
+
+    filter_cols = st.columns(4)
+    risk_bands = filter_cols[0].multiselect("Risk band", ["High", "Borderline", "Low"])
+    alert_only = filter_cols[1].checkbox("Alerts only")
+    ood_only = filter_cols[2].checkbox("Out-of-distribution only")
+    search = filter_cols[3].text_input("Search ID")
+    filtered = filter_cases(cases, risk_bands=risk_bands, alert_only=alert_only, ood_only=ood_only, search=search)
+
+    sort_cols = st.columns(4)
+    sortable = ['risk_score'] + [f for f in load_engine().features if f in cases.columns]
+    sort_by = sort_cols[0].selectbox("Sort by", sortable)
+    ascending = sort_cols[1].checkbox("Ascending")
+    page_size = sort_cols[2].selectbox("Rows per page", [25, 50, 100], index=1)
+    page = sort_cols[3].number_input("Page", min_value=1, value=1, step=1)
+    page_df, n_pages = page_cases(filtered, sort_by=sort_by, ascending=ascending, page=int(page), page_size=page_size)
+    st.caption(f"Page {min(int(page), n_pages)} of {n_pages} ({len(filtered):,} matching cases)")
+
+    # Only the visible page is sent to the browser
+    selection = st.dataframe(page_df, on_select="rerun", selection_mode="single-row")
+    if selection.selection.rows:
+        index = page_df.index[selection.selection.rows[0]]
+        engine = load_engine()
+        # Every widget interaction reruns the script; explain (and audit-log) a selected case only once
+        key = (st.session_state.case_file, index, engine.model_version)
+        if st.session_state.get('case_detail', (None,))[0] != key:
+            features = case_features(cases, index, engine.features)
+            explanation = explain_transaction(features)
+            st.session_state.case_detail = (key, explanation, generate_nlp_explanation(explanation, features))
+        _, explanation, nlp = st.session_state.case_detail
+        render_explanation(explanation, nlp)
+
+
+@st.cache_data
+def read_global_report(path: str, mtime_ns: int) -> dict:
+    # mtime_ns is only part of the cache key, so a rebuilt report is picked up
+    return load_global_report(path)
+
+
+def render_model_report():
+    path = default_report_path()
+    if not path.exists():
+        st.info(f"No global report at {path}. Build one with `explainable-aml report <transactions>`.")
+        return
+    report = read_global_report(str(path), os.stat(path).st_mtime_ns)
+    st.caption(f"{report['rows']:,} transactions from {report['input_path']}, model {report['model_version']}, "
+               f"generated {report['generated_at']}")
+
+    features = pd.DataFrame(report['features']).set_index('feature')
+    st.subheader("Global Feature Importance (mean |SHAP|)")
+    st.bar_chart(features['mean_abs_shap'])
+
+    feature = st.selectbox("Feature", list(features.index))
+    summary = next(f for f in report['features'] if f['feature'] == feature)
+
+    st.subheader("Contributions by Risk Band")
+    bands = pd.DataFrame([
+        {'risk_band': band, 'count': b['count'], 'mean_shap': b['mean_shap'], **(b['quantiles'] or {})}
+        for band, b in summary['bands'].items()
+    ]).set_index('risk_band')
+    st.dataframe(bands)
+
+    st.subheader("Dependence")
+    dependence = pd.DataFrame({'value': summary['dependence']['mean_value'], 'mean_shap': summary['dependence']['mean_shap']})
+    st.line_chart(dependence.dropna().set_index('value'))
+
+
+st.title("Explainable AML System")
+
+mode = st.sidebar.radio("Mode", ("Single transaction", "Case queue", "Model report"))
+if mode == "Single transaction":
+    render_single_transaction()
+elif mode == "Case queue":
+    render_case_queue()
+else:
+    render_model_report()
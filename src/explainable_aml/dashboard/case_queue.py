@@ -0,0 +1,165 @@
+import io
+import math
+import threading
+import numpy as np
+import pandas as pd
+from typing import Any, BinaryIO, Dict, List, Optional, Tuple
+from explainable_aml.utils.io import detect_format
+from explainable_aml.explainability.engine import ScoringEngine
+
+# Columns added to an uploaded queue by scoring
+CASE_COLUMNS = ['risk_score', 'alert_flag', 'risk_band', 'ood_flag', 'ood_features']
+
+
+def read_uploaded_cases(file: BinaryIO, name: str) -> pd.DataFrame:
+    """
+    Read an uploaded CSV or Parquet case file.
+
+    Args:
+        file: File-like object with the uploaded bytes
+        name: Original file name, used to pick the format
+
+    Returns:
+        pd.DataFrame: The uploaded transactions
+    """
+    if detect_format(name) == 'parquet':
+        return pd.read_parquet(io.BytesIO(file.read()))
+    return pd.read_csv(file)
+
+
+class ScoringJob:
+    """
+    Scores a case queue chunk by chunk on a background thread.
+
+    Only the cheap scoring tier runs here; explanations are computed when a case is opened.
+    An uploaded queue is historical and skewed towards alerts, so it is not counted into the
+    live drift monitor. `progress` and `done` can be polled from the UI while the job runs.
+    """
+
+    def __init__(self, cases: pd.DataFrame, engine: ScoringEngine, chunk_size: int = 5000):
+        """
+        Args:
+            cases: Transactions with the bundle's feature columns
+            engine: Warm scoring engine
+            chunk_size: Rows scored per step, i.e. the progress granularity
+        """
+        missing = [f for f in engine.features if f not in cases.columns]
+        if missing:
+            raise ValueError(f"Missing required features: {missing}")
+
+        self.cases = cases.reset_index(drop=True)
+        self.engine = engine
+        self.chunk_size = chunk_size
+        self.scored_rows = 0
+        self.error: Optional[str] = None
+        self.result: Optional[pd.DataFrame] = None
+        self._cancelled = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='case-queue-scoring', daemon=True)
+
+    def start(self) -> 'ScoringJob':
+        self._thread.start()
+        return self
+
+    def cancel(self) -> None:
+        self._cancelled.set()
+
+    def join(self, timeout: Optional[float] = None) -> None:
+        self._thread.join(timeout)
+
+    @property
+    def total_rows(self) -> int:
+        return len(self.cases)
+
+    @property
+    def progress(self) -> float:
+        """Fraction of rows scored so far, in [0, 1]."""
+        return self.scored_rows / self.total_rows if self.total_rows else 1.0
+
+    @property
+    def done(self) -> bool:
+        return not self._thread.is_alive() and (self.result is not None or self.error is not None)
+
+    def _run(self) -> None:
+        try:
+            features = np.array(self.engine.features, dtype=object)
+            parts: List[Dict[str, np.ndarray]] = []
+            for start in range(0, self.total_rows, self.chunk_size):
+                if self._cancelled.is_set():
+                    self.error = 'Cancelled'
+                    return
+                batch = self.engine.score_batch(self.cases.iloc[start:start + self.chunk_size], track_drift=False)
+                parts.append({
+                    'risk_score': batch['risk_score'],
+                    'alert_flag': batch['alert_flag'],
+                    'risk_band': batch['risk_band'],
+                    'ood_flag': batch['ood_flag'],
+                    'ood_features': np.array([';'.join(features[row]) for row in batch['ood_mask']], dtype=object),
+                })
+                self.scored_rows += len(batch['risk_score'])
+
+            result = self.cases.copy()
+            for column in CASE_COLUMNS:
+                result[column] = np.concatenate([part[column] for part in parts]) if parts else []
+            self.result = result
+        except Exception as e:
+            self.error = str(e)
+
+
+def filter_cases(cases: pd.DataFrame, risk_bands: Optional[List[str]] = None, alert_only: bool = False,
+                 ood_only: bool = False, min_score: float = 0.0, search: Optional[str] = None) -> pd.DataFrame:
+    """
+    Filter a scored case queue.
+
+    Args:
+        cases: Output of ScoringJob
+        risk_bands: Keep only these bands; None or empty keeps all
+        alert_only: Keep only alerted cases
+        ood_only: Keep only out-of-distribution cases
+        min_score: Minimum risk_score
+        search: Substring matched against the id columns (transaction_id, customer_id)
+
+    Returns:
+        pd.DataFrame: Matching cases, original index preserved
+    """
+    mask = cases['risk_score'] >= min_score
+    if risk_bands:
+        mask &= cases['risk_band'].isin(risk_bands)
+    if alert_only:
+        mask &= cases['alert_flag'].astype(bool)
+    if ood_only:
+        mask &= cases['ood_flag'].astype(bool)
+    if search:
+        id_columns = [c for c in ('transaction_id', 'customer_id') if c in cases.columns]
+        matches = pd.Series(False, index=cases.index)
+        for column in id_columns:
+            matches |= cases[column].astype(str).str.contains(search, case=False, regex=False)
+        mask &= matches
+    return cases[mask]
+
+
+def page_cases(cases: pd.DataFrame, sort_by: str = 'risk_score', ascending: bool = False,
+               page: int = 1, page_size: int = 50) -> Tuple[pd.DataFrame, int]:
+    """
+    Sort a case queue and cut out one page, so only the visible rows are rendered.
+
+    Args:
+        cases: Scored (and usually filtered) cases
+        sort_by: Column to sort by
+        ascending: Sort direction
+        page: 1-based page number, clamped to the valid range
+        page_size: Rows per page
+
+    Returns:
+        tuple: (page DataFrame, number of pages)
+    """
+    n_pages = max(1, math.ceil(len(cases) / page_size))
+    page = min(max(page, 1), n_pages)
+    # Stable sort so equal scores keep upload order across pages
+    ordered = cases.sort_values(sort_by, ascending=ascending, kind='mergesort')
+    return ordered.iloc[(page - 1) * page_size:page * page_size], n_pages
+
+
+def case_features(cases: pd.DataFrame, index: Any, features: List[str]) -> Dict[str, Any]:
+    """Return one case's feature dict, as expected by explain_transaction."""
+    row = cases.loc[index]
+    return {f: row[f].item() if hasattr(row[f], 'item') else row[f] for f in features}
@@ -1,17 +1,23 @@
+import json
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, Iterator, Union
+from explainable_aml.utils.io import detect_format, metadata_sidecar_path, PARQUET_METADATA_KEY
 
-np.random.seed(42)  # For reproducibility
-
-def generate_synthetic_data(n_customers=5000, max_tx_per_customer=10, version="1.0"):
+def iter_synthetic_data(n_customers=5000, max_tx_per_customer=10, seed=42, customers_per_block=10000) -> Iterator[pd.DataFrame]:
     """
-    Generate synthetic transaction data for AML prototype.
+    Generate synthetic transaction data for AML prototype, one block of customers at a time.
+
+    All random values for a block are drawn as arrays from a seeded np.random.Generator, and
+    same-day frequencies are computed with bincount, so memory is bounded by the block size.
 
     Args:
         n_customers (int): Number of customers to generate
         max_tx_per_customer (int): Maximum transactions per customer
-        version (str): Version of the data generator
+        seed (int): Seed for the random generator; output is reproducible for a given seed and block size
+        customers_per_block (int): Customers generated per yielded DataFrame
 
     Features:
     - customer_id: Unique identifier for customer
@@ -22,79 +28,156 @@ def generate_synthetic_data(n_customers=5000, max_tx_per_customer=10, version="1
     - country_risk: Risk score of the transaction country (0-1)
     - customer_age: Age of the customer
     - is_money_laundering: Binary target (1 if high risk, 0 otherwise)
-    - data_version: Version of the data generator
-    - generation_timestamp: Timestamp when data was generated
-    - n_customers_param: Number of customers used in generation
-    - max_tx_per_customer_param: Max transactions per customer used in generation
+    - transaction_date: Date of the transaction
+
+    Generation metadata (data_version, generation_timestamp, parameters) is file-level, see
+    generation_metadata and write_synthetic_data.
 
     Logic for target: High risk if deviation > 5000, frequency > 5, and country_risk > 0.5
     """
-    generation_timestamp = datetime.now().isoformat()
-    data = []
+    rng = np.random.default_rng(seed)
+
+    # Transaction dates are simulated over a week
+    base_date = np.datetime64(datetime.now() - timedelta(days=7), 'us')
+
+    for first_id in range(1, n_customers + 1, customers_per_block):
+        customer_ids = np.arange(first_id, min(first_id + customers_per_block, n_customers + 1))
+        n_block = len(customer_ids)
 
-    for customer_id in range(1, n_customers + 1):
         # Generate customer attributes
-        customer_age = np.random.randint(18, 80)
-        customer_avg_amount = np.random.uniform(100, 10000)
-
-        # Number of transactions for this customer
-        n_tx = np.random.randint(1, max_tx_per_customer + 1)
-
-        # Generate transaction dates (simulate over a week)
-        base_date = datetime.now() - timedelta(days=7)
-        tx_dates = [base_date + timedelta(days=np.random.randint(0, 7)) for _ in range(n_tx)]
-
-        # Group by date to calculate frequency
-        date_counts = pd.Series(tx_dates).value_counts()
-        tx_frequencies = [date_counts[date] for date in tx_dates]
-
-        for i, (tx_date, freq) in enumerate(zip(tx_dates, tx_frequencies)):
-            transaction_id = f"{customer_id}_{i+1}"
-            transaction_amount = np.random.normal(customer_avg_amount, customer_avg_amount * 0.5)
-            transaction_amount = max(10, transaction_amount)  # Ensure positive
-
-            amount_deviation = abs(transaction_amount - customer_avg_amount)
-
-            # Country risk: random, but biased towards higher for some
-            country_risk = np.random.beta(2, 5) if np.random.rand() > 0.7 else np.random.beta(1, 2)
-
-            # Determine if money laundering (nuanced logic for varied risk levels)
-            # Core high-risk: all three high
-            core_risk = (amount_deviation > 4000 and freq > 6 and country_risk > 0.7)
-
-            # Marginal risks: barely qualify
-            marginal_risk = (
-                (amount_deviation > 3500 and freq > 2) or  # High amount, low freq
-                (freq > 5 and amount_deviation > 2000) or  # High freq, low deviation
-                (country_risk > 0.4 and amount_deviation > 2500)  # Medium country + deviation
-            )
-
-            is_money_laundering = 1 if (core_risk or marginal_risk) else 0
-
-            # Inject 2% label noise
-            if np.random.rand() < 0.02:
-                is_money_laundering = 1 - is_money_laundering
-
-            data.append({
-                'customer_id': customer_id,
-                'transaction_id': transaction_id,
-                'transaction_amount': transaction_amount,
-                'amount_deviation': amount_deviation,
-                'transaction_frequency': freq,
-                'country_risk': country_risk,
-                'customer_age': customer_age,
-                'is_money_laundering': is_money_laundering,
-                'transaction_date': tx_date,
-                'data_version': version,
-                'generation_timestamp': generation_timestamp,
-                'n_customers_param': n_customers,
-                'max_tx_per_customer_param': max_tx_per_customer
-            })
-
-    df = pd.DataFrame(data)
+        customer_age = rng.integers(18, 80, n_block)
+        customer_avg_amount = rng.uniform(100, 10000, n_block)
+
+        # Number of transactions per customer, expanded to one row per transaction
+        n_tx = rng.integers(1, max_tx_per_customer + 1, n_block)
+        customer = np.repeat(np.arange(n_block), n_tx)
+        n_rows = len(customer)
+        tx_number = np.arange(n_rows) - np.repeat(np.cumsum(n_tx) - n_tx, n_tx) + 1
+
+        # Same-day transaction counts per customer
+        tx_day = rng.integers(0, 7, n_rows)
+        day_key = customer * 7 + tx_day
+        freq = np.bincount(day_key, minlength=n_block * 7)[day_key]
+
+        avg_amount = customer_avg_amount[customer]
+        transaction_amount = np.maximum(10, rng.normal(avg_amount, avg_amount * 0.5))  # Ensure positive
+        amount_deviation = np.abs(transaction_amount - avg_amount)
+
+        # Country risk: random, but biased towards higher for some
+        country_risk = np.where(rng.random(n_rows) > 0.7, rng.beta(2, 5, n_rows), rng.beta(1, 2, n_rows))
+
+        # Determine if money laundering (nuanced logic for varied risk levels)
+        # Core high-risk: all three high
+        core_risk = (amount_deviation > 4000) & (freq > 6) & (country_risk > 0.7)
+
+        # Marginal risks: barely qualify
+        marginal_risk = (
+            ((amount_deviation > 3500) & (freq > 2)) |  # High amount, low freq
+            ((freq > 5) & (amount_deviation > 2000)) |  # High freq, low deviation
+            ((country_risk > 0.4) & (amount_deviation > 2500))  # Medium country + deviation
+        )
+
+        is_money_laundering = (core_risk | marginal_risk).astype(np.int64)
+
+        # Inject 2% label noise
+        is_money_laundering = np.where(rng.random(n_rows) < 0.02, 1 - is_money_laundering, is_money_laundering)
+
+        row_customer_ids = customer_ids[customer]
+        yield pd.DataFrame({
+            'customer_id': row_customer_ids,
+            'transaction_id': pd.Series(row_customer_ids).astype(str) + '_' + pd.Series(tx_number).astype(str),
+            'transaction_amount': transaction_amount,
+            'amount_deviation': amount_deviation,
+            'transaction_frequency': freq,
+            'country_risk': country_risk,
+            'customer_age': customer_age[customer],
+            'is_money_laundering': is_money_laundering,
+            'transaction_date': base_date + tx_day.astype('timedelta64[D]'),
+        })
+
+def generation_metadata(n_customers, max_tx_per_customer, version, seed) -> Dict[str, Any]:
+    """File-level metadata describing one generator run."""
+    return {
+        'data_version': version,
+        'generation_timestamp': datetime.now().isoformat(),
+        'n_customers_param': n_customers,
+        'max_tx_per_customer_param': max_tx_per_customer,
+        'seed': seed,
+    }
+
+def generate_synthetic_data(n_customers=5000, max_tx_per_customer=10, version="1.0", seed=42):
+    """
+    Generate synthetic transaction data for AML prototype as a single DataFrame.
+
+    Args:
+        n_customers (int): Number of customers to generate
+        max_tx_per_customer (int): Maximum transactions per customer
+        version (str): Version of the data generator
+        seed (int): Seed for the random generator
+
+    Returns:
+        pd.DataFrame: All generated transactions (see iter_synthetic_data for the columns),
+            with the generation metadata in `df.attrs`
+    """
+    df = pd.concat(list(iter_synthetic_data(n_customers, max_tx_per_customer, seed)), ignore_index=True)
+    df.attrs.update(generation_metadata(n_customers, max_tx_per_customer, version, seed))
     return df
 
+def write_synthetic_data(path: Union[str, Path], n_customers=5000, max_tx_per_customer=10, version="1.0", seed=42, customers_per_block=10000) -> Dict[str, Any]:
+    """
+    Stream synthetic transactions to a CSV or Parquet file block by block.
+
+    Generation metadata is stored once per file instead of on every row: in the Parquet
+    schema metadata, or in a `<path>.meta.json` sidecar for CSV.
+
+    Args:
+        path (str): Output .csv or .parquet file
+        n_customers (int): Number of customers to generate
+        max_tx_per_customer (int): Maximum transactions per customer
+        version (str): Version of the data generator
+        seed (int): Seed for the random generator
+        customers_per_block (int): Customers generated and written per block
+
+    Returns:
+        dict: The file-level metadata, including the number of rows written
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    file_format = detect_format(path)
+
+    metadata = generation_metadata(n_customers, max_tx_per_customer, version, seed)
+    blocks = iter_synthetic_data(n_customers, max_tx_per_customer, seed, customers_per_block)
+    n_rows = 0
+
+    if file_format == 'csv':
+        with open(path, 'w', newline='') as f:
+            for i, block in enumerate(blocks):
+                block.to_csv(f, header=(i == 0), index=False)
+                n_rows += len(block)
+        metadata['n_rows'] = n_rows
+        with open(metadata_sidecar_path(path), 'w') as f:
+            json.dump(metadata, f, indent=2)
+        return metadata
+
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    # The schema metadata is fixed by the first block; the row count is in the Parquet footer already
+    writer = None
+    try:
+        for block in blocks:
+            table = pa.Table.from_pandas(block, preserve_index=False)
+            if writer is None:
+                schema_metadata = {**(table.schema.metadata or {}), PARQUET_METADATA_KEY: json.dumps(metadata).encode()}
+                writer = pq.ParquetWriter(path, table.schema.with_metadata(schema_metadata))
+            writer.write_table(table)
+            n_rows += len(block)
+    finally:
+        if writer is not None:
+            writer.close()
+    metadata['n_rows'] = n_rows
+    return metadata
+
 if __name__ == "__main__":
-    df = generate_synthetic_data(version="1.0")
-    df.to_csv('src/explainable_aml/data/transactions.csv', index=False)
-    print("Synthetic data generated and saved to src/explainable_aml/data/transactions.csv")
\ No newline at end of file
+    write_synthetic_data('src/explainable_aml/data/transactions.csv', version="1.0")
+    print("Synthetic data generated and saved to src/explainable_aml/data/transactions.csv")
@@ -0,0 +1,235 @@
+import gc
+import json
+import shutil
+import time
+import multiprocessing
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from pathlib import Path
+from typing import Dict, Any, Callable, List, Optional, Union
+from explainable_aml.config import CONFIG
+from explainable_aml.utils.logging import log_event
+from explainable_aml.utils.io import detect_format, iter_frame_chunks, write_frame, concat_files
+from explainable_aml.utils.validation import validate_file_exists
+from explainable_aml.explainability.engine import get_engine
+from explainable_aml.nlp.generate_explanation import generate_nlp_explanations
+
+# Columns copied from the input to the output when present, so results can be joined back
+DEFAULT_ID_COLUMNS = ['transaction_id', 'customer_id']
+
+# Written into `<output>.parts/` so --resume only reuses parts from an identical run
+RUN_MANIFEST = 'run.json'
+
+
+def _part_path(parts_dir: Path, index: int, file_format: str) -> Path:
+    return parts_dir / f"part-{index:06d}.{file_format}"
+
+
+def _run_manifest(input_path: Path, chunk_size: int, file_format: str, model_version: str,
+                  options: Dict[str, Any]) -> Dict[str, Any]:
+    """Everything that decides how the input splits into parts and what each part contains."""
+    stat = input_path.stat()
+    return {
+        'input_path': str(input_path.resolve()),
+        'input_size': stat.st_size,
+        'input_mtime_ns': stat.st_mtime_ns,
+        'chunk_size': chunk_size,
+        'file_format': file_format,
+        'model_version': model_version,
+        'explanation_policy': CONFIG.get('explanation_policy'),
+        'options': {key: value for key, value in options.items() if key not in ('model_path', 'data_path')},
+    }
+
+
+def _prepare_parts_dir(parts_dir: Path, manifest: Dict[str, Any], resume: bool) -> None:
+    """Create the part directory, keeping existing parts only when resuming the same run."""
+    manifest_path = parts_dir / RUN_MANIFEST
+    if parts_dir.exists() and resume:
+        previous = None
+        if manifest_path.exists():
+            with open(manifest_path) as f:
+                previous = json.load(f)
+        if previous != json.loads(json.dumps(manifest)):
+            raise ValueError(f"Cannot resume: {parts_dir} was written by a run with a different input, chunk size, "
+                             f"model or scoring options. Rerun without --resume to start over.")
+        return
+    if parts_dir.exists():
+        shutil.rmtree(parts_dir)
+    parts_dir.mkdir(parents=True)
+    with open(manifest_path, 'w') as f:
+        json.dump(manifest, f)
+
+
+def score_frame(df: pd.DataFrame, model_path: Optional[str] = None, data_path: Optional[str] = None,
+                top_k: int = 5, include_nlp: bool = False, id_columns: Optional[List[str]] = None,
+                explain_all: bool = False) -> pd.DataFrame:
+    """
+    Score one chunk of transactions into a flat output frame, explaining the rows selected
+    by CONFIG['explanation_policy'] (or all rows with explain_all).
+
+    Rows left unexplained have an empty top_feature_i/top_contribution_i, nlp_text and pattern_id.
+    Offline scoring is not live traffic, so the rows are not counted into the drift monitor.
+
+    Args:
+        df: Transactions with the bundle's feature columns
+        model_path: Path to the model bundle
+        data_path: Path to background data for SHAP (legacy bundles only)
+        top_k: Number of top contributing features per row
+        include_nlp: Also generate the plain-English explanation and pattern_id per row
+        id_columns: Input columns to copy to the output, defaults to DEFAULT_ID_COLUMNS
+        explain_all: Explain every row regardless of the explanation policy
+
+    Returns:
+        pd.DataFrame: risk_score, alert_flag, risk_band, explained, top_feature_i/top_contribution_i,
+            ood_flag, ood_features and optionally nlp_text/pattern_id
+    """
+    if id_columns is None:
+        id_columns = DEFAULT_ID_COLUMNS
+
+    engine = get_engine(model_path, data_path)
+    batch = engine.screen_batch(df, top_k=top_k, requested=np.full(len(df), explain_all), track_drift=False)
+    features = np.array(engine.features, dtype=object)
+    explained = batch['explained']
+
+    out = df[[c for c in id_columns if c in df.columns]].reset_index(drop=True)
+    out['risk_score'] = batch['risk_score']
+    out['alert_flag'] = batch['alert_flag']
+    out['risk_band'] = batch['risk_band']
+    out['explained'] = explained
+    top_indices = batch['top_feature_indices']
+    top_names = np.where(top_indices >= 0, features[top_indices], None)
+    # Fixed dtypes, so a chunk with no explained rows has the same Parquet schema as the others
+    for j in range(top_names.shape[1]):
+        out[f'top_feature_{j + 1}'] = pd.array(top_names[:, j], dtype='string')
+        out[f'top_contribution_{j + 1}'] = batch['top_contributions'][:, j].astype(np.float64)
+    out['ood_flag'] = batch['ood_flag']
+    out['ood_features'] = [';'.join(features[row]) for row in batch['ood_mask']]
+
+    if include_nlp:
+        nlp = generate_nlp_explanations(batch, df)
+        out['nlp_text'] = pd.array([n['text'] if n is not None else None for n in nlp], dtype='string')
+        out['pattern_id'] = pd.array([n['pattern_id'] if n is not None else None for n in nlp], dtype='string')
+
+    return out
+
+
+def _score_chunk_to_file(index: int, df: pd.DataFrame, part_path: Path, options: Dict[str, Any]) -> int:
+    """Worker task: score one chunk and write it as an atomic part file."""
+    write_frame(score_frame(df, **options), part_path)
+    return len(df)
+
+
+def score_file(input_path: Union[str, Path], output_path: Union[str, Path], model_path: Optional[str] = None,
+               data_path: Optional[str] = None, chunk_size: Optional[int] = None, n_workers: Optional[int] = None,
+               top_k: int = 5, include_nlp: bool = False, resume: bool = False,
+               id_columns: Optional[List[str]] = None, explain_all: bool = False,
+               progress: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+    """
+    Score a CSV/Parquet file in fixed-size chunks spread across a process pool.
+
+    Each finished chunk is written as a part file under `<output>.parts/`, so memory stays
+    bounded by the chunks in flight and a crashed run can resume from the completed parts.
+    The parts are concatenated into output_path at the end.
+
+    The part directory also holds a manifest of the input file (path, size, mtime), chunk size,
+    model version and scoring options. Resuming against a different run raises instead of
+    silently mixing or skipping parts.
+
+    Args:
+        input_path: CSV or Parquet file of transactions
+        output_path: CSV or Parquet file to write
+        model_path: Path to the model bundle
+        data_path: Path to background data for SHAP (legacy bundles only)
+        chunk_size: Rows per chunk, defaults to CONFIG['batch_scoring']['chunk_size']
+        n_workers: Worker processes, defaults to CONFIG['batch_scoring']['n_workers']; 1 scores in-process
+        top_k: Number of top contributing features per row
+        include_nlp: Also write nlp_text and pattern_id columns
+        resume: Keep part files from a previous run and skip their chunks
+        id_columns: Input columns to copy to the output
+        explain_all: Explain every row regardless of CONFIG['explanation_policy']
+        progress: Called after each scored chunk with the running rows, chunks, skipped_chunks
+            and rows_per_sec
+
+    Returns:
+        dict: rows, chunks, skipped_chunks, seconds and rows_per_sec
+
+    Raises:
+        ValueError: If resume is set and the existing parts belong to a different run
+    """
+    settings = CONFIG.get('batch_scoring', {})
+    if chunk_size is None:
+        chunk_size = settings.get('chunk_size', 50000)
+    if n_workers is None:
+        n_workers = settings.get('n_workers', 1)
+
+    input_path, output_path = Path(input_path), Path(output_path)
+    validate_file_exists(input_path)
+    file_format = detect_format(output_path)
+
+    options = {
+        'model_path': model_path, 'data_path': data_path, 'top_k': top_k,
+        'include_nlp': include_nlp, 'id_columns': id_columns, 'explain_all': explain_all
+    }
+    engine = get_engine(model_path, data_path)  # Load before the clock matters
+    parts_dir = output_path.with_name(f"{output_path.name}.parts")
+    _prepare_parts_dir(parts_dir, _run_manifest(input_path, chunk_size, file_format, engine.model_version, options),
+                       resume)
+
+    stats = {'rows': 0, 'chunks': 0, 'skipped_chunks': 0}
+    start = time.perf_counter()
+
+    def record(n_rows: int) -> None:
+        stats['rows'] += n_rows
+        stats['chunks'] += 1
+        if progress is not None:
+            elapsed = time.perf_counter() - start
+            progress({**stats, 'rows_per_sec': stats['rows'] / elapsed if elapsed > 0 else 0.0})
+
+    chunks = enumerate(iter_frame_chunks(input_path, chunk_size))
+    part_paths = []
+
+    if n_workers <= 1:
+        for index, df in chunks:
+            part_path = _part_path(parts_dir, index, file_format)
+            part_paths.append(part_path)
+            if part_path.exists():
+                stats['skipped_chunks'] += 1
+                continue
+            record(_score_chunk_to_file(index, df, part_path, options))
+    else:
+        # Load the engine once and fork the workers from it, so they share the model copy-on-write
+        engine.warm_up()
+        gc.freeze()
+        # Bound the chunks in flight so memory does not grow with the input size
+        max_in_flight = 2 * n_workers
+        try:
+            with ProcessPoolExecutor(max_workers=n_workers, mp_context=multiprocessing.get_context('fork')) as pool:
+                pending = set()
+                for index, df in chunks:
+                    part_path = _part_path(parts_dir, index, file_format)
+                    part_paths.append(part_path)
+                    if part_path.exists():
+                        stats['skipped_chunks'] += 1
+                        continue
+                    pending.add(pool.submit(_score_chunk_to_file, index, df, part_path, options))
+                    if len(pending) >= max_in_flight:
+                        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            record(future.result())
+                for future in pending:
+                    record(future.result())
+        finally:
+            gc.unfreeze()  # Objects frozen for the fork are collectable again once the workers are gone
+
+    concat_files(part_paths, output_path)
+    shutil.rmtree(parts_dir)
+
+    stats['seconds'] = time.perf_counter() - start
+    stats['rows_per_sec'] = stats['rows'] / stats['seconds'] if stats['seconds'] > 0 else 0.0
+    log_event('batch_scoring_completed', {
+        'input_path': str(input_path),
+        'output_path': str(output_path),
+        **stats
+    })
+    return stats
@@ -0,0 +1,205 @@
+import os
+import time
+import hashlib
+import sqlite3
+import threading
+import numpy as np
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Hashable, List, Optional, Tuple, Union
+from explainable_aml.config import CONFIG, PROJECT_ROOT
+
+
+def feature_keys(X: np.ndarray) -> List[bytes]:
+    """
+    Canonical per-row cache keys for an (N, n_features) matrix in bundle feature order.
+
+    Values are compared as float64, so 1000 and 1000.0 share a key, as do -0.0 and 0.0
+    and every NaN payload.
+
+    Args:
+        X (ndarray): Transactions in bundle feature order
+
+    Returns:
+        list: One bytes key per row
+    """
+    X = np.array(X, dtype=np.float64) + 0.0  # Copy; adding 0.0 turns -0.0 into 0.0
+    X[np.isnan(X)] = np.nan
+    return [row.tobytes() for row in X]
+
+
+class ExplanationCache:
+    """
+    Bounded, thread-safe LRU cache of per-transaction SHAP contribution vectors.
+
+    Entries expire ttl_seconds after they were stored. With a disk_path, entries are also
+    written to a SQLite file that any process can read, so a miss in memory falls back to
+    disk before the caller recomputes.
+    """
+
+    def __init__(self, max_entries: int = 10000, ttl_seconds: Optional[float] = 3600,
+                 disk_path: Optional[Union[str, Path]] = None, max_batch_rows: int = 256):
+        """
+        Args:
+            max_entries (int): In-memory entries kept before the least recently used is evicted
+            ttl_seconds (float): Entry lifetime, None for no expiry
+            disk_path (Path): Optional SQLite file for the shared on-disk tier
+            max_batch_rows (int): Larger batches bypass the cache (see `ScoringEngine.shap_values`)
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.disk_path = Path(disk_path) if disk_path is not None else None
+        self.max_batch_rows = max_batch_rows
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+        self._entries: 'OrderedDict[Hashable, Tuple[float, np.ndarray]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_pid: Optional[int] = None
+
+    def _expired(self, stored_at: float) -> bool:
+        return self.ttl_seconds is not None and time.time() - stored_at > self.ttl_seconds
+
+    def _connection(self) -> sqlite3.Connection:
+        # SQLite connections must not cross a fork, so each process opens its own
+        if self._db is None or self._db_pid != os.getpid():
+            self.disk_path.parent.mkdir(parents=True, exist_ok=True)
+            db = sqlite3.connect(str(self.disk_path), timeout=30, check_same_thread=False)
+            db.execute('PRAGMA journal_mode=WAL')
+            db.execute('CREATE TABLE IF NOT EXISTS explanations (key TEXT PRIMARY KEY, stored_at REAL, value BLOB)')
+            db.commit()
+            self._db, self._db_pid = db, os.getpid()
+        return self._db
+
+    @staticmethod
+    def _disk_key(key: Hashable) -> str:
+        return hashlib.sha256(repr(key).encode()).hexdigest()
+
+    def get(self, key: Hashable) -> Optional[np.ndarray]:
+        """
+        Look up a contribution vector.
+
+        Args:
+            key: Hashable key, e.g. (model_version, backend, feature key)
+
+        Returns:
+            ndarray: The cached vector, or None on a miss
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if not self._expired(entry[0]):
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[1]
+                del self._entries[key]
+                self.expirations += 1
+
+            if self.disk_path is not None:
+                row = self._connection().execute(
+                    'SELECT stored_at, value FROM explanations WHERE key = ?', (self._disk_key(key),)
+                ).fetchone()
+                if row is not None and not self._expired(row[0]):
+                    value = np.frombuffer(row[1], dtype=np.float64)
+                    self._store(key, row[0], value)
+                    self.disk_hits += 1
+                    return value
+
+            self.misses += 1
+            return None
+
+    def put(self, key: Hashable, value: np.ndarray) -> None:
+        """
+        Store a contribution vector in memory and, if configured, on disk.
+
+        Args:
+            key: Hashable key
+            value (ndarray): 1-D float vector; stored as a read-only float64 copy
+        """
+        value = np.array(value, dtype=np.float64).ravel()
+        value.setflags(write=False)
+        stored_at = time.time()
+        with self._lock:
+            self._store(key, stored_at, value)
+            if self.disk_path is not None:
+                db = self._connection()
+                db.execute('INSERT OR REPLACE INTO explanations VALUES (?, ?, ?)',
+                           (self._disk_key(key), stored_at, value.tobytes()))
+                db.commit()
+
+    def _store(self, key: Hashable, stored_at: float, value: np.ndarray) -> None:
+        self._entries[key] = (stored_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        """Drop every in-memory entry and, if configured, the on-disk tier."""
+        with self._lock:
+            self._entries.clear()
+            if self.disk_path is not None and self.disk_path.exists():
+                db = self._connection()
+                db.execute('DELETE FROM explanations')
+                db.commit()
+
+    def metrics(self) -> Dict[str, Any]:
+        """
+        Return cache counters.
+
+        Returns:
+            dict: size, hits, disk_hits, misses, evictions, expirations and hit_rate
+        """
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                'size': len(self._entries),
+                'hits': self.hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'hit_rate': (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+            }
+
+
+_cache: Optional[ExplanationCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_explanation_cache() -> Optional[ExplanationCache]:
+    """Return the process-wide cache configured from CONFIG['explanation_cache'], or None if disabled."""
+    global _cache
+    settings = CONFIG.get('explanation_cache', {})
+    if not settings.get('enabled', False):
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                disk_path = settings.get('disk_path')
+                if disk_path is not None and not Path(disk_path).is_absolute():
+                    disk_path = PROJECT_ROOT / disk_path
+                _cache = ExplanationCache(
+                    max_entries=settings.get('max_entries', 10000),
+                    ttl_seconds=settings.get('ttl_seconds', 3600),
+                    disk_path=disk_path,
+                    max_batch_rows=settings.get('max_batch_rows', 256),
+                )
+    return _cache
+
+
+def _reset_locks_in_child() -> None:
+    # A lock held by another thread at fork time would stay locked forever in a forked worker
+    global _cache_lock
+    _cache_lock = threading.Lock()
+    if _cache is not None:
+        _cache._lock = threading.Lock()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_locks_in_child)
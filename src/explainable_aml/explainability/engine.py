@@ -0,0 +1,733 @@
+import os
+import logging
+import time
+import functools
+import threading
+import pandas as pd
+import numpy as np
+import xgboost as xgb
+from pathlib import Path
+from typing import Dict, Any, Callable, Iterator, List, Optional, Tuple, Union
+from explainable_aml.utils.logging import log_event
+from explainable_aml.utils.metrics import span, increment
+from explainable_aml.config import CONFIG
+from explainable_aml.model.bundle import load_model_bundle, bundle_signature, model_version
+from explainable_aml.model.registry import ModelRegistry, get_model_registry
+from explainable_aml.model.drift import DriftMonitor, drift_monitor_for
+from explainable_aml.explainability.cache import ExplanationCache, feature_keys, get_explanation_cache
+from explainable_aml.utils.validation import validate_file_exists, validate_features
+
+
+# Explanation backends: 'shap' runs the interventional shap.TreeExplainer over a background
+# sample; 'xgboost' asks the booster for exact path-dependent TreeSHAP (pred_contribs) natively
+EXPLANATION_BACKENDS = ('shap', 'xgboost')
+
+# Risk band cut points: Low < 0.3 <= Borderline < 0.7 <= High
+RISK_BAND_EDGES = np.array([0.3, 0.7])
+RISK_BAND_LABELS = np.array(["Low", "Borderline", "High"], dtype=object)
+
+# Explanation policy modes: 'always' runs SHAP for every scored row; 'tiered' scores every row
+# but only explains those the policy selects, leaving the rest to be explained on demand
+EXPLANATION_POLICY_MODES = ('always', 'tiered')
+
+
+def _file_signature(path: Path) -> Tuple[int, int]:
+    """Return (mtime_ns, size) so a rewritten file is detected cheaply."""
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _top_k(shap_values: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Top-k (indices, contributions) per row by absolute contribution: partition first, then sort only the k survivors."""
+    n_features = shap_values.shape[1]
+    abs_values = np.abs(shap_values)
+    if k < n_features:
+        candidates = np.sort(np.argpartition(-abs_values, k - 1, axis=1)[:, :k], axis=1)
+    else:
+        candidates = np.broadcast_to(np.arange(n_features), shap_values.shape)
+    order = np.argsort(-np.take_along_axis(abs_values, candidates, axis=1), axis=1, kind='stable')
+    top_feature_indices = np.take_along_axis(candidates, order, axis=1)
+    return top_feature_indices, np.take_along_axis(shap_values, top_feature_indices, axis=1)
+
+
+class ScoringEngine:
+    """
+    Long-lived scorer that holds a loaded model bundle, SHAP background and explainer.
+
+    Building the engine pays the fixed cost (bundle load, explainer construction) once; each call to `explain` then only runs predict and SHAP.
+    """
+
+    def __init__(self, model_path: Optional[str] = None, data_path: Optional[str] = None, backend: Optional[str] = None):
+        """
+        Args:
+            model_path (str): Path to the model bundle (containing model, features, threshold, metadata)
+            data_path (str): Path to background data for SHAP, only read for bundles without a stored background
+            backend (str): Explanation backend, 'shap' or 'xgboost'; defaults to CONFIG['explanation_backend']
+        """
+        if model_path is None:
+            model_path = CONFIG['model_path']
+        if data_path is None:
+            data_path = CONFIG['data_path']
+        if backend is None:
+            backend = CONFIG.get('explanation_backend', 'shap')
+        if backend not in EXPLANATION_BACKENDS:
+            raise ValueError(f"Unknown explanation backend '{backend}'. Expected one of {EXPLANATION_BACKENDS}")
+
+        self.model_path = Path(model_path)
+        self.data_path = Path(data_path)
+        self.backend = backend
+
+        validate_file_exists(self.model_path)
+
+        # Load model bundle (bundle directory with mmap'd arrays, or legacy joblib file)
+        with span('bundle_load'):
+            bundle = load_model_bundle(self.model_path)
+
+        self.bundle = bundle
+        self.model = bundle['model']
+        self.features = bundle['features']
+        self.threshold = bundle['threshold']
+        self.feature_ranges = bundle.get('feature_ranges', {})
+        self.model_version = model_version(self.model_path, bundle)
+        self.cache: Optional[ExplanationCache] = get_explanation_cache()
+        # Live feature/score histograms against the training reference; None for bundles without one
+        self.drift: Optional[DriftMonitor] = drift_monitor_for(bundle)
+
+        # Bundles trained before the background was persisted still sample it from the dataset
+        self.uses_data_file = backend == 'shap' and bundle.get('background') is None
+        if self.uses_data_file:
+            validate_file_exists(self.data_path)
+            # The sampled background is part of the explainer, so it versions cached explanations too
+            self.model_version += '-%d-%d' % _file_signature(self.data_path)
+        self.signature = self._signature()
+
+        if backend == 'shap':
+            # Imported lazily: shap pulls in numba, which the xgboost backend never needs
+            import shap
+
+            if self.uses_data_file:
+                # Load background data for SHAP explainer
+                with span('background_read'):
+                    df = pd.read_csv(self.data_path, usecols=self.features)
+                    X_background = df[self.features].sample(CONFIG['shap_background_samples'], random_state=42)  # Sample for efficiency
+            else:
+                X_background = bundle['background']
+
+            # Create explainer
+            with span('explainer_build'):
+                self.explainer = shap.TreeExplainer(self.model, X_background)
+        else:
+            self.explainer = None
+            self.booster = self.model.get_booster()
+
+        # OOD bounds as arrays in feature order; features without a range are never flagged
+        if bundle.get('ood_stats') is not None:
+            self._ood_lower, self._ood_upper = np.asarray(bundle['ood_stats'], dtype=np.float64)
+        else:
+            self._ood_lower = np.array([self.feature_ranges.get(f, {}).get('min', -np.inf) for f in self.features], dtype=np.float64)
+            self._ood_upper = np.array([self.feature_ranges.get(f, {}).get('max', np.inf) for f in self.features], dtype=np.float64)
+
+    def _signature(self) -> Tuple[Any, ...]:
+        """File signatures of everything this engine was built from."""
+        if self.uses_data_file:
+            return bundle_signature(self.model_path), _file_signature(self.data_path)
+        return (bundle_signature(self.model_path),)
+
+    def is_stale(self) -> bool:
+        """Return True if the bundle or background file changed on disk since loading."""
+        try:
+            return self.signature != self._signature()
+        except FileNotFoundError:
+            return True
+
+    def warm_up(self) -> None:
+        """Run one prediction and one explanation, so the first real request pays no lazy initialization."""
+        X = np.clip(np.zeros((1, len(self.features))), self._ood_lower, self._ood_upper)
+        if self.backend == 'xgboost':
+            self.booster.inplace_predict(X)
+        else:
+            self.model.predict_proba(X)
+        self._compute_shap_values(X)
+
+    def _as_matrix(self, X: Union[pd.DataFrame, np.ndarray]) -> np.ndarray:
+        """Convert a DataFrame or 2-D array of transactions into a float matrix in bundle feature order."""
+        if isinstance(X, pd.DataFrame):
+            missing = [f for f in self.features if f not in X.columns]
+            if missing:
+                raise ValueError(f"Missing required features: {missing}")
+            return X[self.features].to_numpy(dtype=np.float64)
+
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim != 2 or X.shape[1] != len(self.features):
+            raise ValueError(f"Expected a 2-D array with {len(self.features)} feature columns, got shape {X.shape}")
+        return X
+
+    def score_batch(self, X: Union[pd.DataFrame, np.ndarray], track_drift: bool = True) -> Dict[str, Any]:
+        """
+        Score N transactions without explaining them: one predict call plus OOD and drift bookkeeping.
+
+        Args:
+            X (DataFrame or ndarray): N transactions, either with named feature columns or as an
+                (N, n_features) array in bundle feature order
+            track_drift (bool): Count the batch into the drift monitor; False for offline
+                analysis of historical data, which is not live traffic
+
+        Returns:
+            dict: Arrays indexed by row - risk_score (N,), alert_flag (N,), risk_band (N,),
+                ood_mask (N, F), ood_flag (N,) - plus the feature names under 'features'
+        """
+        X = self._as_matrix(X)
+
+        # Predict risk scores
+        with span('predict'):
+            if self.backend == 'xgboost':
+                risk_score = self.booster.inplace_predict(X).astype(np.float64)  # Probability of class 1
+            else:
+                risk_score = self.model.predict_proba(X)[:, 1].astype(np.float64)  # Probability of class 1
+        alert_flag = risk_score > self.threshold  # Use threshold from bundle
+        risk_band = RISK_BAND_LABELS[np.searchsorted(RISK_BAND_EDGES, risk_score, side='right')]
+
+        # Check for out-of-distribution features
+        with span('ood_check'):
+            ood_mask = (X < self._ood_lower) | (X > self._ood_upper)
+            ood_flag = ood_mask.any(axis=1)
+
+        if track_drift and self.drift is not None:
+            with span('drift'):
+                self.drift.update(X, risk_score)
+
+        increment('transactions', len(X))
+        increment('alerts', int(alert_flag.sum()))
+        increment('ood', int(ood_flag.sum()))
+
+        return {
+            'features': self.features,
+            'risk_score': risk_score,
+            'alert_flag': alert_flag,
+            'risk_band': risk_band,
+            'ood_mask': ood_mask,
+            'ood_flag': ood_flag,
+        }
+
+    def explanation_mask(self, batch: Dict[str, Any], policy: Optional[Dict[str, Any]] = None) -> np.ndarray:
+        """
+        Select the scored rows that the explanation policy wants explained up front.
+
+        Args:
+            batch (dict): Output of score_batch
+            policy (dict): Explanation policy, defaults to CONFIG['explanation_policy']
+
+        Returns:
+            ndarray: (N,) bool mask, all True in 'always' mode
+        """
+        if policy is None:
+            policy = CONFIG.get('explanation_policy', {})
+        mode = policy.get('mode', 'always')
+        if mode not in EXPLANATION_POLICY_MODES:
+            raise ValueError(f"Unknown explanation policy mode '{mode}'. Expected one of {EXPLANATION_POLICY_MODES}")
+
+        n_rows = len(batch['risk_score'])
+        if mode == 'always':
+            return np.ones(n_rows, dtype=bool)
+
+        mask = np.zeros(n_rows, dtype=bool)
+        if policy.get('explain_alerted', True):
+            mask |= batch['alert_flag']
+        if policy.get('explain_risk_bands'):
+            mask |= np.isin(batch['risk_band'], policy['explain_risk_bands'])
+        if policy.get('explain_ood', False):
+            mask |= batch['ood_flag']
+        return mask
+
+    def explain_batch(self, X: Union[pd.DataFrame, np.ndarray], top_k: int = 5) -> Dict[str, Any]:
+        """
+        Score and explain all N transactions with one predict_proba and one shap_values call.
+
+        Args:
+            X (DataFrame or ndarray): N transactions, either with named feature columns or as an
+                (N, n_features) array in bundle feature order
+            top_k (int): Number of top contributing features to return per transaction
+
+        Returns:
+            dict: The score_batch arrays plus shap_values (N, F), top_feature_indices (N, k),
+                top_contributions (N, k) and explained (N,)
+        """
+        X = self._as_matrix(X)
+        batch = self.score_batch(X)
+        return self._add_explanations(X, batch, np.ones(len(X), dtype=bool), top_k)
+
+    def screen_batch(self, X: Union[pd.DataFrame, np.ndarray], top_k: int = 5, requested: Optional[np.ndarray] = None,
+                     policy: Optional[Dict[str, Any]] = None, track_drift: bool = True) -> Dict[str, Any]:
+        """
+        Score N transactions and explain only those selected by the explanation policy.
+
+        Rows that are not explained keep NaN shap_values/top_contributions, -1 in
+        top_feature_indices and explained=False, so the arrays have the explain_batch shapes.
+
+        Args:
+            X (DataFrame or ndarray): N transactions, either with named feature columns or as an
+                (N, n_features) array in bundle feature order
+            top_k (int): Number of top contributing features to return per explained transaction
+            requested (ndarray): (N,) bool mask of rows to explain regardless of the policy
+            policy (dict): Explanation policy, defaults to CONFIG['explanation_policy']
+            track_drift (bool): Count the batch into the drift monitor, see `score_batch`
+
+        Returns:
+            dict: Same keys as explain_batch
+        """
+        X = self._as_matrix(X)
+        batch = self.score_batch(X, track_drift=track_drift)
+        mask = self.explanation_mask(batch, policy)
+        if requested is not None:
+            mask = mask | np.asarray(requested, dtype=bool)
+        return self._add_explanations(X, batch, mask, top_k)
+
+    def _add_explanations(self, X: np.ndarray, batch: Dict[str, Any], mask: np.ndarray, top_k: int) -> Dict[str, Any]:
+        """Run SHAP on the masked rows of X and add the explanation arrays to a score_batch result."""
+        n_rows, n_features = X.shape
+        k = min(top_k, n_features)
+
+        if mask.all():
+            shap_values = self.shap_values(X)
+            top_feature_indices, top_contributions = _top_k(shap_values, k)
+        else:
+            shap_values = np.full((n_rows, n_features), np.nan)
+            top_feature_indices = np.full((n_rows, k), -1, dtype=np.intp)
+            top_contributions = np.full((n_rows, k), np.nan)
+            rows = np.flatnonzero(mask)
+            if len(rows):
+                shap_values[rows] = self.shap_values(X[rows])
+                top_feature_indices[rows], top_contributions[rows] = _top_k(shap_values[rows], k)
+
+        batch.update({
+            'shap_values': shap_values,
+            'top_feature_indices': top_feature_indices,
+            'top_contributions': top_contributions,
+            'explained': mask,
+        })
+        return batch
+
+    def top_features_loader(self, X: Union[pd.DataFrame, np.ndarray], top_k: int = 5) -> Callable[[int], List[Dict[str, Any]]]:
+        """
+        Return a loader that explains row i of X on demand, for deferred 'top_features'.
+
+        Args:
+            X (DataFrame or ndarray): The transactions a screen_batch result was computed from
+            top_k (int): Number of top contributing features
+
+        Returns:
+            callable: i -> top_features list for row i
+        """
+        X = self._as_matrix(X)
+
+        def load(i: int) -> List[Dict[str, Any]]:
+            # Only the SHAP step: the row was already scored (and counted) by screen_batch
+            top_feature_indices, top_contributions = _top_k(self.shap_values(X[i:i + 1]), min(top_k, len(self.features)))
+            return [
+                {'feature': self.features[j], 'contribution': float(c)}
+                for j, c in zip(top_feature_indices[0], top_contributions[0])
+            ]
+        return load
+
+    def shap_values(self, X: np.ndarray) -> np.ndarray:
+        """
+        Per-feature SHAP contributions (log-odds space), served from the explanation cache when possible.
+
+        Rows are looked up by model version, backend and canonical feature vector; only the
+        misses are computed, in one call. Batches larger than the cache's max_batch_rows skip
+        the cache, as bulk screening rarely repeats a transaction.
+
+        Args:
+            X (ndarray): (N, n_features) matrix in bundle feature order
+
+        Returns:
+            ndarray: (N, n_features) contributions for the positive class
+        """
+        with span('shap'):
+            if self.cache is None or len(X) > self.cache.max_batch_rows:
+                return self._compute_shap_values(X)
+            return self._cached_shap_values(X)
+
+    def _cached_shap_values(self, X: np.ndarray) -> np.ndarray:
+        """Serve rows from the explanation cache, computing only the misses in one call."""
+        keys = [(self.model_version, self.backend, key) for key in feature_keys(X)]
+        rows = [self.cache.get(key) for key in keys]
+        missing = [i for i, row in enumerate(rows) if row is None]
+        if missing:
+            for i, row in zip(missing, self._compute_shap_values(X[missing])):
+                self.cache.put(keys[i], row)
+                rows[i] = row
+        return np.vstack(rows) if rows else np.empty((0, len(self.features)))
+
+    def _compute_shap_values(self, X: np.ndarray) -> np.ndarray:
+        """Compute SHAP contributions for every row of X with the configured backend."""
+        if self.backend == 'xgboost':
+            dmatrix = xgb.DMatrix(X, feature_names=self.features)
+            contribs = self.booster.predict(dmatrix, pred_contribs=True)
+            return contribs[:, :-1].astype(np.float64)  # Last column is the bias term
+
+        shap_values = self.explainer.shap_values(X)
+
+        # For binary classification, shap_values is list of arrays for each class
+        if isinstance(shap_values, list):
+            shap_values = shap_values[1]  # For positive class
+        return np.asarray(shap_values).reshape(len(X), len(self.features))
+
+    def explain(self, transaction_features: Dict[str, Any], requested: bool = False) -> Dict[str, Any]:
+        """
+        Explain a transaction's risk score using SHAP.
+
+        Under a 'tiered' explanation policy, SHAP only runs here for transactions the policy
+        selects (e.g. alerted or borderline); for the rest 'top_features' is computed on first access,
+        which also logs a 'transaction_explained' audit event with the result.
+
+        Args:
+            transaction_features (dict): Features of the transaction
+            requested (bool): Explain now regardless of the explanation policy
+
+        Returns:
+            Explanation: risk_score, alert_flag, risk_band, top_features (list of dicts with feature, contribution),
+                ood_flag, ood_features
+        """
+        validate_features(transaction_features, self.features)
+
+        X_input = np.array([[transaction_features[f] for f in self.features]], dtype=np.float64)
+        batch = self.screen_batch(X_input, requested=np.array([requested]))
+        load_top_features = self.top_features_loader(X_input)
+        features = dict(transaction_features)
+
+        def load(i: int) -> List[Dict[str, Any]]:
+            # A deferred explanation gets its own audit record once it is actually computed
+            top_features = load_top_features(i)
+            with span('audit_log'):
+                log_event('transaction_explained', {
+                    'features': features,
+                    **{key: dict.__getitem__(explanation, key) for key in ('risk_score', 'alert_flag', 'risk_band')},
+                    'top_features': top_features,
+                })
+            return top_features
+
+        explanation = batch_to_explanations(batch, loader=load)[0]
+
+        # Log transaction scored event. Read the stored fields directly: a deferred
+        # 'top_features' stays deferred, and is logged by 'transaction_explained' if computed.
+        with span('audit_log'):
+            log_event('transaction_scored', {
+                'features': features,
+                **dict(dict.items(explanation))
+            })
+
+        return explanation
+
+
+class Explanation(dict):
+    """
+    Per-transaction explanation dict whose 'top_features' may still be pending.
+
+    Rows skipped by a tiered explanation policy carry a loader instead of 'top_features'.
+    The first `explanation['top_features']` or `.get('top_features')` runs it and stores the
+    result, after which the dict is identical to an eagerly explained one. Anything that
+    reads the dict as a whole (iteration, keys()/items()/values(), len, ==, copies, json.dumps,
+    `dict(e)`, `{**e}` and pickling) runs it too, so callers always see the full schema.
+    """
+
+    def __init__(self, data: Dict[str, Any], loader: Optional[Callable[[], List[Dict[str, Any]]]] = None):
+        super().__init__(data)
+        self._loader = loader
+
+    @property
+    def explained(self) -> bool:
+        """True once 'top_features' has been computed."""
+        return dict.__contains__(self, 'top_features')
+
+    def _load(self) -> None:
+        top_features, self._loader = self._loader(), None
+        # Keep the eager key order, with top_features ahead of the OOD fields
+        tail = {key: self.pop(key) for key in ('ood_flag', 'ood_features') if dict.__contains__(self, key)}
+        self['top_features'] = top_features
+        self.update(tail)
+
+    def _resolve(self) -> 'Explanation':
+        if self._loader is not None:
+            self._load()
+        return self
+
+    def __missing__(self, key: str) -> Any:
+        if key == 'top_features' and self._loader is not None:
+            self._load()
+            return dict.__getitem__(self, key)
+        raise KeyError(key)
+
+    def __contains__(self, key: object) -> bool:
+        return dict.__contains__(self, key) or (key == 'top_features' and self._loader is not None)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        if key == 'top_features' and self._loader is not None:
+            return self[key]
+        return super().get(key, default)
+
+    def __iter__(self) -> Iterator[str]:
+        return dict.__iter__(self._resolve())
+
+    def __len__(self) -> int:
+        return dict.__len__(self._resolve())
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, Explanation):
+            other._resolve()
+        return dict.__eq__(self._resolve(), other)
+
+    def __ne__(self, other: object) -> bool:
+        if isinstance(other, Explanation):
+            other._resolve()
+        return dict.__ne__(self._resolve(), other)
+
+    def keys(self):
+        return dict.keys(self._resolve())
+
+    def items(self):
+        return dict.items(self._resolve())
+
+    def values(self):
+        return dict.values(self._resolve())
+
+    def copy(self) -> 'Explanation':
+        return Explanation(dict.items(self._resolve()))
+
+    def __reduce__(self) -> Tuple[Any, ...]:
+        return Explanation, (dict(dict.items(self._resolve())),)
+
+
+def batch_to_explanations(batch: Dict[str, Any], loader: Optional[Callable[[int], List[Dict[str, Any]]]] = None) -> List[Dict[str, Any]]:
+    """
+    Convert the arrays returned by `ScoringEngine.explain_batch` into per-transaction dicts.
+
+    Score-only batches (from `score_batch`) give the same dicts without 'top_features'. For
+    rows a `screen_batch` result left unexplained, 'top_features' is deferred to `loader`
+    when one is given (see `ScoringEngine.top_features_loader`) and omitted otherwise.
+
+    Args:
+        batch (dict): Output of explain_batch, screen_batch or score_batch
+        loader (callable): i -> top_features for row i, used for unexplained rows
+
+    Returns:
+        list: One Explanation per row with the same schema as explain_transaction
+    """
+    features = batch['features']
+    has_explanations = 'top_feature_indices' in batch
+    explanations = []
+    for i in range(len(batch['risk_score'])):
+        explanation = Explanation({
+            'risk_score': float(batch['risk_score'][i]),
+            'alert_flag': bool(batch['alert_flag'][i]),
+            'risk_band': str(batch['risk_band'][i]),
+        })
+        if has_explanations and batch['explained'][i]:
+            explanation['top_features'] = [
+                {'feature': features[j], 'contribution': float(c)}
+                for j, c in zip(batch['top_feature_indices'][i], batch['top_contributions'][i])
+            ]
+        elif has_explanations and loader is not None:
+            explanation._loader = functools.partial(loader, i)
+        explanation['ood_flag'] = bool(batch['ood_flag'][i])
+        explanation['ood_features'] = [features[j] for j in np.flatnonzero(batch['ood_mask'][i])]
+        explanations.append(explanation)
+    return explanations
+
+
+def get_engine(model_path: Optional[str] = None, data_path: Optional[str] = None, backend: Optional[str] = None) -> ScoringEngine:
+    """
+    Return the process-wide engine for a model bundle, building it on first use.
+
+    With an explicit model_path the engine is rebuilt if the bundle or background file has
+    changed on disk. Without one, the engine of the configured model comes from
+    `get_engine_manager`, which loads new versions in the background instead.
+
+    Args:
+        model_path (str): Path to the model bundle, defaults to the active registry version
+            or CONFIG['model_path']
+        data_path (str): Path to background data for SHAP, defaults to CONFIG['data_path']
+        backend (str): Explanation backend, defaults to CONFIG['explanation_backend']
+
+    Returns:
+        ScoringEngine: A warm engine shared by every caller in this process
+    """
+    if model_path is None:
+        return get_engine_manager(None, data_path, backend).current()
+    if data_path is None:
+        data_path = CONFIG['data_path']
+    if backend is None:
+        backend = CONFIG.get('explanation_backend', 'shap')
+
+    key = (str(model_path), str(data_path), backend)
+    engine = _engines.get(key)
+    if engine is not None and not engine.is_stale():
+        return engine
+
+    with _engines_lock:
+        engine = _engines.get(key)
+        if engine is None or engine.is_stale():
+            engine = ScoringEngine(model_path, data_path, backend)
+            _engines[key] = engine
+        return engine
+
+
+class EngineManager:
+    """
+    Holds the live engine for a model source and hot-swaps new versions in off the request path.
+
+    The source is either a model registry, followed through its ACTIVE pointer, or a bundle
+    path, followed through its file signature. A watcher thread polls the source; when it
+    changes, the new engine is loaded and warmed up on the watcher thread and then replaces
+    the live one with a single reference assignment. Callers that already hold the old
+    engine finish their requests on it, and `current()` never waits for a load.
+    """
+
+    def __init__(self, model_path: Optional[str] = None, data_path: Optional[str] = None,
+                 backend: Optional[str] = None, registry: Optional[ModelRegistry] = None,
+                 poll_interval: float = 2.0):
+        """
+        Args:
+            model_path (str): Bundle to follow when no registry is given, defaults to CONFIG['model_path']
+            data_path (str): Background data for legacy bundles, defaults to CONFIG['data_path']
+            backend (str): Explanation backend, defaults to CONFIG['explanation_backend']
+            registry (ModelRegistry): Registry whose active version is served
+            poll_interval (float): Seconds between checks of the source; 0 disables the watcher
+        """
+        self.registry = registry
+        self.model_path = Path(model_path if model_path is not None else CONFIG['model_path'])
+        self.data_path = data_path
+        self.backend = backend
+        self.poll_interval = poll_interval
+        self.swaps = 0
+        self.last_error: Optional[str] = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        # The first load has nothing to fall back on, so it happens on the caller's thread
+        self._token, path = self._source()
+        self._engine = self._load(path)
+
+    def _source(self) -> Tuple[Any, Path]:
+        """(change token, bundle path) of the version that should be live."""
+        if self.registry is not None:
+            version = self.registry.active_version()
+            if version is None:
+                raise FileNotFoundError(f"No active model version in registry {self.registry.root}")
+            return version, self.registry.path(version)
+        return bundle_signature(self.model_path), self.model_path
+
+    def _load(self, path: Path) -> ScoringEngine:
+        engine = ScoringEngine(str(path), self.data_path, self.backend)
+        engine.warm_up()
+        return engine
+
+    def current(self) -> ScoringEngine:
+        """The live engine; read it once per request and use that reference throughout."""
+        return self._engine
+
+    def check(self) -> bool:
+        """
+        Poll the source once and swap in its new version if it changed.
+
+        A version that fails to load is logged and skipped, and the live engine is kept,
+        until the source changes again.
+
+        Returns:
+            bool: True if a new engine was swapped in
+        """
+        with self._lock:
+            try:
+                token, path = self._source()
+            except FileNotFoundError:
+                return False
+            if token == self._token:
+                return False
+
+            previous = self._engine
+            start = time.perf_counter()
+            self._token = token
+            try:
+                engine = self._load(path)
+            except Exception as e:
+                self.last_error = str(e)
+                log_event('model_swap_failed', {'model_path': str(path), 'error': str(e)})
+                return False
+
+            self._engine = engine
+            self.swaps += 1
+            self.last_error = None
+            log_event('model_swapped', {
+                'model_path': str(path),
+                'model_version': engine.model_version,
+                'previous_version': previous.model_version,
+                'load_seconds': time.perf_counter() - start,
+            })
+            return True
+
+    def start(self) -> 'EngineManager':
+        """Start the watcher thread, unless the poll interval is 0."""
+        if self.poll_interval > 0 and self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='engine-watcher', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.poll_interval):
+            try:
+                self.check()
+            except Exception:
+                logging.exception("Model watcher check failed")
+
+
+_engines: Dict[Tuple[str, str, str], ScoringEngine] = {}
+_engines_lock = threading.Lock()
+_managers: Dict[Tuple[str, str, str], EngineManager] = {}
+
+
+def get_engine_manager(model_path: Optional[str] = None, data_path: Optional[str] = None,
+                       backend: Optional[str] = None) -> EngineManager:
+    """
+    Return the process-wide hot-swapping manager for a model source, starting its watcher.
+
+    Without a model_path the source is the registry at CONFIG['model_registry']['path'] if
+    one is configured, and CONFIG['model_path'] otherwise.
+
+    Args:
+        model_path (str): Bundle to follow instead of the configured model
+        data_path (str): Background data for legacy bundles, defaults to CONFIG['data_path']
+        backend (str): Explanation backend, defaults to CONFIG['explanation_backend']
+
+    Returns:
+        EngineManager: Call `current()` per request for the live engine
+    """
+    key = (str(model_path), str(data_path), str(backend))
+    manager = _managers.get(key)
+    if manager is not None:
+        return manager
+
+    with _engines_lock:
+        manager = _managers.get(key)
+        if manager is None:
+            registry = get_model_registry() if model_path is None else None
+            poll_interval = CONFIG.get('model_registry', {}).get('poll_interval_seconds', 2.0)
+            manager = EngineManager(model_path, data_path, backend, registry, poll_interval).start()
+            _managers[key] = manager
+        return manager
+
+
+def clear_engines() -> None:
+    """Drop all cached engines and stop their watchers, e.g. after changing CONFIG in tests."""
+    with _engines_lock:
+        _engines.clear()
+        managers = list(_managers.values())
+        _managers.clear()
+    for manager in managers:
+        manager.stop()
@@ -1,117 +1,63 @@
-import joblib
-import shap
-import pandas as pd
 import numpy as np
-from typing import Dict, Any, Optional
+import pandas as pd
+from typing import Dict, Any, Optional, Union
 from explainable_aml.utils.logging import log_event
-from explainable_aml.config import CONFIG
-from explainable_aml.utils.validation import validate_file_exists, validate_features, validate_model_bundle
+from explainable_aml.utils.metrics import increment, timed
+from explainable_aml.explainability.engine import get_engine
 
+@timed('explain_transaction')
 def explain_transaction(transaction_features: Dict[str, Any], model_path: Optional[str] = None, data_path: Optional[str] = None) -> Dict[str, Any]:
-    if model_path is None:
-        model_path = CONFIG['model_path']
-    if data_path is None:
-        data_path = CONFIG['data_path']
     """
     Explain a transaction's risk score using SHAP.
 
+    Thin wrapper over the process-wide ScoringEngine, so the model bundle, background
+    data and explainer are only loaded on the first call.
+
     Args:
         transaction_features (dict): Features of the transaction
         model_path (str): Path to the model bundle (containing model, features, threshold, metadata)
         data_path (str): Path to background data for SHAP
 
     Returns:
-        dict: risk_score, alert_flag, top_features (list of dicts with feature, contribution)
+        dict: risk_score, alert_flag, top_features (list of dicts with feature, contribution). Under a
+            'tiered' explanation_policy, top_features of unselected transactions is computed on first access
     """
     try:
-        validate_file_exists(model_path)
-        validate_file_exists(data_path)
-
-        # Load model bundle
-        bundle = joblib.load(model_path)
-        validate_model_bundle(bundle)
-        
-        model = bundle['model']
-        features = bundle['features']
-        threshold = bundle['threshold']
-        feature_ranges = bundle.get('feature_ranges', {})
-
-        validate_features(transaction_features, features)
-
-        # Load background data for SHAP explainer
-        df = pd.read_csv(data_path)
-        X_background = df[features].sample(CONFIG['shap_background_samples'], random_state=42)  # Sample for efficiency
-
-        # Create explainer
-        explainer = shap.TreeExplainer(model, X_background)
-
-        # Prepare input
-        X_input = pd.DataFrame([transaction_features])
-
-        # Predict risk score
-        risk_score = float(model.predict_proba(X_input)[0][1])  # Probability of class 1
-        alert_flag = bool(risk_score > threshold)  # Use threshold from bundle
-
-        # Determine risk band
-        if risk_score < 0.3:
-            risk_band = "Low"
-        elif risk_score < 0.7:
-            risk_band = "Borderline"
-        else:
-            risk_band = "High"
-
-        # Explain
-        shap_values = explainer.shap_values(X_input)
-
-        # For binary classification, shap_values is list of arrays for each class
-        if isinstance(shap_values, list):
-            shap_values = shap_values[1]  # For positive class
-
-        # Get feature contributions
-        feature_contributions = {}
-        for i, feature in enumerate(features):
-            feature_contributions[feature] = shap_values[0][i]
+        engine = get_engine(model_path, data_path)
+        return engine.explain(transaction_features)
 
-        # Sort by absolute contribution
-        sorted_features = sorted(feature_contributions.items(), key=lambda x: abs(x[1]), reverse=True)
-
-        top_features = [{'feature': f, 'contribution': float(c)} for f, c in sorted_features[:5]]  # Top 5
-
-        # Check for out-of-distribution features
-        ood_features = []
-        for feature in features:
-            value = transaction_features[feature]
-            if feature in feature_ranges:
-                min_val = feature_ranges[feature]['min']
-                max_val = feature_ranges[feature]['max']
-                if value < min_val or value > max_val:
-                    ood_features.append(feature)
+    except Exception as e:
+        increment('errors')
+        log_event('explanation_failed', {'error': str(e)})
+        raise e
 
-        ood_flag = len(ood_features) > 0
+def explain_batch(X: Union[pd.DataFrame, np.ndarray], model_path: Optional[str] = None, data_path: Optional[str] = None, top_k: int = 5) -> Dict[str, Any]:
+    """
+    Score and explain many transactions at once using vectorized SHAP.
 
-        explanation = {
-            'risk_score': risk_score,
-            'alert_flag': alert_flag,
-            'risk_band': risk_band,
-            'top_features': top_features,
-            'ood_flag': ood_flag,
-            'ood_features': ood_features
-        }
+    Args:
+        X (DataFrame or ndarray): N transactions with named feature columns, or an (N, n_features)
+            array in bundle feature order
+        model_path (str): Path to the model bundle
+        data_path (str): Path to background data for SHAP
+        top_k (int): Number of top contributing features per transaction
 
-        # Log transaction scored event
-        log_event('transaction_scored', {
-            'features': transaction_features,
-            'risk_score': risk_score,
-            'alert_flag': alert_flag,
-            'risk_band': risk_band,
-            'top_features': top_features,
-            'ood_flag': ood_flag,
-            'ood_features': ood_features
+    Returns:
+        dict: Per-row arrays (risk_score, alert_flag, risk_band, shap_values, top_feature_indices,
+            top_contributions, ood_mask, ood_flag); see `batch_to_explanations` for per-row dicts
+    """
+    try:
+        engine = get_engine(model_path, data_path)
+        batch = engine.explain_batch(X, top_k=top_k)
+        log_event('batch_scored', {
+            'n_transactions': len(batch['risk_score']),
+            'n_alerts': int(batch['alert_flag'].sum()),
+            'n_ood': int(batch['ood_flag'].sum())
         })
-
-        return explanation
+        return batch
 
     except Exception as e:
+        increment('errors')
         log_event('explanation_failed', {'error': str(e)})
         raise e
 
@@ -125,4 +71,4 @@ if __name__ == "__main__":
         'customer_age': 35
     }
     explanation = explain_transaction(sample_features)
-    print(explanation)
\ No newline at end of file
+    print(explanation)
@@ -0,0 +1,392 @@
+import gc
+import json
+import itertools
+import time
+import multiprocessing
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+from explainable_aml.config import CONFIG
+from explainable_aml.utils.logging import log_event
+from explainable_aml.utils.io import iter_frame_chunks
+from explainable_aml.utils.metrics import span
+from explainable_aml.utils.validation import validate_file_exists
+from explainable_aml.explainability.engine import RISK_BAND_EDGES, RISK_BAND_LABELS, get_engine
+
+REPORT_FORMAT_VERSION = 2
+
+# Quantiles of each contribution distribution written to the report
+REPORT_QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+
+
+def _report_settings() -> Dict[str, Any]:
+    settings = {'chunk_size': 50000, 'n_workers': 4, 'shap_buckets_per_doubling': 4, 'shap_min_abs': 1e-4,
+                'dependence_bins': 20, 'output_path': None}
+    settings.update(CONFIG.get('global_report', {}))
+    return settings
+
+
+def default_report_path(model_path: Optional[str] = None) -> Path:
+    """CONFIG['global_report']['output_path'], or 'global_report.json' next to the model bundle."""
+    output_path = _report_settings()['output_path']
+    if output_path is not None:
+        return Path(output_path)
+    return Path(model_path if model_path is not None else CONFIG['model_path']).parent / 'global_report.json'
+
+
+class GlobalShapAggregate:
+    """
+    Mergeable running summary of SHAP contributions over any number of rows.
+
+    Holds per-feature sums, per-risk-band contribution histograms and per-feature dependence
+    bins, so its size is O(features x bins) however many rows are added. Two aggregates
+    with the same bin edges merge by adding their arrays, which is how chunks scored in
+    different processes are combined. Values outside the bin edges land in the outer bins
+    and are counted as clipped; the exact minimum and maximum are kept separately.
+    """
+
+    def __init__(self, shap_edges: np.ndarray, value_edges: List[np.ndarray]):
+        """
+        Args:
+            shap_edges (ndarray): (F, n_bins + 1) contribution histogram edges per feature
+            value_edges (list): Increasing feature-value bin edges per feature, for the dependence curves
+        """
+        n_features, n_bands = len(value_edges), len(RISK_BAND_LABELS)
+        self.shap_edges = shap_edges
+        self.value_edges = value_edges
+        self.n_rows = 0
+        self.band_counts = np.zeros(n_bands, dtype=np.int64)
+        self.sum_abs = np.zeros((n_bands, n_features))
+        self.sum = np.zeros((n_bands, n_features))
+        self.min = np.full(n_features, np.inf)
+        self.max = np.full(n_features, -np.inf)
+        self.histograms = np.zeros((n_bands, n_features, shap_edges.shape[1] - 1), dtype=np.int64)
+        self.shap_clipped = np.zeros(n_features, dtype=np.int64)
+        self.dependence_clipped = np.zeros(n_features, dtype=np.int64)
+        self.dependence_counts = [np.zeros(len(e) - 1, dtype=np.int64) for e in value_edges]
+        self.dependence_value_sums = [np.zeros(len(e) - 1) for e in value_edges]
+        self.dependence_shap_sums = [np.zeros(len(e) - 1) for e in value_edges]
+
+    @staticmethod
+    def _bin(values: np.ndarray, edges: np.ndarray) -> np.ndarray:
+        """Bin index per value, with out-of-range values clipped into the outer bins."""
+        return np.clip(np.searchsorted(edges, values, side='right') - 1, 0, len(edges) - 2)
+
+    @staticmethod
+    def _n_outside(values: np.ndarray, edges: np.ndarray) -> int:
+        return int(np.count_nonzero((values < edges[0]) | (values > edges[-1])))
+
+    def update(self, X: np.ndarray, shap_values: np.ndarray, band_index: np.ndarray) -> None:
+        """
+        Add a block of rows.
+
+        Args:
+            X (ndarray): (N, F) feature values
+            shap_values (ndarray): (N, F) contributions
+            band_index (ndarray): (N,) index into RISK_BAND_LABELS per row
+        """
+        n_bins = self.histograms.shape[2]
+        self.n_rows += len(X)
+        self.band_counts += np.bincount(band_index, minlength=len(RISK_BAND_LABELS))
+        np.add.at(self.sum_abs, band_index, np.abs(shap_values))
+        np.add.at(self.sum, band_index, shap_values)
+        if len(X):
+            self.min = np.minimum(self.min, shap_values.min(axis=0))
+            self.max = np.maximum(self.max, shap_values.max(axis=0))
+
+        for j, edges in enumerate(self.value_edges):
+            shap_bins = self._bin(shap_values[:, j], self.shap_edges[j])
+            self.histograms[:, j, :] += np.bincount(band_index * n_bins + shap_bins,
+                                                    minlength=self.histograms.shape[0] * n_bins).reshape(-1, n_bins)
+            self.shap_clipped[j] += self._n_outside(shap_values[:, j], self.shap_edges[j])
+            self.dependence_clipped[j] += self._n_outside(X[:, j], edges)
+            value_bins = self._bin(X[:, j], edges)
+            self.dependence_counts[j] += np.bincount(value_bins, minlength=len(edges) - 1)
+            self.dependence_value_sums[j] += np.bincount(value_bins, weights=X[:, j], minlength=len(edges) - 1)
+            self.dependence_shap_sums[j] += np.bincount(value_bins, weights=shap_values[:, j], minlength=len(edges) - 1)
+
+    def merge(self, other: 'GlobalShapAggregate') -> 'GlobalShapAggregate':
+        """Add another aggregate built with the same edges into this one, and return self."""
+        self.n_rows += other.n_rows
+        self.band_counts += other.band_counts
+        self.sum_abs += other.sum_abs
+        self.sum += other.sum
+        self.min = np.minimum(self.min, other.min)
+        self.max = np.maximum(self.max, other.max)
+        self.histograms += other.histograms
+        self.shap_clipped += other.shap_clipped
+        self.dependence_clipped += other.dependence_clipped
+        for j in range(len(self.value_edges)):
+            self.dependence_counts[j] += other.dependence_counts[j]
+            self.dependence_value_sums[j] += other.dependence_value_sums[j]
+            self.dependence_shap_sums[j] += other.dependence_shap_sums[j]
+        return self
+
+    def to_dict(self, features: List[str]) -> Dict[str, Any]:
+        """
+        Summarize as plain JSON-serializable data, features ordered by mean |SHAP|.
+
+        Args:
+            features (list): Feature names in column order
+
+        Returns:
+            dict: rows, band_counts and one entry per feature with mean_abs_shap, mean_shap,
+                min/max_shap, clipped_shap, per-band mean/quantiles/histogram and the dependence curve
+        """
+        n = max(self.n_rows, 1)
+        mean_abs = self.sum_abs.sum(axis=0) / n
+        summaries = []
+        for rank, j in enumerate(np.argsort(-mean_abs, kind='stable'), start=1):
+            bands = {}
+            for b, band in enumerate(RISK_BAND_LABELS):
+                count = int(self.band_counts[b])
+                bands[band] = {
+                    'count': count,
+                    'mean_abs_shap': float(self.sum_abs[b, j] / count) if count else None,
+                    'mean_shap': float(self.sum[b, j] / count) if count else None,
+                    'quantiles': histogram_quantiles(self.histograms[b, j], self.shap_edges[j], REPORT_QUANTILES),
+                    'histogram': self.histograms[b, j].tolist(),
+                }
+            counts = self.dependence_counts[j]
+            summaries.append({
+                'feature': features[j],
+                'rank': rank,
+                'mean_abs_shap': float(mean_abs[j]),
+                'mean_shap': float(self.sum[:, j].sum() / n),
+                'min_shap': float(self.min[j]) if self.n_rows else None,
+                'max_shap': float(self.max[j]) if self.n_rows else None,
+                'shap_bin_edges': self.shap_edges[j].tolist(),
+                'clipped_shap': int(self.shap_clipped[j]),
+                'bands': bands,
+                'dependence': {
+                    'bin_edges': self.value_edges[j].tolist(),
+                    'count': counts.tolist(),
+                    'clipped': int(self.dependence_clipped[j]),
+                    'mean_value': [float(s / c) if c else None for s, c in zip(self.dependence_value_sums[j], counts)],
+                    'mean_shap': [float(s / c) if c else None for s, c in zip(self.dependence_shap_sums[j], counts)],
+                },
+            })
+        return {
+            'rows': int(self.n_rows),
+            'band_counts': {band: int(c) for band, c in zip(RISK_BAND_LABELS, self.band_counts)},
+            'features': summaries,
+        }
+
+
+def histogram_quantiles(counts: np.ndarray, edges: np.ndarray, quantiles: Tuple[float, ...]) -> Optional[Dict[str, float]]:
+    """
+    Estimate quantiles from a histogram by linear interpolation within bins.
+
+    Args:
+        counts (ndarray): Counts per bin
+        edges (ndarray): Bin edges, one more than counts
+        quantiles (tuple): Quantiles in [0, 1]
+
+    Returns:
+        dict: 'p05' -> value, ..., or None for an empty histogram
+    """
+    total = counts.sum()
+    if total == 0:
+        return None
+    cumulative = np.concatenate([[0], np.cumsum(counts)]) / total
+    # np.interp needs strictly increasing x; empty bins repeat the cumulative value
+    keep = np.concatenate([[True], np.diff(cumulative) > 0])
+    values = np.interp(quantiles, cumulative[keep], edges[keep])
+    return {f'p{int(round(q * 100)):02d}': float(v) for q, v in zip(quantiles, values)}
+
+
+def contribution_bounds(booster: xgb.Booster, features: List[str]) -> np.ndarray:
+    """
+    Upper bound on |SHAP contribution| per feature, read from the trees alone.
+
+    Within one tree, a feature's TreeSHAP value (path-dependent or interventional) averages
+    differences of two expected leaf values, so it lies within the tree's leaf range, and it
+    is zero in trees that never split on the feature. Summing the leaf ranges of the trees
+    that use each feature therefore bounds its contribution for any input.
+
+    Args:
+        booster (Booster): The bundle's model
+        features (list): Feature names in column order
+
+    Returns:
+        ndarray: (F,) bounds in log-odds space
+    """
+    trees = booster.trees_to_dataframe()
+    leaves = trees['Feature'] == 'Leaf'
+    leaf_range = trees[leaves].groupby('Tree')['Gain'].agg(lambda g: g.max() - g.min())
+    names = booster.feature_names or [f'f{j}' for j in range(len(features))]
+    splits = trees.loc[~leaves, ['Tree', 'Feature']].drop_duplicates()
+    per_feature = splits.assign(range=splits['Tree'].map(leaf_range)).groupby('Feature')['range'].sum()
+    return np.array([per_feature.get(name, 0.0) for name in names], dtype=np.float64)
+
+
+def contribution_edges(bounds: np.ndarray, buckets_per_doubling: int, min_abs: float) -> np.ndarray:
+    """
+    Data-independent contribution histogram edges per feature.
+
+    Edges are symmetric around zero and log-spaced, buckets_per_doubling buckets per doubling
+    of |value| (like the latency histograms in utils/metrics.py), from min_abs out to at least
+    the feature's bound. The middle bin [-min_abs, min_abs] holds the near-zero contributions.
+    Every feature gets the same number of bins, so the aggregate's arrays stay rectangular.
+
+    Args:
+        bounds (ndarray): (F,) bounds from `contribution_bounds`
+        buckets_per_doubling (int): Resolution; 4 gives buckets ~19% wide
+        min_abs (float): Half-width of the zero bin
+
+    Returns:
+        ndarray: (F, n_bins + 1) increasing edges
+    """
+    n_side = max(int(np.ceil(np.log2(max(bounds.max(), min_abs) / min_abs) * buckets_per_doubling)), 1)
+    positive = min_abs * 2 ** (np.arange(n_side + 1) / buckets_per_doubling)
+    edges = np.concatenate([-positive[::-1], positive])
+    return np.tile(edges, (len(bounds), 1))
+
+
+def _value_edges(X: np.ndarray, dependence_bins: int) -> List[np.ndarray]:
+    """
+    Dependence-curve edges from a sample of rows: quantiles of the feature values, so each
+    bin holds a similar share of the data; features with few distinct values get fewer bins.
+    """
+    value_edges = []
+    for j in range(X.shape[1]):
+        edges = np.unique(np.quantile(X[:, j], np.linspace(0, 1, dependence_bins + 1)))
+        if len(edges) < 2:
+            edges = np.array([edges[0], edges[0] + 1.0])
+        value_edges.append(edges)
+    return value_edges
+
+
+def _aggregate_chunk(df: pd.DataFrame, shap_edges: np.ndarray, value_edges: List[np.ndarray],
+                     model_path: Optional[str], data_path: Optional[str]) -> GlobalShapAggregate:
+    """Worker task: explain one chunk and return its aggregate."""
+    engine = get_engine(model_path, data_path)
+    X = engine._as_matrix(df)
+    batch = engine.score_batch(X, track_drift=False)  # Historical data is not live traffic
+    with span('shap'):
+        shap_values = engine._compute_shap_values(X)  # Bypasses the explanation cache: rows are not revisited
+    band_index = np.searchsorted(RISK_BAND_EDGES, batch['risk_score'], side='right')
+
+    aggregate = GlobalShapAggregate(shap_edges, value_edges)
+    aggregate.update(X, shap_values, band_index)
+    return aggregate
+
+
+def build_global_report(input_path: Union[str, Path], output_path: Optional[Union[str, Path]] = None,
+                        model_path: Optional[str] = None, data_path: Optional[str] = None,
+                        chunk_size: Optional[int] = None, n_workers: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Explain a whole CSV/Parquet dataset in chunks and summarize its SHAP contributions globally.
+
+    Chunks are explained across a pool of processes forked from a warm engine, and each
+    returns a GlobalShapAggregate; the parent merges them as they finish. Memory is bounded
+    by the chunks in flight plus O(features x bins) for the aggregate, regardless of the
+    dataset size. Contribution histogram edges come from the model (see `contribution_bounds`),
+    so no contribution of any chunk falls outside them; dependence-curve edges are fixed from
+    the first chunk's feature values. The rows are historical, so they are not counted into
+    the engine's drift monitor.
+
+    Args:
+        input_path: CSV or Parquet file of transactions
+        output_path: JSON report to write, defaults to default_report_path()
+        model_path: Path to the model bundle
+        data_path: Path to background data for SHAP (legacy bundles only)
+        chunk_size: Rows per chunk, defaults to CONFIG['global_report']['chunk_size']
+        n_workers: Worker processes, defaults to CONFIG['global_report']['n_workers']; 1 runs in-process
+
+    Returns:
+        dict: The report - model_version, input_path, generated_at, seconds, rows, band_counts and features
+    """
+    settings = _report_settings()
+    if chunk_size is None:
+        chunk_size = settings['chunk_size']
+    if n_workers is None:
+        n_workers = settings['n_workers']
+    if output_path is None:
+        output_path = default_report_path(model_path)
+
+    input_path, output_path = Path(input_path), Path(output_path)
+    start = time.perf_counter()
+
+    try:
+        validate_file_exists(input_path)
+        engine = get_engine(model_path, data_path)
+        engine.warm_up()
+        chunks = iter_frame_chunks(input_path, chunk_size, columns=engine.features)
+
+        first = next(chunks, None)
+        if first is None:
+            raise ValueError(f"No transactions in {input_path}")
+        shap_edges = contribution_edges(contribution_bounds(engine.model.get_booster(), engine.features),
+                                        settings['shap_buckets_per_doubling'], settings['shap_min_abs'])
+        value_edges = _value_edges(engine._as_matrix(first), settings['dependence_bins'])
+        chunks = itertools.chain([first], chunks)
+
+        aggregate = GlobalShapAggregate(shap_edges, value_edges)
+        args = (shap_edges, value_edges, model_path, data_path)
+        if n_workers <= 1:
+            for df in chunks:
+                aggregate.merge(_aggregate_chunk(df, *args))
+        else:
+            # Fork from the warm engine so workers share the model copy-on-write
+            gc.freeze()
+            max_in_flight = 2 * n_workers
+            try:
+                with ProcessPoolExecutor(max_workers=n_workers, mp_context=multiprocessing.get_context('fork')) as pool:
+                    pending = set()
+                    for df in chunks:
+                        pending.add(pool.submit(_aggregate_chunk, df, *args))
+                        if len(pending) >= max_in_flight:
+                            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                            for future in done:
+                                aggregate.merge(future.result())
+                    for future in pending:
+                        aggregate.merge(future.result())
+            finally:
+                gc.unfreeze()  # Objects frozen for the fork are collectable again once the workers are gone
+
+        report = {
+            'format_version': REPORT_FORMAT_VERSION,
+            'model_version': engine.model_version,
+            'backend': engine.backend,
+            'input_path': str(input_path),
+            'generated_at': datetime.now().isoformat(),
+            'seconds': time.perf_counter() - start,
+            **aggregate.to_dict(engine.features),
+        }
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = output_path.with_name(f'{output_path.name}.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(report, f)
+        tmp_path.replace(output_path)
+
+        log_event('global_report_built', {
+            'input_path': str(input_path),
+            'output_path': str(output_path),
+            'model_version': engine.model_version,
+            'rows': report['rows'],
+            'seconds': report['seconds'],
+        })
+        return report
+
+    except Exception as e:
+        log_event('global_report_failed', {'input_path': str(input_path), 'error': str(e)})
+        raise e
+
+
+def load_global_report(path: Optional[Union[str, Path]] = None) -> Dict[str, Any]:
+    """
+    Read a report written by build_global_report.
+
+    Args:
+        path: Report file, defaults to default_report_path()
+
+    Returns:
+        dict: The report
+    """
+    with open(path if path is not None else default_report_path(), 'r') as f:
+        return json.load(f)
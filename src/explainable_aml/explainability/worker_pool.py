@@ -0,0 +1,350 @@
+import gc
+import os
+import time
+import threading
+import multiprocessing
+from collections import deque
+from concurrent.futures import Future
+from multiprocessing.connection import Connection, wait
+from typing import Any, Deque, Dict, Iterable, Iterator, List, Optional, Tuple
+import numpy as np
+from explainable_aml.config import CONFIG
+from explainable_aml.utils.logging import log_event
+from explainable_aml.utils.metrics import increment
+from explainable_aml.explainability.engine import ScoringEngine, EngineManager, get_engine_manager
+
+# Engine methods a worker can run on a batch
+WORKER_METHODS = ('score_batch', 'explain_batch', 'screen_batch')
+
+# Seconds the collector waits for results before re-checking worker liveness
+_POLL_SECONDS = 0.5
+
+
+class WorkerCrashed(RuntimeError):
+    """A scoring worker died while running a batch."""
+
+
+def _private_mb(pid: int) -> Optional[float]:
+    """Memory held by this process alone, i.e. not shared copy-on-write; None where /proc is unavailable."""
+    try:
+        with open(f'/proc/{pid}/smaps_rollup', 'r') as f:
+            kb = sum(int(line.split()[1]) for line in f if line.startswith(('Private_Clean:', 'Private_Dirty:')))
+        return kb / 1024
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def _worker_main(engine: ScoringEngine, conn: Connection) -> None:
+    """Forked worker loop: the engine, booster and background are the parent's pages, shared copy-on-write."""
+    # Parallelism comes from the processes, so each one runs single-threaded
+    engine.model.set_params(n_jobs=1)
+    if engine.backend == 'xgboost':
+        engine.booster.set_param('nthread', 1)
+    # Drift counts go back to the parent with each result, which merges and checks them
+    if engine.drift is not None:
+        engine.drift = engine.drift.worker_copy()
+
+    while True:
+        try:
+            message = conn.recv()
+        except EOFError:
+            break
+        if message is None:
+            break
+        task_id, method, X, kwargs = message
+        start = time.perf_counter()
+        try:
+            ok, payload = True, getattr(engine, method)(X, **kwargs)
+        except Exception as e:
+            ok, payload = False, f"{type(e).__name__}: {e}"
+        drift = engine.drift.drain() if engine.drift is not None else None
+        conn.send((task_id, ok, payload, time.perf_counter() - start, drift))
+
+
+class _Worker:
+    """Parent-side handle and health counters of one worker process."""
+
+    def __init__(self, worker_id: int, restarts: int = 0):
+        self.worker_id = worker_id
+        self.restarts = restarts
+        self.process: Optional[multiprocessing.process.BaseProcess] = None
+        self.conn: Optional[Connection] = None
+        self.model_version: Optional[str] = None
+        self.task: Optional[Tuple[int, int]] = None  # (task id, rows) in flight
+        self.retiring: Optional[str] = None  # Reason it will be replaced once idle
+        self.started_at = time.time()
+        self.tasks = 0
+        self.rows = 0
+        self.errors = 0
+        self.busy_seconds = 0.0
+        self.last_task_seconds: Optional[float] = None
+
+
+class ScoringWorkerPool:
+    """
+    Fork-based pool of scoring workers sharing one copy of the model.
+
+    The parent loads and warms the engine once, then forks the workers, so the booster,
+    explainer and background arrays are shared copy-on-write instead of loaded per process.
+    Each worker has its own pipe and runs one batch at a time; batches queue in the parent
+    and go to the next idle worker. `submit` returns a Future and `map` yields results in
+    input order.
+
+    A worker that dies fails only its in-flight batch and is re-forked. Workers are also
+    replaced gracefully (after finishing their batch) every max_tasks_per_worker batches,
+    on `restart()`, and when the engine manager swaps in a new model version.
+    """
+
+    def __init__(self, engine: Optional[ScoringEngine] = None, n_workers: Optional[int] = None,
+                 max_tasks_per_worker: Optional[int] = None, manager: Optional[EngineManager] = None):
+        """
+        Args:
+            engine (ScoringEngine): Engine to share; defaults to the live engine of `manager`
+            n_workers (int): Worker processes, defaults to CONFIG['worker_pool']['n_workers'] or one per core
+            max_tasks_per_worker (int): Replace a worker after this many batches; None never does
+            manager (EngineManager): Followed for model swaps; defaults to `get_engine_manager()`
+                when no engine is given
+        """
+        settings = CONFIG.get('worker_pool', {})
+        if engine is None and manager is None:
+            manager = get_engine_manager()
+        self.manager = manager
+        self.engine = engine if engine is not None else manager.current()
+        self.n_workers = n_workers or settings.get('n_workers') or os.cpu_count() or 1
+        self.max_tasks_per_worker = max_tasks_per_worker or settings.get('max_tasks_per_worker')
+
+        self._context = multiprocessing.get_context('fork')
+        self._lock = threading.RLock()
+        self._pending: Deque[Tuple[int, str, np.ndarray, Dict[str, Any]]] = deque()
+        self._futures: Dict[int, Future] = {}
+        self._next_task_id = 0
+        self._closed = False
+
+        self.engine.warm_up()
+        self._workers: List[_Worker] = [self._fork(_Worker(i)) for i in range(self.n_workers)]
+        self._collector = threading.Thread(target=self._collect, name='scoring-pool-collector', daemon=True)
+        self._collector.start()
+
+    def __enter__(self) -> 'ScoringWorkerPool':
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def _fork(self, worker: _Worker) -> _Worker:
+        # Objects alive now are never visited by the worker's GC, so their pages stay shared.
+        # The child keeps them frozen; the parent unfreezes right after the fork, so repeated
+        # forks (respawns, model swaps) do not keep everything alive in the parent.
+        gc.freeze()
+        try:
+            parent_conn, child_conn = self._context.Pipe()
+            worker.process = self._context.Process(
+                target=_worker_main, args=(self.engine, child_conn),
+                name=f'scoring-worker-{worker.worker_id}', daemon=True)
+            worker.process.start()
+        finally:
+            gc.unfreeze()
+        child_conn.close()
+        worker.conn = parent_conn
+        worker.model_version = self.engine.model_version
+        return worker
+
+    def submit(self, X: np.ndarray, method: str = 'screen_batch', **kwargs: Any) -> Future:
+        """
+        Queue one batch for the next idle worker.
+
+        Args:
+            X (ndarray): (N, n_features) matrix in bundle feature order
+            method (str): Engine method to run, one of WORKER_METHODS
+            **kwargs: Passed to the method, e.g. top_k
+
+        Returns:
+            Future: Resolves to the method's batch dict
+        """
+        if method not in WORKER_METHODS:
+            raise ValueError(f"Unknown worker method '{method}'. Expected one of {WORKER_METHODS}")
+        future: Future = Future()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Worker pool is closed")
+            task_id = self._next_task_id
+            self._next_task_id += 1
+            self._futures[task_id] = future
+            self._pending.append((task_id, method, np.ascontiguousarray(X, dtype=np.float64), kwargs))
+            self._dispatch()
+        return future
+
+    def map(self, batches: Iterable[np.ndarray], method: str = 'screen_batch', **kwargs: Any) -> Iterator[Dict[str, Any]]:
+        """
+        Score batches across the workers, yielding results in input order.
+
+        At most two batches per worker are in flight, so memory stays bounded for long inputs.
+
+        Args:
+            batches: (N, n_features) matrices
+            method (str): Engine method to run, one of WORKER_METHODS
+            **kwargs: Passed to the method
+
+        Yields:
+            dict: One batch dict per input batch
+        """
+        window: Deque[Future] = deque()
+        for X in batches:
+            window.append(self.submit(X, method, **kwargs))
+            if len(window) >= 2 * self.n_workers:
+                yield window.popleft().result()
+        while window:
+            yield window.popleft().result()
+
+    def restart(self, reason: str = 'requested') -> None:
+        """Replace every worker once it finishes its current batch, e.g. to release leaked memory."""
+        with self._lock:
+            for worker in self._workers:
+                worker.retiring = worker.retiring or reason
+
+    def health(self) -> List[Dict[str, Any]]:
+        """
+        Per-worker health.
+
+        Returns:
+            list: One dict per worker with pid, alive, state ('idle', 'busy' or 'retiring'),
+                model_version, tasks, rows, errors, restarts, busy_seconds, last_task_seconds,
+                uptime_seconds and private_mb (memory not shared with the parent)
+        """
+        with self._lock:
+            workers = list(self._workers)
+        now = time.time()
+        return [{
+            'worker_id': w.worker_id,
+            'pid': w.process.pid,
+            'alive': w.process.is_alive(),
+            'state': 'busy' if w.task is not None else ('retiring' if w.retiring else 'idle'),
+            'model_version': w.model_version,
+            'tasks': w.tasks,
+            'rows': w.rows,
+            'errors': w.errors,
+            'restarts': w.restarts,
+            'busy_seconds': w.busy_seconds,
+            'last_task_seconds': w.last_task_seconds,
+            'uptime_seconds': now - w.started_at,
+            'private_mb': _private_mb(w.process.pid),
+        } for w in workers]
+
+    def close(self) -> None:
+        """Stop the workers after their current batch; queued batches fail."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            for task_id, _, _, _ in self._pending:
+                self._futures.pop(task_id).set_exception(RuntimeError("Worker pool is closed"))
+            self._pending.clear()
+        self._collector.join()
+        for worker in self._workers:
+            self._stop_worker(worker)
+
+    def _dispatch(self) -> None:
+        """Hand queued batches to idle workers. Called with the lock held."""
+        for worker in self._workers:
+            if not self._pending:
+                return
+            if worker.task is None and worker.retiring is None and worker.process.is_alive():
+                task_id, method, X, kwargs = self._pending.popleft()
+                worker.task = (task_id, len(X))
+                worker.conn.send((task_id, method, X, kwargs))
+
+    def _stop_worker(self, worker: _Worker) -> None:
+        try:
+            worker.conn.send(None)
+        except OSError:
+            pass
+        worker.process.join(timeout=5)
+        if worker.process.is_alive():
+            worker.process.terminate()
+            worker.process.join()
+        worker.conn.close()
+
+    def _replace(self, worker: _Worker) -> None:
+        """Swap a stopped or dead worker for a freshly forked one. Called with the lock held."""
+        index = self._workers.index(worker)
+        self._workers[index] = self._fork(_Worker(worker.worker_id, worker.restarts + 1))
+
+    def _maintain(self) -> None:
+        """
+        Follow model swaps and replace retiring workers that are idle.
+
+        Only the collector thread calls this (with the lock held), so no pipe is closed while
+        the collector is waiting on it.
+        """
+        if self.manager is not None and self.manager.current() is not self.engine:
+            self.engine = self.manager.current()
+            for worker in self._workers:
+                worker.retiring = worker.retiring or 'model_swap'
+
+        for worker in list(self._workers):
+            if worker.retiring is not None and worker.task is None and not self._closed:
+                self._stop_worker(worker)
+                log_event('scoring_worker_restarted', {
+                    'worker_id': worker.worker_id, 'pid': worker.process.pid, 'reason': worker.retiring})
+                self._replace(worker)
+        self._dispatch()
+
+    def _on_result(self, worker: _Worker, message: Tuple[int, bool, Any, float, Optional[Dict[str, Any]]]) -> None:
+        task_id, ok, payload, seconds, drift = message
+        if drift is not None and self.engine.drift is not None and worker.model_version == self.engine.model_version:
+            self.engine.drift.merge(drift)
+        _, n_rows = worker.task
+        worker.task = None
+        worker.tasks += 1
+        worker.rows += n_rows
+        worker.busy_seconds += seconds
+        worker.last_task_seconds = seconds
+        future = self._futures.pop(task_id)
+        if ok:
+            future.set_result(payload)
+        else:
+            worker.errors += 1
+            future.set_exception(RuntimeError(payload))
+        if self.max_tasks_per_worker is not None and worker.tasks >= self.max_tasks_per_worker:
+            worker.retiring = worker.retiring or 'max_tasks'
+
+    def _on_death(self, worker: _Worker) -> None:
+        worker.process.join()
+        increment('worker_crashes')
+        log_event('scoring_worker_crashed', {
+            'worker_id': worker.worker_id, 'pid': worker.process.pid, 'exitcode': worker.process.exitcode,
+            'task_id': worker.task[0] if worker.task is not None else None,
+        })
+        if worker.task is not None:
+            self._futures.pop(worker.task[0]).set_exception(WorkerCrashed(
+                f"Scoring worker {worker.worker_id} (pid {worker.process.pid}) exited with code {worker.process.exitcode}"))
+        worker.conn.close()
+        if not self._closed:
+            self._replace(worker)
+
+    def _collect(self) -> None:
+        """Collector thread: route results to futures, detect dead workers and keep the pool topped up."""
+        while True:
+            with self._lock:
+                if self._closed and not any(w.task is not None for w in self._workers):
+                    return
+                self._maintain()
+                handles = {w.conn: w for w in self._workers}
+                handles.update({w.process.sentinel: w for w in self._workers})
+
+            ready = wait(list(handles), timeout=_POLL_SECONDS)
+            with self._lock:
+                for handle in ready:
+                    worker = handles[handle]
+                    if worker not in self._workers:
+                        continue  # Already replaced through its other handle
+                    if handle is worker.conn:
+                        try:
+                            self._on_result(worker, worker.conn.recv())
+                            continue
+                        except (EOFError, OSError):
+                            pass
+                    elif worker.conn.poll():
+                        continue  # Read its last result first; the sentinel stays ready
+                    self._on_death(worker)
+                self._dispatch()
@@ -0,0 +1,209 @@
+import os
+import json
+import threading
+import numpy as np
+import pandas as pd
+from collections import OrderedDict
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, Dict, Hashable, Optional, Union
+from explainable_aml.config import CONFIG
+
+SNAPSHOT_FORMAT_VERSION = 1
+
+SECONDS_PER_DAY = 86400.0
+
+Timestamp = Union[datetime, date, str, np.datetime64, pd.Timestamp]
+
+
+def _as_datetime(timestamp: Timestamp) -> datetime:
+    if isinstance(timestamp, datetime):
+        return timestamp
+    if isinstance(timestamp, str):
+        return datetime.fromisoformat(timestamp)
+    if isinstance(timestamp, date):
+        return datetime(timestamp.year, timestamp.month, timestamp.day)
+    return pd.Timestamp(timestamp).to_pydatetime()
+
+
+class _CustomerState:
+    """Per-customer aggregates: O(1) memory and O(1) update."""
+
+    __slots__ = ('count', 'mean', 'day', 'day_count', 'last_seen')
+
+    def __init__(self, count: int = 0, mean: float = 0.0, day: int = 0, day_count: int = 0, last_seen: float = 0.0):
+        self.count = count
+        self.mean = mean
+        self.day = day  # Proleptic ordinal of the calendar day day_count refers to
+        self.day_count = day_count
+        self.last_seen = last_seen  # Event time (epoch seconds) of the latest transaction
+
+
+class CustomerFeatureEngine:
+    """
+    Derives the model's customer features from a live transaction feed.
+
+    For each customer it keeps the running mean transaction amount and the number of
+    transactions on the current calendar day, matching how the training data defines
+    amount_deviation (distance from the customer's average amount) and
+    transaction_frequency (the customer's transactions that day, this one included).
+    The deviation is measured against the mean of the customer's previous transactions;
+    a customer's first transaction has a deviation of 0.
+
+    Customers are kept in least-recently-updated order: beyond max_customers the oldest is
+    evicted, and `evict_idle` drops customers not seen for idle_days, so memory is bounded.
+    An evicted customer starts over on their next transaction.
+    """
+
+    def __init__(self, max_customers: Optional[int] = None, idle_days: Optional[float] = None):
+        """
+        Args:
+            max_customers (int): Customers kept in memory, defaults to CONFIG['feature_engine']['max_customers']
+            idle_days (float): Inactivity after which `evict_idle` drops a customer, defaults to
+                CONFIG['feature_engine']['idle_days']; None keeps idle customers
+        """
+        settings = CONFIG.get('feature_engine', {})
+        self.max_customers = max_customers if max_customers is not None else settings.get('max_customers', 1000000)
+        self.idle_days = idle_days if idle_days is not None else settings.get('idle_days')
+        self.evictions = 0
+        self._customers: 'OrderedDict[Hashable, _CustomerState]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._customers)
+
+    def __contains__(self, customer_id: Hashable) -> bool:
+        return customer_id in self._customers
+
+    def update(self, customer_id: Hashable, transaction_amount: float, timestamp: Timestamp,
+               country_risk: float, customer_age: float) -> Dict[str, Any]:
+        """
+        Fold one transaction into its customer's state and return its model features.
+
+        A transaction dated before the customer's current day (arriving late) counts itself
+        only and leaves the daily count alone.
+
+        Args:
+            customer_id: Customer key
+            transaction_amount (float): Amount of this transaction
+            timestamp: When it happened (datetime, date, ISO string or numpy/pandas timestamp)
+            country_risk (float): Risk score of the transaction country, passed through
+            customer_age (float): Age of the customer, passed through
+
+        Returns:
+            dict: The feature dict expected by explain_transaction
+        """
+        moment = _as_datetime(timestamp)
+        day = moment.toordinal()
+        amount = float(transaction_amount)
+
+        with self._lock:
+            state = self._customers.get(customer_id)
+            if state is None:
+                state = self._customers[customer_id] = _CustomerState()
+                if len(self._customers) > self.max_customers:
+                    self._customers.popitem(last=False)
+                    self.evictions += 1
+            else:
+                self._customers.move_to_end(customer_id)
+
+            deviation = abs(amount - state.mean) if state.count else 0.0
+            state.count += 1
+            state.mean += (amount - state.mean) / state.count
+
+            if day == state.day:
+                state.day_count += 1
+                frequency = state.day_count
+            elif day > state.day:
+                state.day, state.day_count = day, 1
+                frequency = 1
+            else:
+                frequency = 1
+            state.last_seen = max(state.last_seen, moment.timestamp())
+
+        return {
+            'transaction_amount': amount,
+            'amount_deviation': deviation,
+            'transaction_frequency': frequency,
+            'country_risk': float(country_risk),
+            'customer_age': customer_age,
+        }
+
+    def process(self, event: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        `update` from a raw transaction record.
+
+        Args:
+            event (dict): customer_id, transaction_amount, timestamp (or transaction_date),
+                country_risk and customer_age
+
+        Returns:
+            dict: The feature dict expected by explain_transaction
+        """
+        timestamp = event['timestamp'] if 'timestamp' in event else event['transaction_date']
+        return self.update(event['customer_id'], event['transaction_amount'], timestamp,
+                           event['country_risk'], event['customer_age'])
+
+    def evict_idle(self, now: Optional[Timestamp] = None) -> int:
+        """
+        Drop customers whose latest transaction is more than idle_days before now.
+
+        Args:
+            now: Reference time, defaults to the current time
+
+        Returns:
+            int: Customers evicted
+        """
+        if self.idle_days is None:
+            return 0
+        cutoff = _as_datetime(now if now is not None else datetime.now()).timestamp() - self.idle_days * SECONDS_PER_DAY
+        with self._lock:
+            idle = [customer_id for customer_id, state in self._customers.items() if state.last_seen < cutoff]
+            for customer_id in idle:
+                del self._customers[customer_id]
+            self.evictions += len(idle)
+        return len(idle)
+
+    def snapshot(self, path: Union[str, Path]) -> None:
+        """
+        Atomically write the state to a JSON file, least recently updated customer first.
+
+        Args:
+            path (Path): Snapshot file
+        """
+        with self._lock:
+            customers = [
+                [customer_id, s.count, s.mean, s.day, s.day_count, s.last_seen]
+                for customer_id, s in self._customers.items()
+            ]
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f'{path.name}.{os.getpid()}.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump({'format_version': SNAPSHOT_FORMAT_VERSION, 'customers': customers}, f)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def restore(cls, path: Union[str, Path], max_customers: Optional[int] = None,
+                idle_days: Optional[float] = None) -> 'CustomerFeatureEngine':
+        """
+        Build an engine from a snapshot written by `snapshot`.
+
+        Args:
+            path (Path): Snapshot file
+            max_customers (int): See __init__; the most recent customers are kept if the snapshot is larger
+            idle_days (float): See __init__
+
+        Returns:
+            CustomerFeatureEngine: Engine continuing from the snapshot
+        """
+        with open(path, 'r') as f:
+            snapshot = json.load(f)
+        if snapshot.get('format_version') != SNAPSHOT_FORMAT_VERSION:
+            raise ValueError(f"Unsupported feature snapshot format {snapshot.get('format_version')}")
+
+        engine = cls(max_customers, idle_days)
+        customers = snapshot['customers'][-engine.max_customers:] if engine.max_customers else []
+        for customer_id, count, mean, day, day_count, last_seen in customers:
+            engine._customers[customer_id] = _CustomerState(count, mean, day, day_count, last_seen)
+        return engine
@@ -0,0 +1,237 @@
+import os
+import glob
+import json
+import time
+import hashlib
+import shutil
+import functools
+import joblib
+import numpy as np
+import xgboost as xgb
+from pathlib import Path
+from typing import Dict, Any, Callable, Optional, Union
+from explainable_aml.utils.validation import validate_file_exists, validate_model_bundle
+
+# Bundle directory layout (format version 1):
+#   manifest.json     features, threshold, feature_ranges, training metadata and array specs
+#   model.ubj         XGBoost native UBJSON model
+#   background.npy    SHAP background sample, float32 (n, n_features)
+#   ood_stats.npy     OOD bounds, float64 (2, n_features): row 0 is min, row 1 is max
+BUNDLE_FORMAT_VERSION = 1
+MANIFEST_FILE = 'manifest.json'
+MODEL_FILE = 'model.ubj'
+
+# Suffixes that keep the legacy single-file joblib format
+LEGACY_SUFFIXES = ('.pkl', '.joblib')
+
+# Manifest metadata copied verbatim between the bundle dict and manifest.json
+MANIFEST_KEYS = ['features', 'threshold', 'feature_ranges', 'training_data_version', 'trained_at']
+
+# How long readers keep retrying a bundle that is missing because it is being replaced
+SWAP_WAIT_SECONDS = 2.0
+
+
+def _ood_stats(bundle: Dict[str, Any]) -> np.ndarray:
+    """Pack feature_ranges into a (2, n_features) array; missing ranges become -inf/inf."""
+    ranges = bundle.get('feature_ranges', {})
+    return np.array([
+        [ranges.get(f, {}).get('min', -np.inf) for f in bundle['features']],
+        [ranges.get(f, {}).get('max', np.inf) for f in bundle['features']],
+    ], dtype=np.float64)
+
+
+def _to_builtin(obj: Any) -> Any:
+    """Convert numpy scalars inside nested dicts/lists to plain Python for JSON."""
+    if isinstance(obj, dict):
+        return {k: _to_builtin(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_to_builtin(v) for v in obj]
+    if isinstance(obj, np.generic):
+        return obj.item()
+    return obj
+
+
+def _swap_in_progress(path: Path) -> bool:
+    """True while save_model_bundle has moved the previous bundle aside (see `save_model_bundle`)."""
+    return bool(glob.glob(str(path.parent / f"{glob.escape(path.name)}.old-*")))
+
+
+def _wait_for_swap(func: Callable) -> Callable:
+    """
+    Retry a bundle reader that hit FileNotFoundError while the bundle was being replaced.
+
+    At any moment of a replacement either the bundle path or its '.old-<pid>' copy exists,
+    so a missing path with neither is a genuinely missing bundle and raises at once.
+    """
+    @functools.wraps(func)
+    def wrapper(path: Union[str, Path], *args: Any, **kwargs: Any) -> Any:
+        deadline = time.monotonic() + SWAP_WAIT_SECONDS
+        while True:
+            try:
+                return func(path, *args, **kwargs)
+            except FileNotFoundError:
+                if time.monotonic() >= deadline or not (Path(path).exists() or _swap_in_progress(Path(path))):
+                    raise
+                time.sleep(0.01)
+    return wrapper
+
+
+def save_model_bundle(bundle: Dict[str, Any], path: Union[str, Path]) -> Path:
+    """
+    Save a model bundle, as a bundle directory unless the path has a legacy suffix.
+
+    The directory is written next to its destination and renamed into place, so readers
+    never observe a half-written bundle. Replacing an existing bundle takes two renames
+    (old bundle aside, new one in), and the path briefly does not exist in between; the
+    readers in this module (`load_model_bundle`, `read_manifest`, `bundle_signature`,
+    `model_version`) wait for the swap to finish instead of failing.
+
+    Args:
+        bundle: Bundle dict with model, features, threshold, feature_ranges, background and metadata
+        path: Destination directory, or a .pkl/.joblib file for the legacy format
+
+    Returns:
+        Path: Where the bundle was written
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    if path.suffix in LEGACY_SUFFIXES:
+        joblib.dump(bundle, path)
+        return path
+
+    tmp_path = path.with_name(f"{path.name}.tmp-{os.getpid()}")
+    if tmp_path.exists():
+        shutil.rmtree(tmp_path)
+    tmp_path.mkdir()
+
+    bundle['model'].save_model(str(tmp_path / MODEL_FILE))
+
+    arrays = {'ood_stats': _ood_stats(bundle)}
+    if bundle.get('background') is not None:
+        arrays['background'] = np.ascontiguousarray(bundle['background'], dtype=np.float32)
+
+    manifest = {'format_version': BUNDLE_FORMAT_VERSION, 'model_file': MODEL_FILE}
+    manifest.update({k: bundle[k] for k in MANIFEST_KEYS if k in bundle})
+    manifest.update({k: v for k, v in bundle.items() if k not in manifest and k not in arrays and k != 'model'})
+    manifest['arrays'] = {}
+    for name, array in arrays.items():
+        np.save(tmp_path / f"{name}.npy", array)
+        manifest['arrays'][name] = {'file': f"{name}.npy", 'dtype': str(array.dtype), 'shape': list(array.shape)}
+
+    validate_model_bundle(manifest)
+    with open(tmp_path / MANIFEST_FILE, 'w') as f:
+        json.dump(_to_builtin(manifest), f, indent=2)
+
+    # Swap the finished directory into place. Readers retry across the gap between the renames
+    if path.exists() or path.is_symlink():
+        old_path = path.with_name(f"{path.name}.old-{os.getpid()}")
+        os.rename(path, old_path)
+        os.rename(tmp_path, path)
+        if old_path.is_dir():
+            shutil.rmtree(old_path)
+        else:
+            old_path.unlink()
+    else:
+        os.rename(tmp_path, path)
+
+    return path
+
+
+@_wait_for_swap
+def read_manifest(path: Union[str, Path]) -> Dict[str, Any]:
+    """
+    Read and validate the manifest of a bundle directory without loading the model.
+
+    Args:
+        path: Bundle directory
+
+    Returns:
+        dict: Parsed manifest
+    """
+    manifest_path = Path(path) / MANIFEST_FILE
+    validate_file_exists(manifest_path)
+    with open(manifest_path, 'r') as f:
+        manifest = json.load(f)
+    validate_model_bundle(manifest)
+    return manifest
+
+
+@_wait_for_swap
+def load_model_bundle(path: Union[str, Path], mmap: bool = True) -> Dict[str, Any]:
+    """
+    Load a model bundle from a bundle directory, falling back to legacy joblib files.
+
+    Args:
+        path: Bundle directory or legacy .pkl file
+        mmap: Memory-map the .npy arrays read-only, so processes share one page-cache copy
+
+    Returns:
+        dict: model (XGBClassifier), features, threshold, feature_ranges, training metadata,
+            plus 'background' and 'ood_stats' arrays when present
+    """
+    path = Path(path)
+    validate_file_exists(path)
+
+    if not path.is_dir():
+        bundle = joblib.load(path)
+        validate_model_bundle(bundle)
+        return bundle
+
+    manifest = read_manifest(path)
+
+    model = xgb.XGBClassifier()
+    model.load_model(str(path / manifest['model_file']))
+
+    bundle = {k: v for k, v in manifest.items() if k != 'arrays'}
+    bundle['model'] = model
+    for name, spec in manifest.get('arrays', {}).items():
+        bundle[name] = np.load(path / spec['file'], mmap_mode='r' if mmap else None)
+    return bundle
+
+
+@_wait_for_swap
+def bundle_signature(path: Union[str, Path]) -> tuple:
+    """
+    Cheap change detector for a bundle: (inode, mtime_ns, size) of its manifest or legacy file.
+
+    Args:
+        path: Bundle directory or legacy file
+
+    Returns:
+        tuple: Signature that changes whenever the bundle is rewritten
+    """
+    path = Path(path)
+    if path.is_dir():
+        path = path / MANIFEST_FILE
+    stat = os.stat(path)
+    return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+
+@_wait_for_swap
+def model_version(path: Union[str, Path], bundle: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Content identity of a bundle's model: its trained_at plus a hash of the serialized model.
+
+    Unlike bundle_signature this survives copying the bundle, so it can key persisted caches.
+
+    Args:
+        path: Bundle directory or legacy file
+        bundle: The already loaded bundle, to avoid reading its metadata again
+
+    Returns:
+        str: '<trained_at>-<sha256 prefix>'
+    """
+    path = Path(path)
+    if path.is_dir():
+        manifest = read_manifest(path)
+        trained_at, model_file = manifest.get('trained_at'), path / manifest['model_file']
+    else:
+        trained_at = (bundle if bundle is not None else joblib.load(path)).get('trained_at')
+        model_file = path
+
+    digest = hashlib.sha256()
+    with open(model_file, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return f"{trained_at}-{digest.hexdigest()[:16]}"
@@ -0,0 +1,285 @@
+import json
+import time
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple, Union
+from sklearn.model_selection import train_test_split
+from explainable_aml.config import CONFIG
+from explainable_aml.utils.logging import log_event
+from explainable_aml.utils.io import iter_frame_chunks
+from explainable_aml.utils.validation import validate_file_exists
+from explainable_aml.model.bundle import load_model_bundle, save_model_bundle
+from explainable_aml.model.registry import get_model_registry
+from explainable_aml.model.train_model import LABEL
+
+# Per-threshold arrays returned by threshold_curves
+CURVE_COLUMNS = ('threshold', 'alerts', 'alert_rate', 'tp', 'fp', 'fn', 'precision', 'recall', 'cost')
+
+
+def _calibration_settings() -> Dict[str, Any]:
+    settings = {
+        'validation_path': None, 'chunk_size': 100000, 'alert_budget': None,
+        'min_recall': None, 'cost_false_positive': 1.0, 'cost_false_negative': 20.0, 'curve_points': 101,
+    }
+    settings.update(CONFIG.get('calibration', {}))
+    return settings
+
+
+def threshold_curves(y_true: np.ndarray, scores: np.ndarray, cost_false_positive: float = 1.0,
+                     cost_false_negative: float = 1.0) -> Dict[str, np.ndarray]:
+    """
+    Alert volume, precision, recall and cost at every distinct threshold, from one sort.
+
+    Alerts are raised for score > threshold, as in scoring. Scores are sorted in descending
+    order once; a cumulative sum of the labels then gives the true positives above each
+    distinct score, so all curves come out of a single O(N log N) pass.
+
+    Args:
+        y_true (ndarray): (N,) 0/1 labels
+        scores (ndarray): (N,) model scores
+        cost_false_positive (float): Cost of one alert on a legitimate transaction (analyst review)
+        cost_false_negative (float): Cost of one missed laundering transaction
+
+    Returns:
+        dict: Arrays per candidate threshold, in increasing threshold order, keyed by CURVE_COLUMNS
+    """
+    y_true = np.asarray(y_true, dtype=np.int64)
+    scores = np.asarray(scores, dtype=np.float64)
+    order = np.argsort(-scores, kind='stable')
+    sorted_scores, sorted_labels = scores[order], y_true[order]
+
+    # Candidate thresholds are the distinct scores; at threshold v every row above v is alerted
+    first = np.flatnonzero(np.r_[True, sorted_scores[1:] != sorted_scores[:-1]])
+    tp_above = np.r_[0, np.cumsum(sorted_labels)]
+
+    alerts = first
+    tp = tp_above[first]
+    fp = alerts - tp
+    positives = int(tp_above[-1])
+    fn = positives - tp
+    precision = np.where(alerts > 0, tp / np.maximum(alerts, 1), 1.0)
+    recall = tp / positives if positives else np.zeros(len(tp))
+
+    curves = {
+        'threshold': sorted_scores[first],
+        'alerts': alerts,
+        'alert_rate': alerts / max(len(scores), 1),
+        'tp': tp,
+        'fp': fp,
+        'fn': fn,
+        'precision': precision,
+        'recall': recall,
+        'cost': cost_false_positive * fp + cost_false_negative * fn,
+    }
+    return {name: values[::-1] for name, values in curves.items()}
+
+
+def recommend_threshold(curves: Dict[str, np.ndarray], alert_budget: Optional[float] = None,
+                        min_recall: Optional[float] = None) -> Dict[str, Any]:
+    """
+    Pick a threshold from threshold_curves.
+
+    With an alert budget, the lowest threshold whose alert rate fits the budget (the most
+    recall the budget buys). With a recall target, the highest threshold that still reaches
+    it (the fewest alerts). With both, the highest threshold meeting the recall target within
+    the budget. With neither, the threshold of minimum cost.
+
+    Args:
+        curves (dict): Output of threshold_curves
+        alert_budget (float): Largest allowed fraction of transactions alerted
+        min_recall (float): Smallest acceptable recall
+
+    Returns:
+        dict: The chosen point - threshold, alerts, alert_rate, tp, fp, fn, precision, recall, cost
+
+    Raises:
+        ValueError: If no threshold satisfies the constraints
+    """
+    feasible = np.ones(len(curves['threshold']), dtype=bool)
+    if alert_budget is not None:
+        feasible &= curves['alert_rate'] <= alert_budget
+    if min_recall is not None:
+        feasible &= curves['recall'] >= min_recall
+    if not feasible.any():
+        raise ValueError(f"No threshold meets alert_budget={alert_budget} and min_recall={min_recall}")
+
+    candidates = np.flatnonzero(feasible)
+    if min_recall is not None:
+        index = candidates[-1]  # Highest qualifying threshold
+    elif alert_budget is not None:
+        index = candidates[0]  # Lowest threshold within the budget
+    else:
+        index = candidates[np.argmin(curves['cost'][candidates])]
+    return {name: curves[name][index].item() for name in CURVE_COLUMNS}
+
+
+def _curve_summary(curves: Dict[str, np.ndarray], n_points: int) -> Dict[str, list]:
+    """Curves thinned to about n_points thresholds, evenly spaced in alert rate, for reports and plots."""
+    targets = np.linspace(curves['alert_rate'].min(), curves['alert_rate'].max(), n_points)
+    # alert_rate decreases with the threshold, so search it reversed
+    reversed_rate = curves['alert_rate'][::-1]
+    positions = len(reversed_rate) - 1 - np.clip(np.searchsorted(reversed_rate, targets), 0, len(reversed_rate) - 1)
+    index = np.unique(positions)
+    return {name: curves[name][index].tolist() for name in CURVE_COLUMNS}
+
+
+def _held_out_scores(model: Any, features: list, path: Union[str, Path], eval_split: Optional[Dict[str, Any]],
+                     chunk_size: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Score a labelled file, keeping only the rows the bundle's training held out if eval_split is given.
+
+    A 'stratified' split (in-memory training and tuning) is redrawn with train_test_split on
+    the whole file; a 'chunked' split (streaming training) keeps the rows drawn into the eval
+    side by the RNG seeded on (seed, chunk index), chunk by chunk.
+    """
+    booster = model.get_booster()
+    if eval_split is not None and eval_split['method'] == 'stratified':
+        df = pd.read_csv(path)
+        _, X_eval, _, y_eval = train_test_split(df[features], df[LABEL], test_size=eval_split['test_size'],
+                                                random_state=eval_split['seed'], stratify=df[LABEL])
+        scores = booster.inplace_predict(X_eval.to_numpy(dtype=np.float64))
+        return y_eval.to_numpy(dtype=np.int64), scores.astype(np.float64)
+
+    if eval_split is not None:
+        chunk_size = eval_split['chunk_size']
+    labels, scores = [], []
+    for index, chunk in enumerate(iter_frame_chunks(path, chunk_size, columns=features + [LABEL])):
+        if eval_split is not None:
+            in_eval = np.random.default_rng([eval_split['seed'], index]).random(len(chunk)) < eval_split['eval_fraction']
+            chunk = chunk[in_eval]
+        if len(chunk):
+            scores.append(booster.inplace_predict(chunk[features].to_numpy(dtype=np.float64)))
+            labels.append(chunk[LABEL].to_numpy(dtype=np.int64))
+    if not scores:
+        raise ValueError(f"No labelled rows to calibrate on in {path}")
+    return np.concatenate(labels), np.concatenate(scores).astype(np.float64)
+
+
+def calibrate_threshold(model_path: Optional[str] = None, data_path: Optional[str] = None,
+                        output_path: Optional[str] = None, alert_budget: Optional[float] = None,
+                        min_recall: Optional[float] = None, curves_path: Optional[Union[str, Path]] = None,
+                        write: bool = True) -> Dict[str, Any]:
+    """
+    Recommend an alert threshold from held-out scores and write it into the bundle.
+
+    Without an explicit data_path, CONFIG['calibration']['validation_path'] is scored whole
+    if set; otherwise the rows of CONFIG['data_path'] that training held out are used,
+    redrawn from the eval split recorded in the bundle.
+
+    Args:
+        model_path (str): Bundle to calibrate, defaults to the active registry version or CONFIG['model_path']
+        data_path (str): Labelled CSV/Parquet file to score whole
+        output_path (str): Where to write the calibrated bundle, defaults to model_path
+        alert_budget (float): Largest fraction of transactions alerted, defaults to CONFIG['calibration']['alert_budget']
+        min_recall (float): Smallest acceptable recall, defaults to CONFIG['calibration']['min_recall']
+        curves_path (Path): JSON file for the thinned curves, defaults to
+            'threshold_curves.json' next to the bundle
+        write (bool): Write the threshold into the bundle; False only reports it
+
+    Returns:
+        dict: recommended (the chosen curve point), previous (alert_rate, precision and recall
+            at the bundle's current threshold), rows, positives, seconds and model_path
+
+    Raises:
+        ValueError: If calibrating on the training data of a bundle that does not record its eval split
+    """
+    registry = get_model_registry() if model_path is None and output_path is None else None
+    if model_path is None:
+        model_path = registry.active_path() if registry is not None else CONFIG['model_path']
+    if output_path is None:
+        output_path = model_path
+    if curves_path is None:
+        curves_path = Path(output_path).parent / 'threshold_curves.json'
+    settings = _calibration_settings()
+    if alert_budget is None:
+        alert_budget = settings['alert_budget']
+    if min_recall is None:
+        min_recall = settings['min_recall']
+
+    held_out = False
+    if data_path is None:
+        data_path = settings['validation_path']
+    if data_path is None:
+        data_path = CONFIG['data_path']
+        held_out = True
+
+    try:
+        start = time.perf_counter()
+        validate_file_exists(data_path)
+        bundle = load_model_bundle(model_path)
+        eval_split = None
+        if held_out:
+            # Scoring training rows would fit the threshold in-sample
+            eval_split = bundle.get('eval_split')
+            if eval_split is None:
+                raise ValueError(f"Bundle {model_path} does not record its eval split; set "
+                                 "calibration.validation_path or pass a held-out data_path")
+        y_true, scores = _held_out_scores(bundle['model'], bundle['features'], data_path, eval_split,
+                                          settings['chunk_size'])
+
+        curves = threshold_curves(y_true, scores, settings['cost_false_positive'], settings['cost_false_negative'])
+        recommended = recommend_threshold(curves, alert_budget, min_recall)
+        alerted = scores > bundle['threshold']
+        tp = int((alerted & (y_true == 1)).sum())
+        previous = {
+            'threshold': float(bundle['threshold']),
+            'alert_rate': float(alerted.mean()),
+            'precision': tp / int(alerted.sum()) if alerted.any() else 1.0,
+            'recall': tp / int(y_true.sum()) if y_true.any() else 0.0,
+        }
+
+        result: Dict[str, Any] = {
+            'recommended': recommended,
+            'previous': previous,
+            'alert_budget': alert_budget,
+            'min_recall': min_recall,
+            'rows': int(len(y_true)),
+            'positives': int(y_true.sum()),
+            'data_path': str(data_path),
+            'seconds': time.perf_counter() - start,
+            'model_path': str(output_path),
+        }
+
+        curves_path = Path(curves_path)
+        curves_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(curves_path, 'w') as f:
+            json.dump({**result, 'curves': _curve_summary(curves, settings['curve_points'])}, f)
+
+        if write:
+            new_bundle = {k: v for k, v in bundle.items() if k != 'ood_stats'}
+            new_bundle['threshold'] = recommended['threshold']
+            new_bundle['threshold_calibration'] = {
+                'calibrated_at': datetime.now().isoformat(),
+                'data_path': str(data_path),
+                'rows': result['rows'],
+                'alert_budget': alert_budget,
+                'min_recall': min_recall,
+                **{k: recommended[k] for k in ('alert_rate', 'precision', 'recall')},
+            }
+            if registry is not None:
+                result['version'] = registry.publish(new_bundle, activate=True)
+                result['model_path'] = str(registry.path(result['version']))
+            else:
+                save_model_bundle(new_bundle, output_path)
+
+        log_event('threshold_calibrated', {
+            'model_path': result['model_path'],
+            'written': write,
+            'previous_threshold': previous['threshold'],
+            'threshold': recommended['threshold'],
+            'alert_rate': recommended['alert_rate'],
+            'precision': recommended['precision'],
+            'recall': recommended['recall'],
+            'rows': result['rows'],
+        })
+        return result
+
+    except Exception as e:
+        log_event('threshold_calibration_failed', {'error': str(e)})
+        raise e
+
+
+if __name__ == "__main__":
+    print(calibrate_threshold())
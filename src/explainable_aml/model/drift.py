@@ -0,0 +1,294 @@
+import time
+import threading
+import numpy as np
+from typing import Any, Dict, List, Optional
+from explainable_aml.config import CONFIG
+from explainable_aml.utils.logging import log_event
+from explainable_aml.utils.metrics import increment
+
+# Name under which the model score is tracked next to the features
+SCORE_SERIES = 'risk_score'
+
+# Quantiles stored with each reference distribution
+REFERENCE_QUANTILES = (0.01, 0.05, 0.25, 0.5, 0.75, 0.95, 0.99)
+
+# Added to empty bins so PSI stays finite
+_PSI_EPSILON = 1e-4
+
+
+def _drift_settings() -> Dict[str, Any]:
+    settings = {
+        'enabled': True, 'bins': 10, 'reference_samples': 100000, 'window_seconds': 300, 'n_windows': 12,
+        'min_rows': 500, 'psi_threshold': 0.2, 'ks_threshold': 0.1, 'check_interval_seconds': 60,
+    }
+    settings.update(CONFIG.get('drift', {}))
+    return settings
+
+
+def _reference_series(values: np.ndarray, n_bins: int) -> Dict[str, Any]:
+    """Equal-frequency histogram of one column: interior cut points, counts per bin and quantiles."""
+    cuts = np.unique(np.quantile(values, np.linspace(0, 1, n_bins + 1)[1:-1]))
+    counts = np.bincount(np.searchsorted(cuts, values, side='right'), minlength=len(cuts) + 1)
+    return {
+        'cuts': cuts.tolist(),
+        'counts': counts.tolist(),
+        'quantiles': {f'p{int(round(q * 100)):02d}': float(v) for q, v in zip(REFERENCE_QUANTILES, np.quantile(values, REFERENCE_QUANTILES))},
+    }
+
+
+def build_drift_reference(X: np.ndarray, scores: np.ndarray, features: List[str], n_bins: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Summarize the training distribution of every feature and of the model score.
+
+    Each column gets equal-frequency bins (interior cut points at its quantiles), so the
+    reference is a compact, JSON-serializable set of histograms stored in the bundle manifest.
+    Values below the first or above the last cut fall in the open-ended outer bins.
+
+    Args:
+        X (ndarray): (N, F) training feature values
+        scores (ndarray): (N,) model scores on the same rows
+        features (list): Feature names in column order
+        n_bins (int): Bins per column, defaults to CONFIG['drift']['bins']
+
+    Returns:
+        dict: rows, bins and, per column (features plus 'risk_score'), cuts, counts and quantiles
+    """
+    if n_bins is None:
+        n_bins = _drift_settings()['bins']
+    X = np.asarray(X, dtype=np.float64)
+    series = {f: _reference_series(X[:, j], n_bins) for j, f in enumerate(features)}
+    series[SCORE_SERIES] = _reference_series(np.asarray(scores, dtype=np.float64), n_bins)
+    return {'rows': int(len(X)), 'bins': n_bins, 'series': series}
+
+
+def population_stability_index(expected: np.ndarray, actual: np.ndarray) -> float:
+    """
+    PSI between two histograms over the same bins: sum((a - e) * ln(a / e)) over bin proportions.
+
+    Args:
+        expected (ndarray): Reference counts per bin
+        actual (ndarray): Live counts per bin
+
+    Returns:
+        float: 0 for identical distributions; above 0.2 is conventionally a significant shift
+    """
+    e = np.maximum(expected / max(expected.sum(), 1), _PSI_EPSILON)
+    a = np.maximum(actual / max(actual.sum(), 1), _PSI_EPSILON)
+    return float(np.sum((a - e) * np.log(a / e)))
+
+
+def ks_statistic(expected: np.ndarray, actual: np.ndarray) -> float:
+    """
+    Kolmogorov-Smirnov distance evaluated at the bin boundaries: the largest gap between the two CDFs.
+
+    Args:
+        expected (ndarray): Reference counts per bin
+        actual (ndarray): Live counts per bin
+
+    Returns:
+        float: In [0, 1]
+    """
+    e = np.cumsum(expected) / max(expected.sum(), 1)
+    a = np.cumsum(actual) / max(actual.sum(), 1)
+    return float(np.max(np.abs(a - e)))
+
+
+class DriftMonitor:
+    """
+    Live histograms of scored traffic compared against a bundle's training reference.
+
+    Traffic is counted into the reference bins over a sliding horizon of n_windows windows of
+    window_seconds each, held as a ring of per-window count arrays: an update costs one
+    binary search per value, and memory is O(windows x columns x bins) however many rows are
+    scored. PSI and KS per column are computed on demand from the windows in the horizon.
+
+    Counts are plain per-window arrays, so monitors in different processes merge by
+    addition: a worker sends `drain()` to the parent, which `merge()`s it.
+    """
+
+    def __init__(self, reference: Dict[str, Any], window_seconds: Optional[float] = None,
+                 n_windows: Optional[int] = None):
+        """
+        Args:
+            reference (dict): Output of build_drift_reference, as stored in the bundle
+            window_seconds (float): Window length, defaults to CONFIG['drift']['window_seconds']
+            n_windows (int): Windows in the horizon, defaults to CONFIG['drift']['n_windows']
+        """
+        settings = _drift_settings()
+        self.reference = reference
+        self.window_seconds = window_seconds if window_seconds is not None else settings['window_seconds']
+        self.n_windows = n_windows if n_windows is not None else settings['n_windows']
+        self.min_rows = settings['min_rows']
+        self.psi_threshold = settings['psi_threshold']
+        self.ks_threshold = settings['ks_threshold']
+        self.check_interval_seconds = settings['check_interval_seconds']
+
+        self.series = list(reference['series'])
+        self._cuts = [np.asarray(reference['series'][s]['cuts'], dtype=np.float64) for s in self.series]
+        self._expected = [np.asarray(reference['series'][s]['counts'], dtype=np.float64) for s in self.series]
+        n_bins = max(len(c) for c in self._expected)
+
+        # Ring of windows: slot i holds the counts of window number _windows[i] (-1 when empty)
+        self._counts = np.zeros((self.n_windows, len(self.series), n_bins), dtype=np.int64)
+        self._windows = np.full(self.n_windows, -1, dtype=np.int64)
+        self._lock = threading.Lock()
+        self._last_check = 0.0
+        self._alerted: Optional[tuple] = None
+        self._alerted_at = 0.0
+
+    def worker_copy(self) -> 'DriftMonitor':
+        """
+        An empty monitor on the same reference for a worker process. It never checks or alerts
+        itself; its counts are meant to be drained to the parent's monitor.
+        """
+        monitor = DriftMonitor(self.reference, self.window_seconds, self.n_windows)
+        monitor.check_interval_seconds = float('inf')
+        return monitor
+
+    def _slot(self, window: int) -> Optional[int]:
+        """Ring slot of a window number, recycling a slot held by an older window. Called with the lock held."""
+        slot = window % self.n_windows
+        if self._windows[slot] != window:
+            if self._windows[slot] > window:
+                return None  # Older than the horizon
+            self._counts[slot] = 0
+            self._windows[slot] = window
+        return slot
+
+    def update(self, X: np.ndarray, scores: np.ndarray, now: Optional[float] = None) -> None:
+        """
+        Count a scored batch into the current window, and run `check` every check_interval_seconds.
+
+        Args:
+            X (ndarray): (N, F) feature values in reference feature order
+            scores (ndarray): (N,) model scores
+            now (float): Event time in epoch seconds, defaults to the current time
+        """
+        if now is None:
+            now = time.time()
+        columns = [X[:, j] for j in range(X.shape[1])] + [scores]
+        bins = [np.searchsorted(cuts, values, side='right') for cuts, values in zip(self._cuts, columns)]
+        n_bins = self._counts.shape[2]
+
+        with self._lock:
+            slot = self._slot(int(now // self.window_seconds))
+            if slot is not None:
+                for s, b in enumerate(bins):
+                    self._counts[slot, s] += np.bincount(b, minlength=n_bins)
+        self._check_if_due(now)
+
+    def _check_if_due(self, now: float) -> None:
+        with self._lock:
+            due = now - self._last_check >= self.check_interval_seconds
+            if due:
+                self._last_check = now
+        if due:
+            self.check(now)
+
+    def drain(self) -> Dict[str, Any]:
+        """
+        Return the counts held so far and clear them, for merging into another monitor.
+
+        Returns:
+            dict: window_seconds and {window number: (columns, bins) count list}
+        """
+        with self._lock:
+            state = {
+                'window_seconds': self.window_seconds,
+                'windows': {int(w): self._counts[i].tolist() for i, w in enumerate(self._windows) if w >= 0},
+            }
+            self._counts[:] = 0
+            self._windows[:] = -1
+        return state
+
+    def merge(self, state: Dict[str, Any]) -> None:
+        """
+        Add counts drained from another monitor built on the same reference, and run `check`
+        every check_interval_seconds.
+
+        Args:
+            state (dict): Output of `drain`
+        """
+        if state['window_seconds'] != self.window_seconds:
+            raise ValueError(f"Cannot merge drift windows of {state['window_seconds']}s into {self.window_seconds}s")
+        with self._lock:
+            for window, counts in state['windows'].items():
+                slot = self._slot(int(window))
+                if slot is not None:
+                    self._counts[slot] += np.asarray(counts, dtype=np.int64)
+        self._check_if_due(time.time())
+
+    def metrics(self, now: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Compare the traffic in the horizon ending now with the reference.
+
+        Args:
+            now (float): End of the horizon in epoch seconds, defaults to the current time
+
+        Returns:
+            dict: rows, horizon_seconds, per-column {psi, ks} under 'series', and 'drifted',
+                the columns over psi_threshold or ks_threshold (empty below min_rows)
+        """
+        if now is None:
+            now = time.time()
+        current = int(now // self.window_seconds)
+        with self._lock:
+            live = (self._windows > current - self.n_windows) & (self._windows <= current)
+            counts = self._counts[live].sum(axis=0)
+
+        rows = int(counts[0].sum()) if len(counts) else 0
+        series, drifted = {}, []
+        for s, name in enumerate(self.series):
+            expected = self._expected[s]
+            actual = counts[s, :len(expected)].astype(np.float64)
+            psi, ks = population_stability_index(expected, actual), ks_statistic(expected, actual)
+            series[name] = {'psi': psi, 'ks': ks}
+            if rows >= self.min_rows and (psi > self.psi_threshold or ks > self.ks_threshold):
+                drifted.append(name)
+        return {
+            'rows': rows,
+            'horizon_seconds': self.window_seconds * self.n_windows,
+            'series': series,
+            'drifted': drifted,
+        }
+
+    def check(self, now: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Compute `metrics` and log a 'drift_detected' event when columns drift.
+
+        The event is repeated when the set of drifted columns changes, or after a full horizon.
+
+        Args:
+            now (float): End of the horizon in epoch seconds, defaults to the current time
+
+        Returns:
+            dict: The metrics
+        """
+        if now is None:
+            now = time.time()
+        metrics = self.metrics(now)
+        drifted = tuple(metrics['drifted'])
+        with self._lock:
+            alert = bool(drifted) and (drifted != self._alerted or now - self._alerted_at >= metrics['horizon_seconds'])
+            if alert:
+                self._alerted, self._alerted_at = drifted, now
+            elif not drifted:
+                self._alerted = None
+        if alert:
+            increment('drift_alerts')
+            log_event('drift_detected', {
+                'drifted': list(drifted),
+                'rows': metrics['rows'],
+                'horizon_seconds': metrics['horizon_seconds'],
+                'psi_threshold': self.psi_threshold,
+                'ks_threshold': self.ks_threshold,
+                'series': {name: metrics['series'][name] for name in drifted},
+            })
+        return metrics
+
+
+def drift_monitor_for(bundle: Dict[str, Any]) -> Optional[DriftMonitor]:
+    """A DriftMonitor on the bundle's reference, or None if drift monitoring is disabled or the bundle has none."""
+    if not _drift_settings()['enabled'] or bundle.get('drift_reference') is None:
+        return None
+    return DriftMonitor(bundle['drift_reference'])
@@ -0,0 +1,335 @@
+import os
+import json
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+from sklearn.metrics import average_precision_score, log_loss, roc_auc_score
+from sklearn.model_selection import train_test_split
+from explainable_aml.config import CONFIG, PROJECT_ROOT
+from explainable_aml.utils.logging import log_event, flush_audit_log
+from explainable_aml.model.bundle import load_model_bundle, save_model_bundle, model_version
+from explainable_aml.model.registry import get_model_registry
+from explainable_aml.model.train_model import FEATURES, LABEL
+
+FEEDBACK_EVENT = 'feedback_provided'
+
+# Columns of the feedback store, in file order
+CASE_COLUMNS = ['timestamp'] + FEATURES + ['risk_score', 'alert_flag', 'feedback', LABEL]
+
+# Gate metrics where larger is better; log loss is the only one minimized
+GATE_METRICS = ('auc', 'aucpr', 'logloss')
+
+
+def _feedback_settings() -> Dict[str, Any]:
+    settings = {
+        'store_path': 'src/explainable_aml/data/feedback_cases.csv', 'min_cases': 20, 'rounds': 10,
+        'learning_rate': 0.05, 'holdout_fraction': 0.25, 'validation_path': None, 'tolerance': 0.01,
+    }
+    settings.update(CONFIG.get('feedback', {}))
+    return settings
+
+
+def _resolve(path: Union[str, Path]) -> Path:
+    path = Path(path)
+    return path if path.is_absolute() else PROJECT_ROOT / path
+
+
+def feedback_label(data: Dict[str, Any]) -> Optional[int]:
+    """
+    Turn an analyst's verdict on an assessment into a training label.
+
+    'Valid' confirms the model's alert decision, 'Invalid' flips it.
+
+    Args:
+        data (dict): Payload of a 'feedback_provided' event
+
+    Returns:
+        int: 1 for laundering, 0 otherwise, or None if the event carries no usable verdict
+    """
+    alert_flag = data.get('alert_flag')
+    if alert_flag is None or data.get('feedback') not in ('Valid', 'Invalid'):
+        return None
+    return int(bool(alert_flag)) if data['feedback'] == 'Valid' else 1 - int(bool(alert_flag))
+
+
+class FeedbackStore:
+    """
+    Labelled cases extracted from 'feedback_provided' audit events, kept in a CSV.
+
+    `sync` only reads what was logged since the previous sync: the plain log file is
+    resumed from a byte offset, the segmented store from a timestamp watermark (its
+    indexes skip older segments). The watermark lives in '<store>.state.json'.
+    """
+
+    def __init__(self, path: Optional[Union[str, Path]] = None, source: Optional[str] = None,
+                 log_path: Optional[Union[str, Path]] = None, audit_store_path: Optional[Union[str, Path]] = None):
+        """
+        Args:
+            path (Path): Cases CSV, defaults to CONFIG['feedback']['store_path']
+            source (str): 'file' or 'segmented', defaults to CONFIG['audit_log']['store']
+            log_path (Path): Plain audit log, defaults to CONFIG['log_path']
+            audit_store_path (Path): Segmented store, defaults to CONFIG['audit_store_path']
+        """
+        self.path = _resolve(path if path is not None else _feedback_settings()['store_path'])
+        self.state_path = self.path.with_name(f'{self.path.name}.state.json')
+        self.source = source or CONFIG.get('audit_log', {}).get('store', 'file')
+        self.log_path = Path(log_path if log_path is not None else CONFIG['log_path'])
+        self.audit_store_path = Path(audit_store_path if audit_store_path is not None else CONFIG['audit_store_path'])
+
+    def _read_state(self) -> Dict[str, Any]:
+        if not self.state_path.exists():
+            return {}
+        with open(self.state_path, 'r') as f:
+            return json.load(f)
+
+    def _write_state(self, state: Dict[str, Any]) -> None:
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.state_path.with_name(f'{self.state_path.name}.{os.getpid()}.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(state, f)
+        os.replace(tmp_path, self.state_path)
+
+    def _new_log_events(self, state: Dict[str, Any]) -> List[Dict[str, Any]]:
+        if not self.log_path.exists():
+            return []
+        stat = os.stat(self.log_path)
+        offset = state.get('log_offset', 0)
+        # A rotated or truncated log starts over
+        if state.get('log_inode') != stat.st_ino or stat.st_size < offset:
+            offset = 0
+
+        events = []
+        marker = f'"{FEEDBACK_EVENT}"'.encode()
+        with open(self.log_path, 'rb') as f:
+            f.seek(offset)
+            for raw_line in f:
+                if not raw_line.endswith(b'\n'):
+                    break  # Partially written record
+                offset += len(raw_line)
+                # Cheap substring test first; only candidate lines are parsed
+                if marker in raw_line:
+                    _, sep, payload = raw_line.partition(b' - INFO - ')
+                    event = json.loads(payload) if sep else None
+                    if event is not None and event['event_type'] == FEEDBACK_EVENT:
+                        events.append(event)
+        state.update(log_offset=offset, log_inode=stat.st_ino)
+        return events
+
+    def _new_store_events(self, state: Dict[str, Any]) -> List[Dict[str, Any]]:
+        from explainable_aml.utils.audit_store import query_events
+
+        if not self.audit_store_path.exists():
+            return []
+        watermark = state.get('store_through')
+        events = [e for e in query_events(self.audit_store_path, start=watermark, event_type=FEEDBACK_EVENT)
+                  if watermark is None or e['timestamp'] > watermark]
+        if events:
+            state['store_through'] = max(e['timestamp'] for e in events)
+        return events
+
+    def sync(self) -> int:
+        """
+        Append the labelled cases logged since the last sync.
+
+        Returns:
+            int: Number of new cases
+        """
+        flush_audit_log()
+        state = self._read_state()
+        if self.source == 'segmented':
+            events = self._new_store_events(state)
+        else:
+            events = self._new_log_events(state)
+
+        rows = []
+        for event in events:
+            data = event['data']
+            label = feedback_label(data)
+            features = data.get('features') or {}
+            if label is None or any(f not in features for f in FEATURES):
+                continue
+            rows.append({
+                'timestamp': event['timestamp'],
+                **{f: features[f] for f in FEATURES},
+                'risk_score': data.get('risk_score'),
+                'alert_flag': bool(data['alert_flag']),
+                'feedback': data['feedback'],
+                LABEL: label,
+            })
+
+        if rows:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            pd.DataFrame(rows, columns=CASE_COLUMNS).to_csv(
+                self.path, mode='a', header=not self.path.exists(), index=False)
+        self._write_state(state)
+        return len(rows)
+
+    def load(self, since: Optional[str] = None) -> pd.DataFrame:
+        """
+        Read the stored cases, keeping the latest verdict per feature vector.
+
+        Args:
+            since (str): Only cases logged after this ISO timestamp
+
+        Returns:
+            pd.DataFrame: Cases with CASE_COLUMNS, oldest first
+        """
+        if not self.path.exists():
+            return pd.DataFrame(columns=CASE_COLUMNS)
+        cases = pd.read_csv(self.path)
+        if since is not None:
+            cases = cases[cases['timestamp'] > since]
+        return cases.drop_duplicates(subset=FEATURES, keep='last').sort_values('timestamp', kind='mergesort')
+
+
+def _gate_metrics(model: xgb.XGBClassifier, X: pd.DataFrame, y: np.ndarray) -> Dict[str, float]:
+    scores = model.predict_proba(X)[:, 1]
+    metrics = {'logloss': float(log_loss(y, scores, labels=[0, 1]))}
+    if len(np.unique(y)) == 2:
+        metrics['auc'] = float(roc_auc_score(y, scores))
+        metrics['aucpr'] = float(average_precision_score(y, scores))
+    return metrics
+
+
+def _passes_gate(baseline: Dict[str, float], candidate: Dict[str, float], tolerance: float) -> bool:
+    for name in GATE_METRICS:
+        if name not in baseline:
+            continue
+        if name == 'logloss':
+            if candidate[name] > baseline[name] + tolerance:
+                return False
+        elif candidate[name] < baseline[name] - tolerance:
+            return False
+    return True
+
+
+def retrain_from_feedback(model_path: Optional[str] = None, output_path: Optional[str] = None,
+                          store: Optional[FeedbackStore] = None, rounds: Optional[int] = None,
+                          validation_path: Optional[str] = None, seed: int = 42) -> Dict[str, Any]:
+    """
+    Continue boosting the current model on feedback logged since it was trained.
+
+    New trees are added to the existing booster (a warm start) using only the new cases,
+    so an update takes seconds instead of a pass over the whole history. A share of the
+    cases is held out, and a new bundle version is only written if the updated model is not
+    worse than the current one on it by more than CONFIG['feedback']['tolerance'] in AUC,
+    average precision or log loss. A labelled validation_path file joins the hold-out, to
+    also catch forgetting of the original training distribution.
+
+    With a model registry configured and neither path given, the active version is updated
+    and an accepted update is published and activated as the next version.
+
+    Args:
+        model_path (str): Current bundle, defaults to the active registry version or CONFIG['model_path']
+        output_path (str): Where to write the new bundle version, defaults to model_path
+        store (FeedbackStore): Feedback source, defaults to the configured store
+        rounds (int): Boosting rounds to add, defaults to CONFIG['feedback']['rounds']
+        validation_path (str): Labelled CSV added to the hold-out, defaults to
+            CONFIG['feedback']['validation_path']
+        seed (int): Hold-out split seed
+
+    Returns:
+        dict: 'status' ('accepted', 'rejected' or 'skipped'), case counts, and for a gated
+            update the 'baseline' and 'candidate' hold-out metrics
+    """
+    registry = get_model_registry() if model_path is None and output_path is None else None
+    if model_path is None:
+        model_path = registry.active_path() if registry is not None else CONFIG['model_path']
+    if output_path is None:
+        output_path = model_path
+    settings = _feedback_settings()
+    if rounds is None:
+        rounds = settings['rounds']
+    if validation_path is None:
+        validation_path = settings['validation_path']
+    if store is None:
+        store = FeedbackStore()
+
+    try:
+        store.sync()
+        bundle = load_model_bundle(model_path)
+        cases = store.load(since=bundle.get('feedback_through'))
+        result: Dict[str, Any] = {'n_cases': len(cases), 'model_path': str(output_path)}
+
+        y = cases[LABEL].to_numpy(dtype=int)
+        if len(cases) < settings['min_cases'] or len(np.unique(y)) < 2:
+            result['status'] = 'skipped'
+            log_event('model_retrain_skipped', {**result, 'min_cases': settings['min_cases']})
+            return result
+
+        stratify = y if np.bincount(y).min() >= 2 else None
+        train_cases, holdout_cases = train_test_split(
+            cases, test_size=settings['holdout_fraction'], random_state=seed, stratify=stratify)
+        X_holdout, y_holdout = holdout_cases[FEATURES], holdout_cases[LABEL].to_numpy(dtype=int)
+        if validation_path is not None:
+            validation = pd.read_csv(validation_path)
+            X_holdout = pd.concat([X_holdout, validation[FEATURES]], ignore_index=True)
+            y_holdout = np.concatenate([y_holdout, validation[LABEL].to_numpy(dtype=int)])
+
+        # Warm start: xgb.train copies the base booster and appends new trees to the copy
+        base_model = bundle['model']
+        model_params = bundle.get('model_params', CONFIG['model_params'])
+        params = {
+            'objective': 'binary:logistic',
+            'tree_method': 'hist',
+            'learning_rate': settings['learning_rate'],
+            'max_depth': model_params.get('max_depth', 6),
+            'seed': seed,
+        }
+        dtrain = xgb.DMatrix(train_cases[FEATURES], label=train_cases[LABEL].to_numpy(dtype=int))
+        booster = xgb.train(params, dtrain, num_boost_round=rounds, xgb_model=base_model.get_booster())
+        model = xgb.XGBClassifier()
+        model.load_model(bytearray(booster.save_raw('ubj')))
+
+        baseline = _gate_metrics(base_model, X_holdout, y_holdout)
+        candidate = _gate_metrics(model, X_holdout, y_holdout)
+        accepted = _passes_gate(baseline, candidate, settings['tolerance'])
+        result.update(
+            status='accepted' if accepted else 'rejected',
+            n_train=len(train_cases),
+            n_holdout=len(y_holdout),
+            baseline=baseline,
+            candidate=candidate,
+        )
+        if not accepted:
+            log_event('model_retrain_rejected', result)
+            return result
+
+        # The updated model has seen the feedback cases, so they widen the OOD ranges
+        feature_ranges = {
+            f: {'min': min(r['min'], cases[f].min()), 'max': max(r['max'], cases[f].max())}
+            for f, r in bundle['feature_ranges'].items()
+        }
+        new_bundle = {k: v for k, v in bundle.items() if k != 'ood_stats'}
+        new_bundle.update({
+            'model': model,
+            'feature_ranges': feature_ranges,
+            'trained_at': datetime.now().isoformat(),
+            'parent_version': model_version(model_path, bundle),
+            'feedback_through': cases['timestamp'].max(),
+            'feedback_cases': bundle.get('feedback_cases', 0) + len(cases),
+            'model_params': {**model_params, 'n_estimators': booster.num_boosted_rounds()},
+        })
+        if registry is not None:
+            result['version'] = registry.publish(new_bundle, activate=True)
+            result['model_path'] = str(registry.path(result['version']))
+        else:
+            save_model_bundle(new_bundle, output_path)
+        log_event('model_retrained', {
+            **result,
+            'parent_version': new_bundle['parent_version'],
+            'feedback_through': new_bundle['feedback_through'],
+            'trained_at': new_bundle['trained_at'],
+        })
+        return result
+
+    except Exception as e:
+        log_event('model_retrain_failed', {'error': str(e)})
+        raise e
+
+
+if __name__ == "__main__":
+    print(retrain_from_feedback())
@@ -0,0 +1,124 @@
+import os
+import re
+import shutil
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+from explainable_aml.config import CONFIG, PROJECT_ROOT
+from explainable_aml.utils.logging import log_event
+from explainable_aml.model.bundle import save_model_bundle, read_manifest
+
+# Registry layout:
+#   versions/v0001/   immutable bundle directories, numbered in publish order
+#   ACTIVE            name of the version scoring processes should serve
+VERSIONS_DIR = 'versions'
+ACTIVE_FILE = 'ACTIVE'
+
+_VERSION_PATTERN = re.compile(r'^v(\d+)$')
+
+
+class ModelRegistry:
+    """
+    Local file-based registry of versioned model bundles with an 'active' pointer.
+
+    Published versions are never modified, so a process can keep serving an old version
+    while others move on. Publishing and activation are both atomic renames, so readers
+    never see a half-written bundle or pointer.
+    """
+
+    def __init__(self, root: Union[str, Path]):
+        """
+        Args:
+            root (Path): Registry directory
+        """
+        self.root = Path(root)
+        self.versions_dir = self.root / VERSIONS_DIR
+
+    def versions(self) -> List[str]:
+        """Published versions, oldest first."""
+        if not self.versions_dir.exists():
+            return []
+        names = [p.name for p in self.versions_dir.iterdir() if _VERSION_PATTERN.match(p.name)]
+        return sorted(names, key=lambda name: int(name[1:]))
+
+    def path(self, version: str) -> Path:
+        return self.versions_dir / version
+
+    def active_version(self) -> Optional[str]:
+        """The version named by the ACTIVE pointer, or None before the first activation."""
+        try:
+            return (self.root / ACTIVE_FILE).read_text().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def active_path(self) -> Path:
+        """
+        Bundle directory of the active version.
+
+        Raises:
+            FileNotFoundError: If no version has been activated
+        """
+        version = self.active_version()
+        if version is None:
+            raise FileNotFoundError(f"No active model version in registry {self.root}")
+        return self.path(version)
+
+    def publish(self, bundle: Union[str, Path, Dict[str, Any]], activate: bool = False) -> str:
+        """
+        Add a bundle as the next version.
+
+        Args:
+            bundle: A bundle directory to copy, or a bundle dict to save
+            activate: Also point ACTIVE at the new version
+
+        Returns:
+            str: The new version name, e.g. 'v0003'
+        """
+        self.versions_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.versions_dir / f'.publish-{os.getpid()}'
+        if tmp_path.exists():
+            shutil.rmtree(tmp_path)
+
+        if isinstance(bundle, dict):
+            save_model_bundle(bundle, tmp_path)
+        else:
+            read_manifest(bundle)  # Only bundle directories can be published
+            shutil.copytree(bundle, tmp_path)
+
+        # Claim the next number; renaming onto a version another process just took fails
+        while True:
+            existing = self.versions()
+            version = f"v{int(existing[-1][1:]) + 1 if existing else 1:04d}"
+            try:
+                os.rename(tmp_path, self.path(version))
+                break
+            except OSError:
+                if not self.path(version).exists():
+                    raise
+
+        log_event('model_published', {'registry': str(self.root), 'version': version})
+        if activate:
+            self.activate(version)
+        return version
+
+    def activate(self, version: str) -> None:
+        """
+        Atomically point ACTIVE at a published version; watching processes swap to it.
+
+        Args:
+            version (str): Published version name
+        """
+        read_manifest(self.path(version))
+        previous = self.active_version()
+        tmp_path = self.root / f'{ACTIVE_FILE}.{os.getpid()}.tmp'
+        tmp_path.write_text(version + '\n')
+        os.replace(tmp_path, self.root / ACTIVE_FILE)
+        log_event('model_activated', {'registry': str(self.root), 'version': version, 'previous_version': previous})
+
+
+def get_model_registry() -> Optional[ModelRegistry]:
+    """Return the registry configured at CONFIG['model_registry']['path'], or None if unset."""
+    path = CONFIG.get('model_registry', {}).get('path')
+    if path is None:
+        return None
+    path = Path(path)
+    return ModelRegistry(path if path.is_absolute() else PROJECT_ROOT / path)
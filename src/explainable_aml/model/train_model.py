@@ -1,15 +1,64 @@
+import os
 import pandas as pd
+import numpy as np
 import xgboost as xgb
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import classification_report
-import joblib
-import os
 from datetime import datetime
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Tuple
 from pathlib import Path
 from explainable_aml.utils.logging import log_event
 from explainable_aml.config import CONFIG
 from explainable_aml.utils.validation import validate_file_exists
+from explainable_aml.model.bundle import save_model_bundle
+from explainable_aml.model.drift import build_drift_reference
+from explainable_aml.utils.io import read_file_metadata, iter_frame_chunks
+
+FEATURES = ['transaction_amount', 'amount_deviation', 'transaction_frequency', 'country_risk', 'customer_age']
+LABEL = 'is_money_laundering'
+
+
+def stratified_background(X: pd.DataFrame, y: pd.Series, n_samples: int, random_state: int = 42) -> np.ndarray:
+    """
+    Draw a compact SHAP background sample that preserves the label mix of the training data.
+
+    Args:
+        X: Training features
+        y: Training labels
+        n_samples: Target background size (capped at len(X))
+        random_state: Seed for reproducible sampling
+
+    Returns:
+        np.ndarray: (n, n_features) float32 background array
+    """
+    n_samples = min(n_samples, len(X))
+    rng = np.random.default_rng(random_state)
+    labels, counts = np.unique(y.to_numpy(), return_counts=True)
+    allocation = _allocate_background(counts, n_samples)
+
+    y_values = y.to_numpy()
+    rows = np.concatenate([
+        rng.choice(np.flatnonzero(y_values == label), size=size, replace=False)
+        for label, size in zip(labels, allocation)
+    ])
+    return X.to_numpy(dtype=np.float32)[np.sort(rows)]
+
+def _allocate_background(counts: np.ndarray, n_samples: int) -> np.ndarray:
+    """Proportional allocation of n_samples rows per label, keeping at least one row of every label."""
+    allocation = np.maximum(1, np.round(counts / counts.sum() * n_samples)).astype(int)
+    allocation = np.minimum(allocation, counts)
+    while allocation.sum() > n_samples:
+        allocation[np.argmax(allocation)] -= 1
+    return allocation
+
+def _n_threads(n_jobs: Optional[int]) -> int:
+    return n_jobs if n_jobs and n_jobs > 0 else os.cpu_count()
+
+def _training_settings() -> Dict[str, Any]:
+    settings = {'mode': 'in_memory', 'chunk_size': 100000, 'n_jobs': -1, 'tree_method': 'hist', 'max_bin': 256,
+                'eval_fraction': 0.2}
+    settings.update(CONFIG.get('training', {}))
+    return settings
 
 def train_risk_model(data_path: Optional[str] = None, model_path: Optional[str] = None) -> Dict[str, Any]:
     if data_path is None:
@@ -22,19 +71,27 @@ def train_risk_model(data_path: Optional[str] = None, model_path: Optional[str]
     Features: transaction_amount, amount_deviation, transaction_frequency, country_risk, customer_age
     Target: is_money_laundering (binary)
 
-    Returns a bundle containing model, features, threshold, and training metadata.
+    Returns a bundle containing model, features, threshold, SHAP background, and training metadata.
+    With CONFIG['training']['mode'] set to 'streaming' the file is never loaded whole; see
+    `train_risk_model_streaming`.
     """
+    if _training_settings()['mode'] == 'streaming':
+        return train_risk_model_streaming(data_path, model_path)
+
     try:
         validate_file_exists(data_path)
 
         # Load data
         df = pd.read_csv(data_path)
-        data_version = df['data_version'].iloc[0] if 'data_version' in df.columns else 'unknown'
+        if 'data_version' in df.columns:
+            data_version = df['data_version'].iloc[0]
+        else:
+            data_version = read_file_metadata(data_path).get('data_version', 'unknown')
 
         # Select features
-        features = ['transaction_amount', 'amount_deviation', 'transaction_frequency', 'country_risk', 'customer_age']
+        features = FEATURES
         X = df[features]
-        y = df['is_money_laundering']
+        y = df[LABEL]
 
         # Compute feature ranges for OOD detection
         feature_ranges = {}
@@ -44,16 +101,30 @@ def train_risk_model(data_path: Optional[str] = None, model_path: Optional[str]
                 'max': X[feature].max()
             }
 
-        # Split data
-        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42, stratify=y)
+        # Split data; the split is recorded in the bundle so calibration can reuse the held-out rows
+        eval_split = {'method': 'stratified', 'test_size': 0.2, 'seed': 42}
+        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=eval_split['test_size'],
+                                                            random_state=eval_split['seed'], stratify=y)
 
         # Train XGBoost model
-        model = xgb.XGBClassifier(**CONFIG['model_params'])
+        settings = _training_settings()
+        model = xgb.XGBClassifier(**{
+            'tree_method': settings['tree_method'],
+            'n_jobs': _n_threads(settings['n_jobs']),
+            'max_bin': settings['max_bin'],
+            **CONFIG['model_params']
+        })
         model.fit(X_train, y_train)
 
-        # Evaluate
-        y_pred = model.predict(X_test)
-        print("Classification Report:")
+        # Compact SHAP background so inference needs no dataset I/O
+        background = stratified_background(X_train, y_train, CONFIG['shap_background_samples'])
+
+        # Reference distributions of features and scores for drift monitoring
+        drift_reference = build_drift_reference(X.to_numpy(dtype=np.float64), model.predict_proba(X)[:, 1], features)
+
+        # Evaluate at the threshold the bundle will alert on
+        y_pred = (model.predict_proba(X_test)[:, 1] > CONFIG['threshold']).astype(int)
+        print(f"Classification Report (threshold {CONFIG['threshold']}):")
         print(classification_report(y_test, y_pred))
 
         # Create model bundle
@@ -62,24 +133,220 @@ def train_risk_model(data_path: Optional[str] = None, model_path: Optional[str]
             "features": features,
             "threshold": CONFIG['threshold'],
             "feature_ranges": feature_ranges,
+            "background": background,
+            "drift_reference": drift_reference,
+            "eval_split": eval_split,
             "training_data_version": f"data_v{data_version}",
             "trained_at": datetime.now().isoformat()
         }
 
-        # Save bundle
-        os.makedirs(os.path.dirname(model_path), exist_ok=True)
-        joblib.dump(model_bundle, model_path)
-        print(f"Model bundle saved to {model_path}")
-
-        # Log model trained event
-        log_event('model_trained', {
-            'model_path': str(model_path),
-            'features': features,
-            'threshold': model_bundle['threshold'],
-            'training_data_version': model_bundle['training_data_version'],
-            'trained_at': model_bundle['trained_at']
+        save_trained_bundle(model_bundle, model_path)
+        return model_bundle
+
+    except Exception as e:
+        log_event('model_training_failed', {'error': str(e)})
+        raise e
+
+def save_trained_bundle(model_bundle: Dict[str, Any], model_path: str) -> None:
+    """Save a freshly trained bundle and log the 'model_trained' event."""
+    # Save bundle (directory format; a .pkl path keeps the legacy joblib file)
+    save_model_bundle(model_bundle, model_path)
+    print(f"Model bundle saved to {model_path}")
+
+    # Log model trained event
+    log_event('model_trained', {
+        'model_path': str(model_path),
+        'features': model_bundle['features'],
+        'threshold': model_bundle['threshold'],
+        'training_data_version': model_bundle['training_data_version'],
+        'trained_at': model_bundle['trained_at']
+    })
+
+class _ChunkIterator(xgb.DataIter):
+    """
+    Feeds one side of a seeded train/eval split of a chunked file to XGBoost.
+
+    Each row's side is drawn from an RNG seeded by (seed, chunk index), so every pass
+    XGBoost makes over the file sees the same split without it ever being stored. The
+    first pass over the training side also accumulates feature ranges, label counts,
+    a per-label uniform reservoir for the SHAP background and a uniform reservoir of all
+    rows for the drift reference.
+    """
+
+    def __init__(self, data_path: str, chunk_size: int, eval_fraction: float, subset: str,
+                 background_samples: int = 0, reference_samples: int = 0, seed: int = 42):
+        self.data_path = data_path
+        self.chunk_size = chunk_size
+        self.eval_fraction = eval_fraction
+        self.subset = subset
+        self.seed = seed
+        self.background_samples = background_samples
+        self.reference_samples = reference_samples
+        self._chunks = None
+        self._index = 0
+        self._first_pass = True
+
+        self.n_rows = 0
+        self.minimum = np.full(len(FEATURES), np.inf)
+        self.maximum = np.full(len(FEATURES), -np.inf)
+        self.label_counts: Dict[int, int] = {}
+        self._reservoirs: Dict[int, Tuple[np.ndarray, np.ndarray]] = {}
+        self._reference: Tuple[np.ndarray, np.ndarray] = (np.empty(0), np.empty((0, len(FEATURES))))
+        self._rng = np.random.default_rng(seed)
+        self._reference_rng = np.random.default_rng([seed, 1])
+        super().__init__()
+
+    def next(self, input_data) -> int:
+        if self._chunks is None:
+            self._chunks = iter_frame_chunks(self.data_path, self.chunk_size, columns=FEATURES + [LABEL])
+        for chunk in self._chunks:
+            in_eval = np.random.default_rng([self.seed, self._index]).random(len(chunk)) < self.eval_fraction
+            self._index += 1
+            if self._first_pass:
+                self._accumulate(chunk, ~in_eval)
+
+            rows = chunk[in_eval if self.subset == 'eval' else ~in_eval]
+            if len(rows):
+                input_data(data=rows[FEATURES], label=rows[LABEL].to_numpy())
+                return 1
+        return 0
+
+    def reset(self) -> None:
+        if self._chunks is not None:
+            self._first_pass = False
+        self._chunks = None
+        self._index = 0
+
+    def _accumulate(self, chunk: pd.DataFrame, in_train: np.ndarray) -> None:
+        # Feature ranges cover every row, as in the in-memory path; the background only training rows
+        X = chunk[FEATURES].to_numpy(dtype=np.float64)
+        self.n_rows += len(X)
+        self.minimum = np.minimum(self.minimum, X.min(axis=0))
+        self.maximum = np.maximum(self.maximum, X.max(axis=0))
+        if self.reference_samples:
+            self._reference = self._bottom_k(*self._reference, self._reference_rng.random(len(X)), X, self.reference_samples)
+        if not self.background_samples:
+            return
+
+        X, y = X[in_train], chunk[LABEL].to_numpy()[in_train]
+
+        # Bottom-k sampling: keep the rows with the smallest random keys, a uniform sample per label
+        keys = self._rng.random(len(X))
+        for label in np.unique(y):
+            label = int(label)
+            mask = y == label
+            self.label_counts[label] = self.label_counts.get(label, 0) + int(mask.sum())
+            held_keys, held_rows = self._reservoirs.get(label, (np.empty(0), np.empty((0, X.shape[1]))))
+            self._reservoirs[label] = self._bottom_k(held_keys, held_rows, keys[mask], X[mask], self.background_samples)
+
+    @staticmethod
+    def _bottom_k(held_keys: np.ndarray, held_rows: np.ndarray, keys: np.ndarray, rows: np.ndarray,
+                  k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Add rows to a reservoir and keep the k with the smallest keys."""
+        all_keys = np.concatenate([held_keys, keys])
+        all_rows = np.concatenate([held_rows, rows])
+        if len(all_keys) > k:
+            keep = np.argpartition(all_keys, k - 1)[:k]
+            all_keys, all_rows = all_keys[keep], all_rows[keep]
+        return all_keys, all_rows
+
+    def feature_ranges(self) -> Dict[str, Dict[str, float]]:
+        return {f: {'min': float(lo), 'max': float(hi)} for f, lo, hi in zip(FEATURES, self.minimum, self.maximum)}
+
+    def background(self, n_samples: int) -> np.ndarray:
+        """Stratified SHAP background drawn from the per-label reservoirs."""
+        labels = sorted(self._reservoirs)
+        counts = np.array([self.label_counts[label] for label in labels])
+        allocation = _allocate_background(counts, min(n_samples, int(counts.sum())))
+        rows = []
+        for label, size in zip(labels, allocation):
+            keys, sample = self._reservoirs[label]
+            rows.append(sample[np.argsort(keys)[:size]])
+        return np.concatenate(rows).astype(np.float32)
+
+    def reference_sample(self) -> np.ndarray:
+        """Uniform sample of all rows, for the drift reference."""
+        return self._reference[1]
+
+def train_risk_model_streaming(data_path: Optional[str] = None, model_path: Optional[str] = None,
+                               chunk_size: Optional[int] = None, n_jobs: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Train the risk model out of core: the data file is streamed in chunks and never held in memory.
+
+    XGBoost builds quantile-sketched QuantileDMatrix objects for the training side and the
+    held-out eval side by iterating the file, and trains with the hist tree method. Feature
+    ranges and the SHAP background come from the same pass.
+
+    Args:
+        data_path (str): CSV or Parquet training data, defaults to CONFIG['data_path']
+        model_path (str): Where to save the bundle, defaults to CONFIG['model_path']
+        chunk_size (int): Rows per chunk, defaults to CONFIG['training']['chunk_size']
+        n_jobs (int): Training threads, defaults to CONFIG['training']['n_jobs'] (-1 for all cores)
+
+    Returns:
+        dict: The saved model bundle
+    """
+    if data_path is None:
+        data_path = CONFIG['data_path']
+    if model_path is None:
+        model_path = CONFIG['model_path']
+    settings = _training_settings()
+    if chunk_size is None:
+        chunk_size = settings['chunk_size']
+    if n_jobs is None:
+        n_jobs = settings['n_jobs']
+
+    try:
+        validate_file_exists(data_path)
+        first_row = next(iter_frame_chunks(data_path, 1))
+        if 'data_version' in first_row.columns:
+            data_version = first_row['data_version'].iloc[0]
+        else:
+            data_version = read_file_metadata(data_path).get('data_version', 'unknown')
+
+        params = dict(CONFIG['model_params'])
+        n_estimators = params.pop('n_estimators', 100)
+        params.update({
+            'objective': 'binary:logistic',
+            'tree_method': settings['tree_method'],
+            'max_bin': settings['max_bin'],
+            'nthread': _n_threads(n_jobs),
+            'seed': params.pop('random_state', 42),
         })
 
+        train_iter = _ChunkIterator(str(data_path), chunk_size, settings['eval_fraction'], 'train',
+                                    background_samples=CONFIG['shap_background_samples'],
+                                    reference_samples=CONFIG.get('drift', {}).get('reference_samples', 100000))
+        eval_iter = _ChunkIterator(str(data_path), chunk_size, settings['eval_fraction'], 'eval')
+        dtrain = xgb.QuantileDMatrix(train_iter, max_bin=settings['max_bin'], nthread=params['nthread'])
+        deval = xgb.QuantileDMatrix(eval_iter, ref=dtrain, max_bin=settings['max_bin'], nthread=params['nthread'])
+
+        booster = xgb.train(params, dtrain, num_boost_round=n_estimators, evals=[(deval, 'eval')], verbose_eval=False)
+
+        # Wrap the booster in the classifier the bundle and engine expect
+        model = xgb.XGBClassifier()
+        model.load_model(bytearray(booster.save_raw('ubj')))
+
+        # Evaluate at the threshold the bundle will alert on
+        y_test = deval.get_label().astype(int)
+        y_pred = (booster.predict(deval) > CONFIG['threshold']).astype(int)
+        print(f"Classification Report (threshold {CONFIG['threshold']}):")
+        print(classification_report(y_test, y_pred))
+
+        reference_sample = train_iter.reference_sample()
+        model_bundle = {
+            "model": model,
+            "features": FEATURES,
+            "threshold": CONFIG['threshold'],
+            "feature_ranges": train_iter.feature_ranges(),
+            "background": train_iter.background(CONFIG['shap_background_samples']),
+            "drift_reference": build_drift_reference(reference_sample, booster.inplace_predict(reference_sample), FEATURES),
+            "eval_split": {'method': 'chunked', 'eval_fraction': settings['eval_fraction'],
+                           'chunk_size': chunk_size, 'seed': train_iter.seed},
+            "training_data_version": f"data_v{data_version}",
+            "trained_at": datetime.now().isoformat()
+        }
+        save_trained_bundle(model_bundle, model_path)
         return model_bundle
 
     except Exception as e:
@@ -0,0 +1,254 @@
+import os
+import json
+import time
+import shutil
+import tempfile
+import multiprocessing
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+from sklearn.model_selection import train_test_split
+from explainable_aml.config import CONFIG
+from explainable_aml.utils.logging import log_event
+from explainable_aml.utils.validation import validate_file_exists
+from explainable_aml.utils.io import read_file_metadata
+from explainable_aml.model.train_model import FEATURES, LABEL, stratified_background, save_trained_bundle
+from explainable_aml.model.drift import build_drift_reference
+
+# Evaluation metrics where larger is better; all others are minimized
+MAXIMIZED_METRICS = ('auc', 'aucpr', 'map', 'ndcg')
+
+DEFAULT_SEARCH_SPACE = {
+    'max_depth': [3, 4, 6, 8],
+    'learning_rate': [0.03, 0.1, 0.3],
+    'min_child_weight': [1, 5, 10],
+    'subsample': [0.7, 0.85, 1.0],
+    'colsample_bytree': [0.7, 1.0],
+}
+
+# Train/validation matrices of a worker process, loaded once from the binary cache
+_matrices: Optional[Tuple[xgb.DMatrix, xgb.DMatrix]] = None
+
+
+def _tuning_settings() -> Dict[str, Any]:
+    settings = {
+        'n_trials': 27, 'n_workers': 4, 'min_rounds': 25, 'max_rounds': 400, 'reduction_factor': 3,
+        'early_stopping_rounds': 20, 'metric': 'aucpr', 'search_space': DEFAULT_SEARCH_SPACE,
+    }
+    settings.update(CONFIG.get('tuning', {}))
+    return settings
+
+
+def sample_configurations(search_space: Dict[str, List[Any]], n_trials: int, seed: int = 42) -> List[Dict[str, Any]]:
+    """
+    Draw distinct parameter combinations from a grid, or the whole grid if it is smaller.
+
+    Args:
+        search_space: Parameter name -> candidate values
+        n_trials: Number of configurations
+        seed: Sampling seed
+
+    Returns:
+        list: Parameter dicts
+    """
+    names = sorted(search_space)
+    sizes = [len(search_space[name]) for name in names]
+    n_combinations = int(np.prod(sizes))
+    rng = np.random.default_rng(seed)
+    flat = rng.choice(n_combinations, size=min(n_trials, n_combinations), replace=False)
+
+    configurations = []
+    for index in flat:
+        positions = np.unravel_index(int(index), sizes)
+        configurations.append({name: search_space[name][int(p)] for name, p in zip(names, positions)})
+    return configurations
+
+
+def _load_matrices(cache_dir: str) -> None:
+    global _matrices
+    _matrices = (
+        xgb.DMatrix(os.path.join(cache_dir, 'train.buffer')),
+        xgb.DMatrix(os.path.join(cache_dir, 'valid.buffer')),
+    )
+
+
+def _evaluate(params: Dict[str, Any], num_rounds: int, early_stopping_rounds: int, metric: str,
+              nthread: int, seed: int) -> Dict[str, Any]:
+    """Worker task: train one configuration on the cached matrices and score it on the validation set."""
+    dtrain, dvalid = _matrices
+    start = time.perf_counter()
+    booster = xgb.train(
+        {**params, 'objective': 'binary:logistic', 'tree_method': 'hist', 'eval_metric': metric,
+         'nthread': nthread, 'seed': seed},
+        dtrain,
+        num_boost_round=num_rounds,
+        evals=[(dvalid, 'valid')],
+        early_stopping_rounds=early_stopping_rounds,
+        verbose_eval=False,
+    )
+    return {
+        'params': params,
+        'rounds': num_rounds,
+        'score': float(booster.best_score),
+        'best_iteration': int(booster.best_iteration),
+        'seconds': time.perf_counter() - start,
+    }
+
+
+def tune_risk_model(data_path: Optional[str] = None, model_path: Optional[str] = None,
+                    output_path: Optional[Union[str, Path]] = None, n_trials: Optional[int] = None,
+                    n_workers: Optional[int] = None, seed: int = 42) -> Dict[str, Any]:
+    """
+    Search hyperparameters with successive halving and save the winner as a standard bundle.
+
+    The train/validation DMatrix pair is built once and cached in XGBoost's binary format;
+    each worker process loads it a single time. Every rung trains all surviving
+    configurations with early stopping, then keeps the best 1/reduction_factor of them for
+    the next rung, whose round budget is reduction_factor times larger.
+
+    Args:
+        data_path (str): Training data, defaults to CONFIG['data_path']
+        model_path (str): Where to save the best bundle, defaults to CONFIG['model_path']
+        output_path (Path): JSON file for best params and leaderboard, defaults to
+            'tuning_results.json' next to the bundle
+        n_trials (int): Configurations in the first rung, defaults to CONFIG['tuning']['n_trials']
+        n_workers (int): Worker processes, defaults to CONFIG['tuning']['n_workers']
+        seed (int): Seed for sampling and training
+
+    Returns:
+        dict: best_params, best_score, metric, best_iteration, leaderboard and the saved bundle path
+    """
+    if data_path is None:
+        data_path = CONFIG['data_path']
+    if model_path is None:
+        model_path = CONFIG['model_path']
+    settings = _tuning_settings()
+    if n_trials is None:
+        n_trials = settings['n_trials']
+    if n_workers is None:
+        n_workers = settings['n_workers']
+    if output_path is None:
+        output_path = Path(model_path).parent / 'tuning_results.json'
+    metric = settings['metric']
+    maximize = metric in MAXIMIZED_METRICS
+
+    try:
+        validate_file_exists(data_path)
+        df = pd.read_csv(data_path)
+        if 'data_version' in df.columns:
+            data_version = df['data_version'].iloc[0]
+        else:
+            data_version = read_file_metadata(data_path).get('data_version', 'unknown')
+
+        X, y = df[FEATURES], df[LABEL]
+        X_train, X_valid, y_train, y_valid = train_test_split(X, y, test_size=0.2, random_state=seed, stratify=y)
+
+        cache_dir = tempfile.mkdtemp(prefix='aml-tune-')
+        try:
+            # Build the matrices once; workers load the binary cache instead of re-parsing data
+            dtrain = xgb.DMatrix(X_train, label=y_train)
+            dvalid = xgb.DMatrix(X_valid, label=y_valid)
+            dtrain.save_binary(os.path.join(cache_dir, 'train.buffer'))
+            dvalid.save_binary(os.path.join(cache_dir, 'valid.buffer'))
+            _load_matrices(cache_dir)
+
+            leaderboard: List[Dict[str, Any]] = []
+            candidates = sample_configurations(settings['search_space'], n_trials, seed)
+            nthread = max(1, (os.cpu_count() or 1) // max(1, n_workers))
+            budget = settings['min_rounds']
+            rung = 0
+
+            # Spawned workers: forking after XGBoost has started its OpenMP threads can deadlock
+            pool = None
+            if n_workers > 1:
+                pool = ProcessPoolExecutor(max_workers=n_workers, mp_context=multiprocessing.get_context('spawn'),
+                                           initializer=_load_matrices, initargs=(cache_dir,))
+            try:
+                while True:
+                    args = [(params, budget, settings['early_stopping_rounds'], metric, nthread, seed) for params in candidates]
+                    if pool is not None:
+                        results = list(pool.map(_evaluate, *zip(*args)))
+                    else:
+                        results = [_evaluate(*a) for a in args]
+                    for result in results:
+                        result['rung'] = rung
+                    leaderboard.extend(results)
+
+                    results.sort(key=lambda r: r['score'], reverse=maximize)
+                    if len(results) == 1 or budget >= settings['max_rounds']:
+                        break
+                    n_keep = max(1, len(results) // settings['reduction_factor'])
+                    candidates = [r['params'] for r in results[:n_keep]]
+                    budget = min(budget * settings['reduction_factor'], settings['max_rounds'])
+                    rung += 1
+            finally:
+                if pool is not None:
+                    pool.shutdown()
+
+            # Retrain the winner at full budget and keep only the trees up to its best iteration
+            best_params = results[0]['params']
+            final = xgb.train(
+                {**best_params, 'objective': 'binary:logistic', 'tree_method': 'hist', 'eval_metric': metric, 'seed': seed},
+                dtrain,
+                num_boost_round=settings['max_rounds'],
+                evals=[(dvalid, 'valid')],
+                early_stopping_rounds=settings['early_stopping_rounds'],
+                verbose_eval=False,
+            )
+            best_iteration, best_score = int(final.best_iteration), float(final.best_score)
+            booster = final[:best_iteration + 1]
+        finally:
+            shutil.rmtree(cache_dir, ignore_errors=True)
+
+        model = xgb.XGBClassifier()
+        model.load_model(bytearray(booster.save_raw('ubj')))
+
+        model_bundle = {
+            "model": model,
+            "features": FEATURES,
+            "threshold": CONFIG['threshold'],
+            "feature_ranges": {f: {'min': X[f].min(), 'max': X[f].max()} for f in FEATURES},
+            "background": stratified_background(X_train, y_train, CONFIG['shap_background_samples']),
+            "drift_reference": build_drift_reference(X.to_numpy(dtype=np.float64), model.predict_proba(X)[:, 1], FEATURES),
+            "eval_split": {'method': 'stratified', 'test_size': 0.2, 'seed': seed},
+            "training_data_version": f"data_v{data_version}",
+            "trained_at": datetime.now().isoformat(),
+            "model_params": {**best_params, 'n_estimators': best_iteration + 1},
+        }
+        save_trained_bundle(model_bundle, model_path)
+
+        leaderboard.sort(key=lambda r: (-r['rung'], -r['score'] if maximize else r['score']))
+        summary = {
+            'metric': metric,
+            'best_params': model_bundle['model_params'],
+            'best_score': best_score,
+            'best_iteration': best_iteration,
+            'model_path': str(model_path),
+            'leaderboard': leaderboard,
+        }
+        output_path = Path(output_path)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(output_path, 'w') as f:
+            json.dump(summary, f, indent=2)
+
+        log_event('model_tuned', {
+            'model_path': str(model_path),
+            'metric': metric,
+            'best_score': best_score,
+            'best_params': model_bundle['model_params'],
+            'n_evaluations': len(leaderboard),
+            'trained_at': model_bundle['trained_at'],
+        })
+        return summary
+
+    except Exception as e:
+        log_event('model_tuning_failed', {'error': str(e)})
+        raise e
+
+
+if __name__ == "__main__":
+    tune_risk_model()
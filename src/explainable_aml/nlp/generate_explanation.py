@@ -1,5 +1,53 @@
-from typing import Dict, Any
+import sys
+import functools
+import numpy as np
+import pandas as pd
+from typing import Dict, Any, Callable, List, Optional, Tuple, Union
+from explainable_aml.utils.metrics import timed
 
+GENERATOR_VERSION = "nlp_v1.1.0"
+
+# Contributions below this magnitude count as no influence at all
+ZERO_CONTRIBUTION = 1e-6
+
+# Fixed pieces of the narrative, shared by the single and batch generators
+_HEADER = "This transaction received a model risk score of "
+_FLAGGED = "Based on the configured threshold, the model flagged this transaction as higher risk. "
+_NOT_FLAGGED = "Based on the configured threshold, the model did not flag this transaction. "
+_OOD_PREFIX = "Warning: The following features have values outside the range observed during training: "
+_OOD_SUFFIX = ". As a result, the model's assessment may be unreliable. "
+_FACTORS = "The primary factors influencing this score were:\n"
+_NO_FACTORS = (
+    "The model assigned a low risk score, but none of the input features materially influenced this result. "
+    "This typically occurs when feature values fall outside the range observed during training, "
+    "limiting the model’s ability to assess risk reliably.\n"
+)
+
+# Indexed by sign + 1: negative, zero, positive contribution
+_SIGNS = ("NEG", "ZERO", "POS")
+_LINE_MIDDLES = tuple(
+    f" {direction} the model’s risk score by " for direction in ("decreased", "did not materially affect", "increased")
+)
+
+
+@functools.lru_cache(maxsize=1024)
+def _feature_template(feature: str) -> Tuple[str, Tuple[str, str, str]]:
+    """Line prefix and interned pattern tokens (by sign + 1) for one feature, built once per name."""
+    line_head = f"- The feature '{feature.replace('_', ' ')}' with a value of "
+    tokens = tuple(sys.intern(f"{sign}_{feature.upper()}") for sign in _SIGNS)
+    return line_head, tokens
+
+
+@functools.lru_cache(maxsize=256)
+def _band_sentence(risk_band: str, alert_flag: bool) -> str:
+    return f" ({risk_band} risk band). " + (_FLAGGED if alert_flag else _NOT_FLAGGED)
+
+
+def _ood_sentence(ood_features: List[str]) -> str:
+    return _OOD_PREFIX + ', '.join(ood_features) + _OOD_SUFFIX
+
+
+@timed('nlp')
 def generate_nlp_explanation(explanation: Dict[str, Any], transaction_features: Dict[str, Any]) -> Dict[str, Any]:
     """
     Generate a plain-English explanation from SHAP attributions.
@@ -15,87 +63,203 @@ def generate_nlp_explanation(explanation: Dict[str, Any], transaction_features:
     alert_flag = explanation["alert_flag"]
     risk_band = explanation.get("risk_band", "Unknown")
     top_features = explanation["top_features"]
-    ood_flag = explanation.get("ood_flag", False)
-    ood_features = explanation.get("ood_features", [])
-
-    # ---- Explanation header ----
-    explanation_text = (
-        f"This transaction received a model risk score of {risk_score:.4f} ({risk_band} risk band). "
-    )
-
-    if alert_flag:
-        explanation_text += (
-            "Based on the configured threshold, the model flagged this transaction as higher risk. "
-        )
-    else:
-        explanation_text += (
-            "Based on the configured threshold, the model did not flag this transaction. "
-        )
-
-    # ---- OOD Warning ----
-    if ood_flag:
-        explanation_text += (
-            f"Warning: The following features have values outside the range observed during training: {', '.join(ood_features)}. "
-            "As a result, the model's assessment may be unreliable. "
-        )
-
-    explanation_text += "The primary factors influencing this score were:\n"
-
-    # ---- Build explanation pattern ID ----
-    pattern_parts = ["ALERT" if alert_flag else "NO_ALERT"]
 
-    # ---- Check for all-zero contributions ----
-    all_zero = all(abs(item["contribution"]) < 1e-6 for item in top_features)
+    parts = [_HEADER, f"{risk_score:.4f}", _band_sentence(risk_band, bool(alert_flag))]
+    if explanation.get("ood_flag", False):
+        parts.append(_ood_sentence(explanation.get("ood_features", [])))
 
+    # nlp_v1.0.0 emitted this line twice for rows with contributions; it now appears exactly once
+    parts.append(_FACTORS)
+    all_zero = all(abs(item["contribution"]) < ZERO_CONTRIBUTION for item in top_features)
     if all_zero:
-        explanation_text += (
-            "The model assigned a low risk score, but none of the input features materially influenced this result. "
-            "This typically occurs when feature values fall outside the range observed during training, "
-            "limiting the model’s ability to assess risk reliably.\n"
-        )
-    else:
-        explanation_text += "The primary factors influencing this score were:\n"
+        parts.append(_NO_FACTORS)
 
-    # ---- Feature-level explanations ----
+    pattern_parts = ["ALERT" if alert_flag else "NO_ALERT"]
     features_used = []
 
     for item in top_features:
         feature = item["feature"]
         contribution = item["contribution"]
-        value = transaction_features.get(feature, "unknown")
-
-        if contribution > 0:
-            direction = "increased"
-            sign = "POS"
-        elif contribution < 0:
-            direction = "decreased"
-            sign = "NEG"
-        else:
-            direction = "did not materially affect"
-            sign = "ZERO"
-
-        pattern_parts.append(f"{sign}_{feature.upper()}")
-
-        # Defensive value formatting
-        if isinstance(value, (int, float)):
-            value_str = f"{value:.2f}"
-        else:
-            value_str = str(value)
+        sign = (contribution > 0) - (contribution < 0)
+        line_head, tokens = _feature_template(feature)
+        pattern_parts.append(tokens[sign + 1])
 
         if not all_zero:
-            explanation_text += (
-                f"- The feature '{feature.replace('_', ' ')}' "
-                f"with a value of {value_str} {direction} the model’s risk score "
-                f"by {abs(contribution):.4f}.\n"
-            )
+            # Defensive value formatting
+            value = transaction_features.get(feature, "unknown")
+            value_str = f"{value:.2f}" if isinstance(value, (int, float)) else str(value)
+            parts += [line_head, value_str, _LINE_MIDDLES[sign + 1], f"{abs(contribution):.4f}", ".\n"]
 
         features_used.append(feature)
 
-    pattern_id = "_".join(pattern_parts)
-
     return {
-        "text": explanation_text,
-        "pattern_id": pattern_id,
+        "text": "".join(parts),
+        "pattern_id": sys.intern("_".join(pattern_parts)),
         "features_used": features_used,
-        "generator_version": "nlp_v1.0.0",
+        "generator_version": GENERATOR_VERSION,
     }
+
+
+class Narrative(dict):
+    """
+    Per-transaction NLP explanation dict whose 'text' may still be pending.
+
+    In lazy mode `generate_nlp_explanations` stores a renderer instead of 'text'. The first
+    `narrative['text']` or `.get('text')` runs it and stores the result, after which the dict
+    is identical to an eagerly generated one. pattern_id and features_used are always present.
+    """
+
+    def __init__(self, data: Dict[str, Any], renderer: Optional[Callable[[], str]] = None):
+        super().__init__(data)
+        self._renderer = renderer
+
+    @property
+    def rendered(self) -> bool:
+        """True once 'text' has been rendered."""
+        return dict.__contains__(self, 'text')
+
+    def _render(self) -> None:
+        text, self._renderer = self._renderer(), None
+        # Keep the eager key order, with text first
+        rest = dict(self)
+        self.clear()
+        self['text'] = text
+        self.update(rest)
+
+    def __missing__(self, key: str) -> Any:
+        if key == 'text' and self._renderer is not None:
+            self._render()
+            return dict.__getitem__(self, key)
+        raise KeyError(key)
+
+    def __contains__(self, key: object) -> bool:
+        return dict.__contains__(self, key) or (key == 'text' and self._renderer is not None)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        if key == 'text' and self._renderer is not None:
+            return self[key]
+        return super().get(key, default)
+
+
+def _group_rows(matrix: np.ndarray, base: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Group equal rows of a small non-negative integer matrix.
+
+    Rows are packed into one int64 key (digits in the given base) when they fit, which
+    sorts far faster than np.unique over rows.
+
+    Returns:
+        tuple: Index of the first row of each group, and the (N,) group index of every row
+    """
+    if matrix.shape[1] * np.log2(base) < 62:
+        keys = matrix.astype(np.int64) @ (base ** np.arange(matrix.shape[1], dtype=np.int64))
+        _, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+    else:
+        _, first, inverse = np.unique(matrix, axis=0, return_index=True, return_inverse=True)
+    return first, inverse.reshape(-1)
+
+
+@timed('nlp')
+def generate_nlp_explanations(batch: Dict[str, Any], X: Union[pd.DataFrame, np.ndarray],
+                              lazy: bool = False) -> List[Optional[Dict[str, Any]]]:
+    """
+    Generate plain-English explanations for a whole explained batch.
+
+    The output per row is identical to `generate_nlp_explanation` on the matching
+    `batch_to_explanations` dict. Feature templates are compiled once per feature name,
+    pattern_id/features_used are built once per distinct (alert, signed top features)
+    combination and shared, and rows that also share risk band and OOD features share one
+    format string, so rendering a row is a single '%' over its numbers.
+
+    Args:
+        batch (dict): Output of ScoringEngine.explain_batch or screen_batch
+        X (DataFrame or ndarray): The transactions the batch was scored from, either with named
+            feature columns or as an (N, n_features) array in bundle feature order
+        lazy (bool): Return Narrative dicts that render 'text' only when it is first read
+
+    Returns:
+        list: One explanation dict per row (a Narrative in lazy mode), None for rows the
+            batch left unexplained
+
+    Raises:
+        ValueError: If the batch has no explanations (a score_batch result)
+    """
+    if 'top_feature_indices' not in batch:
+        raise ValueError("generate_nlp_explanations needs an explain_batch or screen_batch result")
+    features = batch['features']
+    n_rows = len(batch['risk_score'])
+    if isinstance(X, pd.DataFrame):
+        X = X[features]
+    X = np.asarray(X, dtype=np.float64)
+
+    results: List[Optional[Dict[str, Any]]] = [None] * n_rows
+    rows = np.flatnonzero(batch.get('explained', np.ones(n_rows, dtype=bool)))
+    if not len(rows):
+        return results
+
+    templates = [_feature_template(feature) for feature in features]
+    indices = batch['top_feature_indices'][rows]
+    contributions = batch['top_contributions'][rows]
+    signs = (contributions > 0).astype(np.intp) - (contributions < 0)
+    alert_flags = batch['alert_flag'][rows]
+
+    # One interned pattern_id and features_used per distinct row of signed feature codes
+    codes = np.column_stack([alert_flags, (signs + 1) * len(features) + indices])
+    first, pattern_index = _group_rows(codes, 3 * len(features))
+    patterns = []
+    for code, r in zip(codes[first].tolist(), first.tolist()):
+        tokens = [templates[c % len(features)][1][c // len(features)] for c in code[1:]]
+        pattern_id = sys.intern("_".join(["ALERT" if code[0] else "NO_ALERT"] + tokens))
+        patterns.append((pattern_id, tuple(features[j] for j in indices[r])))
+
+    # Rows sharing pattern, risk band, OOD features and the all-zero case share one format string,
+    # so rendering a row is a single '%' over its numbers
+    ood_mask = batch['ood_mask'][rows]
+    ood_first, ood_index = _group_rows(ood_mask, 2)
+    band_index, bands = pd.factorize(batch['risk_band'][rows])
+    all_zero = (np.abs(contributions) < ZERO_CONTRIBUTION).all(axis=1)
+    keys = ((pattern_index * len(ood_first) + ood_index) * len(bands) + band_index) * 2 + all_zero
+    _, first, format_index = np.unique(keys, return_index=True, return_inverse=True)
+
+    formats = []
+    for r in first.tolist():
+        parts = [_HEADER, "%.4f", _band_sentence(str(batch['risk_band'][rows[r]]), bool(alert_flags[r]))]
+        if ood_mask[r].any():
+            parts.append(_ood_sentence([features[j] for j in np.flatnonzero(ood_mask[r])]))
+        parts.append(_FACTORS)
+        if all_zero[r]:
+            # '%.0s' consumes a number without printing it, so every row formats the same tuple
+            parts += [_NO_FACTORS, "%.0s%.0s" * indices.shape[1]]
+        else:
+            for j, sign in zip(indices[r].tolist(), signs[r].tolist()):
+                parts += [templates[j][0], "%.2f", _LINE_MIDDLES[sign + 1], "%.4f", ".\n"]
+        formats.append("".join(part if part.startswith("%.") else part.replace("%", "%%") for part in parts))
+
+    # Per row: risk score, then value and |contribution| of each top feature
+    numbers = np.column_stack([
+        batch['risk_score'][rows],
+        np.stack([np.take_along_axis(X[rows], indices, axis=1), np.abs(contributions)], axis=2).reshape(len(rows), -1),
+    ])
+
+    if lazy:
+        def render(r: int) -> str:
+            return formats[format_index[r]] % tuple(numbers[r].tolist())
+
+        for r, (i, p) in enumerate(zip(rows.tolist(), pattern_index.tolist())):
+            pattern_id, used = patterns[p]
+            results[i] = Narrative({
+                "pattern_id": pattern_id,
+                "features_used": list(used),
+                "generator_version": GENERATOR_VERSION,
+            }, functools.partial(render, r))
+    else:
+        formats = [formats[g] for g in format_index.tolist()]
+        for i, p, fmt, row in zip(rows.tolist(), pattern_index.tolist(), formats, numbers.tolist()):
+            pattern_id, used = patterns[p]
+            results[i] = {
+                "text": fmt % tuple(row),
+                "pattern_id": pattern_id,
+                "features_used": list(used),
+                "generator_version": GENERATOR_VERSION,
+            }
+    return results
@@ -0,0 +1,126 @@
+import argparse
+import asyncio
+import json
+import time
+import numpy as np
+from typing import Any, Dict, List, Optional, Tuple
+
+# Borderline-risk transaction used when no sample features are given
+DEFAULT_FEATURES = {
+    'transaction_amount': 6000,
+    'amount_deviation': 3500,
+    'transaction_frequency': 4,
+    'country_risk': 0.5,
+    'customer_age': 35
+}
+
+
+class HttpClient:
+    """Minimal keep-alive HTTP/1.1 JSON client over one asyncio connection."""
+
+    def __init__(self, host: str, port: int):
+        self.host = host
+        self.port = port
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+
+    async def request(self, method: str, path: str, payload: Any = None) -> Tuple[int, Any]:
+        if self._writer is None:
+            self._reader, self._writer = await asyncio.open_connection(self.host, self.port)
+
+        body = b'' if payload is None else json.dumps(payload).encode()
+        self._writer.write(
+            f"{method} {path} HTTP/1.1\r\nHost: {self.host}\r\n"
+            f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n".encode() + body
+        )
+        await self._writer.drain()
+
+        status = int((await self._reader.readline()).split(b' ', 2)[1])
+        headers = {}
+        while True:
+            line = await self._reader.readline()
+            if line in (b'\r\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+        body = await self._reader.readexactly(int(headers.get('content-length', 0)))
+        if headers.get('content-type', '').startswith('application/json'):
+            return status, json.loads(body)
+        return status, body.decode()
+
+    async def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            await self._writer.wait_closed()
+            self._writer = None
+
+
+async def run_load(host: str = '127.0.0.1', port: int = 8000, endpoint: str = '/score', n_requests: int = 1000,
+                   concurrency: int = 32, features: Optional[Dict[str, Any]] = None) -> Dict[str, float]:
+    """
+    Fire n_requests single-transaction requests from `concurrency` keep-alive connections.
+
+    Args:
+        host: Service host
+        port: Service port
+        endpoint: '/score' or '/explain'
+        n_requests: Total requests to send
+        concurrency: Concurrent connections
+        features: Transaction to send, defaults to DEFAULT_FEATURES
+
+    Returns:
+        dict: requests, errors, seconds, requests_per_sec and p50/p95/p99/max latency in ms
+    """
+    if features is None:
+        features = DEFAULT_FEATURES
+
+    latencies: List[float] = []
+    errors = 0
+    remaining = n_requests
+
+    async def worker() -> None:
+        nonlocal remaining, errors
+        client = HttpClient(host, port)
+        try:
+            while remaining > 0:
+                remaining -= 1
+                start = time.perf_counter()
+                status, _ = await client.request('POST', endpoint, features)
+                latencies.append(time.perf_counter() - start)
+                if status != 200:
+                    errors += 1
+        finally:
+            await client.close()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    seconds = time.perf_counter() - start
+
+    latency_ms = np.array(latencies) * 1000
+    return {
+        'requests': len(latencies),
+        'errors': errors,
+        'seconds': seconds,
+        'requests_per_sec': len(latencies) / seconds,
+        'p50_ms': float(np.percentile(latency_ms, 50)),
+        'p95_ms': float(np.percentile(latency_ms, 95)),
+        'p99_ms': float(np.percentile(latency_ms, 99)),
+        'max_ms': float(latency_ms.max()),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description='Load generator for the explainable-aml scoring service')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--endpoint', default='/score', choices=['/score', '/explain'])
+    parser.add_argument('--requests', type=int, default=1000)
+    parser.add_argument('--concurrency', type=int, default=32)
+    args = parser.parse_args(argv)
+
+    stats = asyncio.run(run_load(args.host, args.port, args.endpoint, args.requests, args.concurrency))
+    print(json.dumps(stats, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,317 @@
+import asyncio
+import json
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+from explainable_aml.config import CONFIG
+from explainable_aml.utils.logging import log_event, json_default
+from explainable_aml.utils.metrics import get_metrics, increment, span
+from explainable_aml.explainability.engine import ScoringEngine, get_engine_manager, batch_to_explanations
+from explainable_aml.explainability.worker_pool import ScoringWorkerPool
+
+HTTP_REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed', 500: 'Internal Server Error'}
+
+# Largest request body accepted, to bound memory per connection
+MAX_BODY_BYTES = 10 * 1024 * 1024
+
+
+class MicroBatcher:
+    """
+    Collects concurrent requests into micro-batches and runs each batch as one engine call.
+
+    A batch is dispatched when it holds max_batch_size rows or its first request has waited
+    max_wait_ms, whichever comes first. Up to max_concurrent_batches run at once on dedicated
+    threads (one unless a worker pool scores them), so requests arriving while all are busy
+    queue up for the next batch.
+    """
+
+    def __init__(self, run_batch: Callable[[np.ndarray], List[Dict[str, Any]]], max_batch_size: int = 64,
+                 max_wait_ms: float = 5, max_concurrent_batches: int = 1):
+        """
+        Args:
+            run_batch: Maps an (N, n_features) matrix to N result dicts
+            max_batch_size: Maximum rows per batch
+            max_wait_ms: Maximum time the first request of a batch waits for company
+            max_concurrent_batches: Batches run at the same time
+        """
+        self.run_batch = run_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.max_concurrent_batches = max_concurrent_batches
+        self.batches = 0
+        self.rows = 0
+        self._queue: Optional[asyncio.Queue] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._task: Optional[asyncio.Task] = None
+        self._running: Set[asyncio.Task] = set()
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrent_batches, thread_name_prefix='micro-batch')
+
+    def start(self) -> None:
+        self._queue = asyncio.Queue()
+        self._slots = asyncio.Semaphore(self.max_concurrent_batches)
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        for task in [self._task, *self._running]:
+            if task is not None:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._executor.shutdown(wait=True)
+
+    async def submit(self, X: np.ndarray) -> List[Dict[str, Any]]:
+        """Queue rows for the next batch and wait for their results."""
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((X, future))
+        return await future
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            # Wait for a free slot first, so requests pile up into the next batch meanwhile
+            await self._slots.acquire()
+            pending = [await self._queue.get()]
+            n_rows = len(pending[0][0])
+            deadline = loop.time() + self.max_wait
+            while n_rows < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                pending.append(item)
+                n_rows += len(item[0])
+
+            task = loop.create_task(self._run_batch(pending))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+
+    async def _run_batch(self, pending: List[Tuple[np.ndarray, asyncio.Future]]) -> None:
+        try:
+            X = np.concatenate([item[0] for item in pending])
+            try:
+                results = await asyncio.get_running_loop().run_in_executor(self._executor, self.run_batch, X)
+            except Exception as e:
+                for _, future in pending:
+                    if not future.done():
+                        future.set_exception(e)
+                return
+
+            self.batches += 1
+            self.rows += len(X)
+
+            # Fan results back out to the waiting callers
+            start = 0
+            for rows, future in pending:
+                if not future.done():
+                    future.set_result(results[start:start + len(rows)])
+                start += len(rows)
+        finally:
+            self._slots.release()
+
+
+class ScoringService:
+    """
+    Asyncio HTTP scoring service holding one warm engine, hot-swapped when a new model is published.
+
+    Endpoints:
+        GET  /health   liveness and model metadata
+        GET  /metrics  stage latencies and counters in the Prometheus text format
+        POST /score    risk_score, alert_flag, risk_band and OOD flags
+        POST /explain  the above plus top_features (explain_transaction schema)
+
+    POST bodies are a single feature dict, or {"transactions": [feature dicts]}.
+    """
+
+    def __init__(self, model_path: Optional[str] = None, data_path: Optional[str] = None,
+                 max_batch_size: Optional[int] = None, max_wait_ms: Optional[float] = None,
+                 n_workers: Optional[int] = None):
+        """
+        Args:
+            model_path: Path to the model bundle, defaults to the configured model
+            data_path: Path to background data for SHAP (legacy bundles only)
+            max_batch_size: Rows per micro-batch, defaults to CONFIG['serving']['max_batch_size']
+            max_wait_ms: Micro-batch wait, defaults to CONFIG['serving']['max_wait_ms']
+            n_workers: Forked scoring workers, defaults to CONFIG['serving']['workers'];
+                0 scores on the service process itself
+        """
+        settings = CONFIG.get('serving', {})
+        if max_batch_size is None:
+            max_batch_size = settings.get('max_batch_size', 64)
+        if max_wait_ms is None:
+            max_wait_ms = settings.get('max_wait_ms', 5)
+        if n_workers is None:
+            n_workers = settings.get('workers', 0)
+
+        self.model_path = model_path
+        self.data_path = data_path
+        self.engines = get_engine_manager(model_path, data_path)
+        self.pool: Optional[ScoringWorkerPool] = None
+        if n_workers > 0:
+            self.pool = ScoringWorkerPool(n_workers=n_workers, manager=self.engines)
+        concurrency = max(1, n_workers)
+        self.score_batcher = MicroBatcher(self._score_rows, max_batch_size, max_wait_ms, concurrency)
+        self.explain_batcher = MicroBatcher(self._explain_rows, max_batch_size, max_wait_ms, concurrency)
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    @property
+    def engine(self) -> ScoringEngine:
+        # A batch reads this once, so a swap mid-batch never mixes two models
+        return self.engines.current()
+
+    def _score_rows(self, X: np.ndarray) -> List[Dict[str, Any]]:
+        if self.pool is not None:
+            return batch_to_explanations(self.pool.submit(X, 'score_batch').result())
+        return batch_to_explanations(self.engine.score_batch(X))
+
+    def _explain_rows(self, X: np.ndarray) -> List[Dict[str, Any]]:
+        if self.pool is not None:
+            return batch_to_explanations(self.pool.submit(X, 'explain_batch').result())
+        return batch_to_explanations(self.engine.explain_batch(X))
+
+    async def start(self, host: str = '127.0.0.1', port: int = 8000) -> asyncio.AbstractServer:
+        """Start the batchers and listen; port 0 picks a free port (see `port`)."""
+        self.score_batcher.start()
+        self.explain_batcher.start()
+        self._server = await asyncio.start_server(self._handle_connection, host, port)
+        return self._server
+
+    @property
+    def port(self) -> int:
+        return self._server.sockets[0].getsockname()[1]
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        await self.score_batcher.stop()
+        await self.explain_batcher.stop()
+        if self.pool is not None:
+            self.pool.close()
+
+    def _parse_transactions(self, body: bytes) -> Tuple[np.ndarray, List[Dict[str, Any]], bool]:
+        payload = json.loads(body)
+        single = not (isinstance(payload, dict) and 'transactions' in payload)
+        transactions = [payload] if single else payload['transactions']
+        if not isinstance(transactions, list) or not all(isinstance(t, dict) for t in transactions):
+            raise ValueError("Expected a feature dict or {'transactions': [feature dicts]}")
+
+        features = self.engine.features
+        missing = sorted({f for t in transactions for f in features if f not in t})
+        if missing:
+            raise ValueError(f"Missing required features: {missing}")
+        X = np.array([[t[f] for f in features] for t in transactions], dtype=np.float64).reshape(-1, len(features))
+        return X, transactions, single
+
+    async def _dispatch(self, method: str, path: str, body: bytes) -> Tuple[int, Any]:
+        if path == '/health':
+            engine = self.engine
+            return 200, {
+                'status': 'ok',
+                'model_version': engine.model_version,
+                'model_swaps': self.engines.swaps,
+                'trained_at': engine.bundle.get('trained_at'),
+                'training_data_version': engine.bundle.get('training_data_version'),
+                'explanation_backend': engine.backend,
+                'explanation_cache': engine.cache.metrics() if engine.cache is not None else None,
+                'workers': self.pool.health() if self.pool is not None else None,
+                'drift': engine.drift.metrics() if engine.drift is not None else None,
+            }
+        if path == '/metrics':
+            return 200, get_metrics().to_prometheus()
+        if path not in ('/score', '/explain'):
+            return 404, {'error': f"Unknown path {path}"}
+        if method != 'POST':
+            return 405, {'error': f"{path} only accepts POST"}
+
+        try:
+            X, transactions, single = self._parse_transactions(body)
+        except (ValueError, TypeError) as e:
+            return 400, {'error': str(e)}
+
+        batcher = self.score_batcher if path == '/score' else self.explain_batcher
+        results = await batcher.submit(X) if len(X) else []
+        with span('audit_log'):
+            for features, result in zip(transactions, results):
+                log_event('transaction_scored', {'features': features, **result})
+        return 200, results[0] if single else {'results': results}
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, path, version = request_line.decode('latin-1').split(' ', 2)
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+
+                length = int(headers.get('content-length', 0))
+                if length > MAX_BODY_BYTES:
+                    status, payload = 400, {'error': 'Request body too large'}
+                    body = b''
+                else:
+                    body = await reader.readexactly(length) if length else b''
+                    try:
+                        status, payload = await self._dispatch(method, path.split('?', 1)[0], body)
+                    except Exception as e:
+                        increment('errors')
+                        log_event('explanation_failed', {'error': str(e)})
+                        status, payload = 500, {'error': str(e)}
+
+                keep_alive = headers.get('connection', '').lower() != 'close' and version.strip() == 'HTTP/1.1'
+                if isinstance(payload, str):
+                    content_type, response = 'text/plain; version=0.0.4', payload.encode()
+                else:
+                    content_type, response = 'application/json', json.dumps(payload, default=json_default).encode()
+                writer.write(
+                    f"HTTP/1.1 {status} {HTTP_REASONS[status]}\r\n"
+                    f"Content-Type: {content_type}\r\n"
+                    f"Content-Length: {len(response)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode() + response
+                )
+                await writer.drain()
+                if not keep_alive or length > MAX_BODY_BYTES:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionResetError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+
+async def serve(host: Optional[str] = None, port: Optional[int] = None, model_path: Optional[str] = None,
+                data_path: Optional[str] = None, n_workers: Optional[int] = None) -> None:
+    """
+    Run the scoring service until cancelled.
+
+    Args:
+        host: Interface to bind, defaults to CONFIG['serving']['host']
+        port: Port to bind, defaults to CONFIG['serving']['port']
+        model_path: Path to the model bundle
+        data_path: Path to background data for SHAP (legacy bundles only)
+        n_workers: Forked scoring workers, defaults to CONFIG['serving']['workers']
+    """
+    settings = CONFIG.get('serving', {})
+    if host is None:
+        host = settings.get('host', '127.0.0.1')
+    if port is None:
+        port = settings.get('port', 8000)
+
+    service = ScoringService(model_path, data_path, n_workers=n_workers)
+    server = await service.start(host, port)
+    print(f"Scoring service listening on http://{host}:{service.port}")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await service.stop()
@@ -0,0 +1,328 @@
+import os
+import json
+import time
+from datetime import datetime, time as dt_time
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+from explainable_aml.utils.logging import json_default
+
+# Segments stop tracking distinct pattern_ids beyond this many; queries then scan them
+MAX_INDEXED_PATTERNS = 1000
+
+SEGMENT_PREFIX = 'segment-'
+INDEX_SUFFIX = '.idx.json'
+
+TimeBound = Optional[Union[str, datetime]]
+
+
+def record_fields(data: Any) -> Tuple[Optional[bool], Optional[str], Optional[str]]:
+    """
+    Pull the indexed fields (alert_flag, risk_band, pattern_id) out of an event payload.
+
+    They sit at the top level of 'transaction_scored' events, and under 'explanation' /
+    'nlp_explanation' in 'decision_logged' events.
+
+    Args:
+        data (dict): Event-specific data
+
+    Returns:
+        tuple: (alert_flag, risk_band, pattern_id), each None when absent
+    """
+    if not isinstance(data, dict):
+        return None, None, None
+    explanation = data.get('explanation') if isinstance(data.get('explanation'), dict) else {}
+    alert_flag = data.get('alert_flag', explanation.get('alert_flag'))
+    risk_band = data.get('risk_band', explanation.get('risk_band'))
+    pattern_id = data.get('pattern_id')
+    for key in ('nlp_explanation', 'nlp'):
+        if pattern_id is None and isinstance(data.get(key), dict):
+            pattern_id = data[key].get('pattern_id')
+    return (None if alert_flag is None else bool(alert_flag)), risk_band, pattern_id
+
+
+def _to_iso(bound: TimeBound, end_of_day: bool = False) -> Optional[str]:
+    """
+    Normalize a query bound to the isoformat() form records are stored in.
+
+    A date-only string ('2024-05-14') is the start of that day, or its end with end_of_day,
+    so an inclusive end date covers the whole day.
+    """
+    if bound is None:
+        return None
+    if isinstance(bound, str):
+        parsed = datetime.fromisoformat(bound)
+        if end_of_day and len(bound) == 10:
+            parsed = datetime.combine(parsed.date(), dt_time.max)
+        bound = parsed
+    return bound.isoformat()
+
+
+def _count(counts: Dict[str, int], key: Any) -> None:
+    if key is not None:
+        key = str(key).lower() if isinstance(key, bool) else str(key)
+        counts[key] = counts.get(key, 0) + 1
+
+
+class _Segment:
+    """An open segment file plus its in-memory index."""
+
+    def __init__(self, path: Path, index_stride: int):
+        self.path = path
+        self.index_path = path.with_name(path.name + INDEX_SUFFIX)
+        self.index_stride = index_stride
+        self.opened_at = time.monotonic()
+        self.file = open(path, 'ab')
+        self.index = {
+            'segment': path.name,
+            'n_records': 0,
+            'bytes': 0,
+            'min_ts': None,
+            'max_ts': None,
+            'event_types': {},
+            'alert_flags': {},
+            'risk_bands': {},
+            'pattern_ids': {},
+            'offsets': [],
+            'closed': False,
+        }
+
+    def append(self, records: List[Tuple[datetime, str, Any]]) -> int:
+        index = self.index
+        chunks = []
+        offset = index['bytes']
+        for timestamp, event_type, data in records:
+            ts = timestamp.isoformat()
+            try:
+                line = json.dumps({'timestamp': ts, 'event_type': event_type, 'data': data}, default=json_default)
+            except (TypeError, ValueError):
+                continue  # One unserializable payload must not cost the rest of the batch
+            line = (line + '\n').encode()
+
+            # Sparse offset index: every index_stride-th byte position, with the latest timestamp
+            # written before it. Producer threads can deliver records slightly out of order, so the
+            # running maximum (not the record's own timestamp) is what makes a seek safe.
+            if index['n_records'] % self.index_stride == 0:
+                index['offsets'].append([index['max_ts'] or ts, offset])
+            if index['min_ts'] is None or ts < index['min_ts']:
+                index['min_ts'] = ts
+            if index['max_ts'] is None or ts > index['max_ts']:
+                index['max_ts'] = ts
+
+            alert_flag, risk_band, pattern_id = record_fields(data)
+            _count(index['event_types'], event_type)
+            _count(index['alert_flags'], alert_flag)
+            _count(index['risk_bands'], risk_band)
+            if index['pattern_ids'] is not None:
+                _count(index['pattern_ids'], pattern_id)
+                if len(index['pattern_ids']) > MAX_INDEXED_PATTERNS:
+                    index['pattern_ids'] = None
+
+            index['n_records'] += 1
+            offset += len(line)
+            chunks.append(line)
+
+        self.file.write(b''.join(chunks))
+        self.file.flush()
+        index['bytes'] = offset
+        self.write_index()
+        return len(chunks)
+
+    def write_index(self) -> None:
+        tmp_path = self.index_path.with_name(self.index_path.name + '.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(self.index, f)
+        os.replace(tmp_path, self.index_path)
+
+    def close(self) -> None:
+        self.file.close()
+        self.index['closed'] = True
+        self.write_index()
+
+
+class AuditStore:
+    """
+    Rotating audit store of JSONL segments, each with a sidecar index.
+
+    A segment is closed once it exceeds max_segment_bytes or has been open for
+    max_segment_seconds. Its `.idx.json` sidecar records the time bounds, counts per
+    event_type / alert_flag / risk_band / pattern_id and sparse byte offsets, so `query`
+    can skip whole segments and seek close to the start of a time range without scanning.
+    Each writing process appends to its own segment files, so several processes can share a root.
+    """
+
+    def __init__(self, root: Union[str, Path], max_segment_bytes: int = 64 * 1024 * 1024,
+                 max_segment_seconds: float = 3600, index_stride: int = 1000):
+        """
+        Args:
+            root (Path): Directory holding the segments
+            max_segment_bytes (int): Size at which a segment is rotated
+            max_segment_seconds (float): Age at which a segment is rotated
+            index_stride (int): Records between entries of the sparse offset index
+        """
+        self.root = Path(root)
+        self.max_segment_bytes = max_segment_bytes
+        self.max_segment_seconds = max_segment_seconds
+        self.index_stride = index_stride
+        self._segment: Optional[_Segment] = None
+        self._sequence = 0
+
+    def _new_segment(self) -> _Segment:
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._sequence += 1
+        name = f"{SEGMENT_PREFIX}{datetime.now().strftime('%Y%m%dT%H%M%S%f')}-{os.getpid()}-{self._sequence:06d}.jsonl"
+        return _Segment(self.root / name, self.index_stride)
+
+    def write_records(self, records: List[Tuple[datetime, str, Any]]) -> int:
+        """
+        Append (timestamp, event_type, data) records, rotating the segment when it is full or old.
+
+        Records whose data cannot be serialized are skipped.
+
+        Args:
+            records (list): Records in time order
+
+        Returns:
+            int: Number of records written
+        """
+        segment = self._segment
+        if segment is not None and (
+            segment.index['bytes'] >= self.max_segment_bytes
+            or time.monotonic() - segment.opened_at >= self.max_segment_seconds
+        ):
+            segment.close()
+            segment = None
+        if segment is None:
+            segment = self._segment = self._new_segment()
+        return segment.append(records)
+
+    def close(self) -> None:
+        """Close the active segment and mark its index as final."""
+        if self._segment is not None:
+            self._segment.close()
+            self._segment = None
+
+    def query(self, start: TimeBound = None, end: TimeBound = None, event_type: Optional[str] = None,
+              alert_flag: Optional[bool] = None, risk_band: Optional[str] = None,
+              pattern_id: Optional[str] = None, limit: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """See `query_events`."""
+        return query_events(self.root, start, end, event_type, alert_flag, risk_band, pattern_id, limit)
+
+
+def read_segment_indexes(root: Union[str, Path]) -> List[Dict[str, Any]]:
+    """
+    Load every segment index under root, oldest segment first.
+
+    Args:
+        root (Path): Audit store directory
+
+    Returns:
+        list: Index dicts
+    """
+    indexes = []
+    for index_path in sorted(Path(root).glob(f"{SEGMENT_PREFIX}*{INDEX_SUFFIX}")):
+        with open(index_path, 'r') as f:
+            indexes.append(json.load(f))
+    return indexes
+
+
+def _segment_may_match(index: Dict[str, Any], start: Optional[str], end: Optional[str], event_type: Optional[str],
+                       alert_flag: Optional[bool], risk_band: Optional[str], pattern_id: Optional[str]) -> bool:
+    if index['n_records'] == 0:
+        return False
+    if start is not None and index['max_ts'] < start:
+        return False
+    if end is not None and index['min_ts'] > end:
+        return False
+    if event_type is not None and event_type not in index['event_types']:
+        return False
+    if alert_flag is not None and str(bool(alert_flag)).lower() not in index['alert_flags']:
+        return False
+    if risk_band is not None and risk_band not in index['risk_bands']:
+        return False
+    if pattern_id is not None and index['pattern_ids'] is not None and pattern_id not in index['pattern_ids']:
+        return False
+    return True
+
+
+def query_events(root: Union[str, Path], start: TimeBound = None, end: TimeBound = None,
+                 event_type: Optional[str] = None, alert_flag: Optional[bool] = None,
+                 risk_band: Optional[str] = None, pattern_id: Optional[str] = None,
+                 limit: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Stream audit events matching all given filters, segment by segment in write order.
+
+    Segments whose index rules out a match are never opened; inside a segment the sparse
+    offset index is used to skip records that all precede the time range. Records are not
+    assumed to be time-ordered, so the rest of the segment is always scanned.
+
+    Args:
+        root (Path): Audit store directory
+        start (str or datetime): Inclusive lower time bound
+        end (str or datetime): Inclusive upper time bound; a date-only string includes that whole day
+        event_type (str): e.g. 'decision_logged'
+        alert_flag (bool): Only alerted (True) or non-alerted (False) events
+        risk_band (str): 'Low', 'Borderline' or 'High'
+        pattern_id (str): NLP explanation pattern id
+        limit (int): Stop after this many events
+
+    Yields:
+        dict: Events as {'timestamp', 'event_type', 'data'}
+    """
+    start, end = _to_iso(start), _to_iso(end, end_of_day=True)
+    n_found = 0
+
+    for index in read_segment_indexes(root):
+        if not _segment_may_match(index, start, end, event_type, alert_flag, risk_band, pattern_id):
+            continue
+
+        # Seek to the last indexed position before which every record precedes the range
+        offset = 0
+        if start is not None:
+            for max_ts_before, position in index['offsets']:
+                if max_ts_before >= start:
+                    break
+                offset = position
+
+        with open(Path(root) / index['segment'], 'rb') as f:
+            f.seek(offset)
+            for raw_line in f:
+                if not raw_line.endswith(b'\n'):
+                    break  # Partially written record from an active writer
+                event = json.loads(raw_line)
+                ts = event['timestamp']
+                if start is not None and ts < start:
+                    continue
+                if end is not None and ts > end:
+                    continue
+                if event_type is not None and event['event_type'] != event_type:
+                    continue
+                if alert_flag is not None or risk_band is not None or pattern_id is not None:
+                    event_alert, event_band, event_pattern = record_fields(event['data'])
+                    if alert_flag is not None and event_alert != bool(alert_flag):
+                        continue
+                    if risk_band is not None and event_band != risk_band:
+                        continue
+                    if pattern_id is not None and event_pattern != pattern_id:
+                        continue
+
+                yield event
+                n_found += 1
+                if limit is not None and n_found >= limit:
+                    return
+
+
+def read_log_file(path: Union[str, Path]) -> Iterator[Dict[str, Any]]:
+    """
+    Stream events from a plain-text audit log ('<asctime> - INFO - <json>' lines).
+
+    Args:
+        path (Path): Log file
+
+    Yields:
+        dict: Events as {'timestamp', 'event_type', 'data'}
+    """
+    with open(path, 'r') as f:
+        for line in f:
+            _, sep, payload = line.partition(' - INFO - ')
+            if sep:
+                yield json.loads(payload)
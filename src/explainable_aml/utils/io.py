@@ -0,0 +1,146 @@
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Union
+import os
+import json
+import shutil
+import pandas as pd
+
+# Tabular formats understood by the batch entry points, keyed by file suffix
+FILE_FORMATS = {'.csv': 'csv', '.parquet': 'parquet', '.pq': 'parquet'}
+
+# Key under which file-level metadata is stored in a Parquet schema
+PARQUET_METADATA_KEY = b'explainable_aml'
+
+
+def detect_format(path: Union[str, Path]) -> str:
+    """
+    Infer the tabular file format from a path's suffix.
+
+    Args:
+        path: Input or output file path
+
+    Returns:
+        str: 'csv' or 'parquet'
+
+    Raises:
+        ValueError: If the suffix is not a supported format
+    """
+    suffix = Path(path).suffix.lower()
+    if suffix not in FILE_FORMATS:
+        raise ValueError(f"Unsupported file format '{suffix}'. Expected one of {sorted(FILE_FORMATS)}")
+    return FILE_FORMATS[suffix]
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ImportError("Parquet support requires pyarrow. Install it with `pip install pyarrow`.") from e
+    return pq
+
+
+def iter_frame_chunks(path: Union[str, Path], chunk_size: int, columns: Optional[List[str]] = None) -> Iterator[pd.DataFrame]:
+    """
+    Stream a CSV or Parquet file as DataFrames of at most chunk_size rows.
+
+    Args:
+        path: CSV or Parquet file
+        chunk_size: Maximum rows per chunk
+        columns: Optional subset of columns to read
+
+    Yields:
+        pd.DataFrame: Consecutive chunks of the file
+    """
+    if detect_format(path) == 'csv':
+        yield from pd.read_csv(path, chunksize=chunk_size, usecols=columns)
+        return
+
+    pq = _require_pyarrow()
+    parquet_file = pq.ParquetFile(path)
+    for batch in parquet_file.iter_batches(batch_size=chunk_size, columns=columns):
+        yield batch.to_pandas()
+
+
+def write_frame(df: pd.DataFrame, path: Union[str, Path]) -> None:
+    """
+    Write a DataFrame atomically: to a temp file first, then renamed into place.
+
+    Args:
+        df: Frame to write
+        path: Destination CSV or Parquet file
+    """
+    path = Path(path)
+    tmp_path = path.with_name(f"{path.name}.tmp-{os.getpid()}")
+    if detect_format(path) == 'csv':
+        df.to_csv(tmp_path, index=False)
+    else:
+        _require_pyarrow()
+        df.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, path)
+
+
+def concat_files(paths: List[Path], output_path: Union[str, Path]) -> None:
+    """
+    Concatenate same-schema CSV or Parquet part files into one output without loading them all.
+
+    Args:
+        paths: Part files in output order
+        output_path: Destination file; its suffix picks the format
+    """
+    output_path = Path(output_path)
+    tmp_path = output_path.with_name(f"{output_path.name}.tmp-{os.getpid()}")
+
+    if detect_format(output_path) == 'csv':
+        with open(tmp_path, 'w') as out:
+            for i, part in enumerate(paths):
+                with open(part, 'r') as f:
+                    header = f.readline()
+                    if i == 0:
+                        out.write(header)
+                    shutil.copyfileobj(f, out)
+    else:
+        pq = _require_pyarrow()
+        writer = None
+        try:
+            for part in paths:
+                table = pq.read_table(part)
+                if writer is None:
+                    writer = pq.ParquetWriter(tmp_path, table.schema)
+                writer.write_table(table)
+        finally:
+            if writer is not None:
+                writer.close()
+
+    os.replace(tmp_path, output_path)
+
+
+def metadata_sidecar_path(path: Union[str, Path]) -> Path:
+    """Sidecar JSON holding file-level metadata for formats without a metadata slot (CSV)."""
+    path = Path(path)
+    return path.with_name(f"{path.name}.meta.json")
+
+
+def read_file_metadata(path: Union[str, Path]) -> Dict[str, Any]:
+    """
+    Read file-level metadata written alongside a dataset.
+
+    Parquet files carry it in their schema metadata; CSV files in a `.meta.json` sidecar.
+
+    Args:
+        path: CSV or Parquet dataset
+
+    Returns:
+        dict: The stored metadata, or an empty dict if there is none
+    """
+    if FILE_FORMATS.get(Path(path).suffix.lower()) == 'parquet':
+        pq = _require_pyarrow()
+        schema_metadata = pq.read_schema(path).metadata or {}
+        if PARQUET_METADATA_KEY in schema_metadata:
+            return json.loads(schema_metadata[PARQUET_METADATA_KEY])
+        return {}
+
+    sidecar = metadata_sidecar_path(path)
+    if sidecar.exists():
+        with open(sidecar, 'r') as f:
+            return json.load(f)
+    return {}
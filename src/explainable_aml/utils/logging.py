@@ -1,41 +1,282 @@
 import logging
 import json
+import os
+import queue
+import time
+import atexit
+import threading
+import multiprocessing.util
 from datetime import datetime
+from pathlib import Path
+from typing import Any, List, Optional, Tuple
 from explainable_aml.config import CONFIG
 
-# Configure logging
-logging.basicConfig(
-    filename=str(CONFIG['log_path']),
-    level=getattr(logging, CONFIG['logging_level']),
-    format='%(asctime)s - %(levelname)s - %(message)s'
-)
+# Audit events are written at INFO, so a stricter configured level disables them
+AUDIT_ENABLED = getattr(logging, CONFIG['logging_level']) <= logging.INFO
 
-def log_event(event_type, data):
+# Overflow policies when the audit queue is full
+OVERFLOW_POLICIES = ('block', 'drop')
+
+_STOP = object()
+
+logger = logging.getLogger(__name__)
+
+
+def json_default(obj: Any) -> Any:
+    """Serialize the numpy scalars/arrays and paths that json does not handle natively."""
+    if hasattr(obj, 'tolist'):  # numpy scalars and arrays
+        return obj.tolist()
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    if isinstance(obj, Path):
+        return str(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def format_audit_line(timestamp: datetime, event_type: str, data: Any) -> str:
     """
-    Log an event for governance and auditability.
+    Render one audit record in the log file format ('<asctime> - INFO - <json>').
 
     Args:
-        event_type (str): Type of event (e.g., 'model_trained', 'transaction_scored', 'feedback_provided')
+        timestamp (datetime): When the event was logged
+        event_type (str): Type of event
         data (dict): Event-specific data
-    """
-    # Convert numpy types to python types for JSON serialization
-    def convert_types(obj):
-        if isinstance(obj, dict):
-            return {k: convert_types(v) for k, v in obj.items()}
-        elif isinstance(obj, list):
-            return [convert_types(item) for item in obj]
-        elif hasattr(obj, 'item'):  # numpy types
-            return obj.item()
-        else:
-            return obj
 
+    Returns:
+        str: The newline-terminated log line
+    """
     log_entry = {
-        'timestamp': datetime.now().isoformat(),
+        'timestamp': timestamp.isoformat(),
         'event_type': event_type,
-        'data': convert_types(data)
+        'data': data
     }
+    asctime = f"{timestamp.strftime('%Y-%m-%d %H:%M:%S')},{timestamp.microsecond // 1000:03d}"
+    return f"{asctime} - INFO - {json.dumps(log_entry, default=json_default)}\n"
+
+
+class AuditSink:
+    """
+    Queue-backed audit writer: callers only enqueue, a background thread serializes and writes.
+
+    Records go to a plain-text log file, or to a segmented AuditStore when one is given.
+
+    Records are written in batches of up to batch_size, or after flush_interval seconds,
+    whichever comes first. When the bounded queue is full, the 'block' policy applies
+    backpressure to the caller and the 'drop' policy discards the record and counts it.
+    A record whose data cannot be serialized is skipped and counted in `failed`; the rest
+    of its batch is still written.
+    """
+
+    def __init__(self, path: Optional[Path] = None, queue_size: int = 10000, batch_size: int = 256,
+                 flush_interval: float = 0.5, overflow: str = 'block', asynchronous: bool = True,
+                 store: Optional[Any] = None):
+        """
+        Args:
+            path (Path): Log file, defaults to CONFIG['log_path']; unused when store is given
+            queue_size (int): Maximum queued records
+            batch_size (int): Maximum records per write
+            flush_interval (float): Maximum seconds a record waits before being written
+            overflow (str): 'block' or 'drop' when the queue is full
+            asynchronous (bool): False writes each record synchronously on the calling thread
+            store (AuditStore): Segmented store to write to instead of the log file
+        """
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy '{overflow}'. Expected one of {OVERFLOW_POLICIES}")
+
+        self.path = Path(path if path is not None else CONFIG['log_path'])
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.overflow = overflow
+        self.asynchronous = asynchronous
+        self.store = store
+        self.dropped = 0
+        self.failed = 0
+        self.written = 0
+
+        if store is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._closed = False
+        self._thread = None
+        if asynchronous:
+            self._thread = threading.Thread(target=self._run, name='audit-writer', daemon=True)
+            self._thread.start()
+
+    def emit(self, event_type: str, data: Any) -> None:
+        """
+        Record an event.
+
+        A dict payload is copied (shallowly) here, so the caller may keep changing its own dict.
+        Nested values are still serialized later and must not be mutated afterwards.
+
+        Args:
+            event_type (str): Type of event
+            data (dict): Event-specific data
+        """
+        if isinstance(data, dict):
+            data = dict(data)
+        record = (datetime.now(), event_type, data)
+        if not self.asynchronous or self._closed:
+            self._write([record])
+            return
+
+        if self.overflow == 'drop':
+            try:
+                self._queue.put_nowait(record)
+            except queue.Full:
+                self.dropped += 1
+        else:
+            self._queue.put(record)
+
+    def flush(self) -> None:
+        """Block until every record enqueued so far has been written."""
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.join()
+
+    def close(self) -> None:
+        """Write all pending records and stop the writer thread."""
+        if self._closed:
+            return
+        self._closed = True
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join()
+        if self.store is not None:
+            with self._lock:
+                self.store.close()
+
+    def _write(self, records: List[Tuple[datetime, str, Any]]) -> None:
+        if self.store is not None:
+            with self._lock:
+                n_written = self.store.write_records(records)
+                self.written += n_written
+        else:
+            lines = []
+            for record in records:
+                try:
+                    lines.append(format_audit_line(*record))
+                except (TypeError, ValueError):
+                    pass
+            with self._lock:
+                if lines:
+                    with open(self.path, 'a') as f:
+                        f.write(''.join(lines))
+                self.written += len(lines)
+            n_written = len(lines)
 
-    logging.info(json.dumps(log_entry))
+        if n_written < len(records):
+            self.failed += len(records) - n_written
+            logger.error("Skipped %d unserializable audit records (%d in total)",
+                         len(records) - n_written, self.failed)
+
+    def _run(self) -> None:
+        stop = False
+        while not stop:
+            batch = [self._queue.get()]
+            # Gather more records until the batch is full or the flush interval has passed
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size and batch[-1] is not _STOP:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=timeout))
+                except queue.Empty:
+                    break
+
+            records = [r for r in batch if r is not _STOP]
+            stop = len(records) < len(batch)
+            try:
+                if records:
+                    self._write(records)
+            except Exception:
+                logger.exception("Failed to write %d audit records", len(records))
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+
+_sink: Optional[AuditSink] = None
+_sink_lock = threading.Lock()
+
+
+def get_audit_sink() -> AuditSink:
+    """Return the process-wide audit sink configured from CONFIG['audit_log']."""
+    global _sink
+    if _sink is None:
+        with _sink_lock:
+            if _sink is None:
+                settings = CONFIG.get('audit_log', {})
+                store = None
+                if settings.get('store', 'file') == 'segmented':
+                    from explainable_aml.utils.audit_store import AuditStore
+                    store = AuditStore(
+                        CONFIG['audit_store_path'],
+                        max_segment_bytes=settings.get('max_segment_mb', 64) * 1024 * 1024,
+                        max_segment_seconds=settings.get('max_segment_seconds', 3600),
+                    )
+                _sink = AuditSink(
+                    queue_size=settings.get('queue_size', 10000),
+                    batch_size=settings.get('batch_size', 256),
+                    flush_interval=settings.get('flush_interval_seconds', 0.5),
+                    overflow=settings.get('overflow', 'block'),
+                    asynchronous=settings.get('async', True),
+                    store=store,
+                )
+                # atexit covers normal interpreter exit; multiprocessing children skip atexit
+                # handlers but run Finalize callbacks, so register both
+                atexit.register(_sink.close)
+                multiprocessing.util.Finalize(None, _sink.close, exitpriority=10)
+    return _sink
+
+
+def set_audit_sink(sink: Optional[AuditSink]) -> Optional[AuditSink]:
+    """
+    Replace the process-wide audit sink; None makes the next log_event build a new one from CONFIG.
+
+    Args:
+        sink (AuditSink): The sink to install, or None
+
+    Returns:
+        AuditSink: The sink that was installed before, if any
+    """
+    global _sink
+    with _sink_lock:
+        previous, _sink = _sink, sink
+    return previous
+
+
+def flush_audit_log() -> None:
+    """Block until all audit events logged so far are on disk."""
+    if _sink is not None:
+        _sink.flush()
+
+
+def _reset_sink_in_child() -> None:
+    # A forked child inherits the queue but not the writer thread; give it its own sink
+    global _sink, _sink_lock
+    _sink = None
+    _sink_lock = threading.Lock()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_sink_in_child)
+
+
+def log_event(event_type, data):
+    """
+    Log an event for governance and auditability.
+
+    The event is only enqueued here; serialization and the file write happen on the
+    audit writer thread.
+
+    Args:
+        event_type (str): Type of event (e.g., 'model_trained', 'transaction_scored', 'feedback_provided')
+        data (dict): Event-specific data
+    """
+    if AUDIT_ENABLED:
+        get_audit_sink().emit(event_type, data)
 
 def log_decision(features, risk_score, alert_flag, explanation, nlp_explanation, feedback=None):
     """
@@ -63,4 +304,4 @@ if __name__ == "__main__":
     # Example events
     log_event('model_trained', {'model_path': 'path/to/model', 'features': ['f1', 'f2']})
     log_event('transaction_scored', {'features': {'amount': 1000}, 'risk_score': 0.1})
-    log_event('feedback_provided', {'feedback': 'Valid'})
\ No newline at end of file
+    log_event('feedback_provided', {'feedback': 'Valid'})
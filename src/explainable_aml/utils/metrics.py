@@ -0,0 +1,245 @@
+import os
+import atexit
+import functools
+import bisect
+import threading
+import contextlib
+from pathlib import Path
+from time import perf_counter
+from typing import Any, Callable, Dict, List, Optional, Union
+from explainable_aml.config import CONFIG, PROJECT_ROOT
+
+# Latency bucket upper bounds: 10us to ~80s, four buckets per doubling (~19% wide), so
+# quantiles interpolated inside a bucket are within a few percent of the true value
+BUCKET_BOUNDS = [1e-5 * 2 ** (i / 4) for i in range(93)]
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+METRIC_PREFIX = 'explainable_aml'
+
+_NULL_SPAN = contextlib.nullcontext()
+
+
+class Histogram:
+    """Fixed-bucket latency histogram: constant memory, O(log buckets) per observation, mergeable."""
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKET_BOUNDS) + 1)  # Last bucket is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(BUCKET_BOUNDS, value)] += 1
+        self.count += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+
+    def merge(self, other: 'Histogram') -> None:
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        self.count += other.count
+        self.sum += other.sum
+        self.max = max(self.max, other.max)
+
+    def quantile(self, q: float) -> float:
+        """Estimate the q-quantile by linear interpolation inside its bucket."""
+        if self.count == 0:
+            return 0.0
+        rank = q * self.count
+        cumulative = 0
+        for i, n in enumerate(self.counts):
+            if n and cumulative + n >= rank:
+                lower = BUCKET_BOUNDS[i - 1] if i > 0 else 0.0
+                upper = BUCKET_BOUNDS[i] if i < len(BUCKET_BOUNDS) else self.max
+                return min(lower + (upper - lower) * (rank - cumulative) / n, self.max)
+            cumulative += n
+        return self.max
+
+
+class _Span:
+    """Times one stage; used as a context manager."""
+
+    __slots__ = ('registry', 'stage', 'start')
+
+    def __init__(self, registry: 'MetricsRegistry', stage: str):
+        self.registry = registry
+        self.stage = stage
+
+    def __enter__(self) -> '_Span':
+        self.start = perf_counter()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> bool:
+        self.registry.observe(self.stage, perf_counter() - self.start)
+        return False
+
+
+class MetricsRegistry:
+    """
+    In-process stage latency histograms and event counters.
+
+    Everything is a no-op while `enabled` is False, so instrumented code pays one attribute
+    check per span.
+    """
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self._histograms: Dict[str, Histogram] = {}
+        self._counters: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def span(self, stage: str) -> Any:
+        """
+        Context manager timing one stage into its latency histogram.
+
+        Args:
+            stage (str): Stage name, e.g. 'predict' or 'shap'
+        """
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, stage)
+
+    def observe(self, stage: str, seconds: float) -> None:
+        """Record one stage duration in seconds."""
+        if not self.enabled:
+            return
+        with self._lock:
+            histogram = self._histograms.get(stage)
+            if histogram is None:
+                histogram = self._histograms[stage] = Histogram()
+            histogram.observe(seconds)
+
+    def increment(self, name: str, amount: float = 1) -> None:
+        """Add to a counter, e.g. 'transactions', 'alerts', 'ood' or 'errors'."""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + amount
+
+    def reset(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Return the current metrics.
+
+        Returns:
+            dict: 'stages' maps each stage to count, sum, max and p50/p95/p99 in seconds;
+                'counters' holds the counters; 'ood_rate' and 'alert_rate' are per transaction
+        """
+        with self._lock:
+            stages = {
+                stage: {
+                    'count': h.count,
+                    'sum': h.sum,
+                    'max': h.max,
+                    **{f'p{int(q * 100)}': h.quantile(q) for q in QUANTILES},
+                }
+                for stage, h in sorted(self._histograms.items())
+            }
+            counters = dict(sorted(self._counters.items()))
+
+        transactions = counters.get('transactions', 0)
+        return {
+            'stages': stages,
+            'counters': counters,
+            'alert_rate': counters.get('alerts', 0) / transactions if transactions else 0.0,
+            'ood_rate': counters.get('ood', 0) / transactions if transactions else 0.0,
+        }
+
+    def to_prometheus(self) -> str:
+        """
+        Render the metrics in the Prometheus text exposition format.
+
+        Stage latencies are exported as a summary with 0.5/0.95/0.99 quantiles, counters as
+        '<prefix>_<name>_total'.
+
+        Returns:
+            str: Exposition text
+        """
+        snapshot = self.snapshot()
+        name = f'{METRIC_PREFIX}_stage_seconds'
+        lines: List[str] = [
+            f'# HELP {name} Time spent per scoring stage.',
+            f'# TYPE {name} summary',
+        ]
+        for stage, stats in snapshot['stages'].items():
+            for q in QUANTILES:
+                lines.append(f'{name}{{stage="{stage}",quantile="{q}"}} {stats[f"p{int(q * 100)}"]:.9g}')
+            lines.append(f'{name}_sum{{stage="{stage}"}} {stats["sum"]:.9g}')
+            lines.append(f'{name}_count{{stage="{stage}"}} {stats["count"]}')
+
+        for counter, value in snapshot['counters'].items():
+            counter_name = f'{METRIC_PREFIX}_{counter}_total'
+            lines.append(f'# TYPE {counter_name} counter')
+            lines.append(f'{counter_name} {value:.9g}')
+        return '\n'.join(lines) + '\n'
+
+    def dump(self, path: Union[str, Path]) -> None:
+        """
+        Atomically write the Prometheus text to a file (e.g. for a node exporter textfile collector).
+
+        Args:
+            path (Path): Destination .prom file
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f'{path.name}.{os.getpid()}.tmp')
+        tmp_path.write_text(self.to_prometheus())
+        os.replace(tmp_path, path)
+
+
+_metrics: Optional[MetricsRegistry] = None
+_metrics_lock = threading.Lock()
+
+
+def get_metrics() -> MetricsRegistry:
+    """Return the process-wide registry configured from CONFIG['metrics']."""
+    global _metrics
+    if _metrics is None:
+        with _metrics_lock:
+            if _metrics is None:
+                settings = CONFIG.get('metrics', {})
+                _metrics = MetricsRegistry(enabled=settings.get('enabled', True))
+                dump_path = settings.get('dump_path')
+                if dump_path is not None and _metrics.enabled:
+                    if not Path(dump_path).is_absolute():
+                        dump_path = PROJECT_ROOT / dump_path
+                    atexit.register(_metrics.dump, dump_path)
+    return _metrics
+
+
+def span(stage: str) -> Any:
+    """Time a stage on the process-wide registry: `with span('predict'): ...`."""
+    return get_metrics().span(stage)
+
+
+def increment(name: str, amount: float = 1) -> None:
+    """Add to a counter on the process-wide registry."""
+    get_metrics().increment(name, amount)
+
+
+def timed(stage: str) -> Callable[[Callable], Callable]:
+    """Decorator timing every call of a function as a stage."""
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with get_metrics().span(stage):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def _reset_locks_in_child() -> None:
+    # A lock held by another thread at fork time would stay locked forever in a forked worker
+    global _metrics_lock
+    _metrics_lock = threading.Lock()
+    if _metrics is not None:
+        _metrics._lock = threading.Lock()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_locks_in_child)
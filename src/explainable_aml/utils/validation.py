@@ -3,6 +3,10 @@ from typing import Dict, List, Any
 import os
 import numpy as np
 
+# Bundle directory formats this version of the code can read
+SUPPORTED_BUNDLE_FORMAT_VERSIONS = (1,)
+MANIFEST_REQUIRED_KEYS = ['format_version', 'features', 'threshold', 'feature_ranges', 'training_data_version', 'trained_at']
+
 def validate_features(features: Dict[str, Any], required_features: List[str]) -> None:
     """
     Validate that all required features are present and have correct types.
@@ -42,14 +46,50 @@ def validate_file_exists(file_path: Path) -> None:
 def validate_model_bundle(bundle: Dict[str, Any]) -> None:
     """
     Validate that the model bundle contains all necessary components.
+
+    Accepts a legacy joblib bundle (model, features, threshold) or a bundle
+    directory manifest, recognised by its 'format_version' key.
     
     Args:
-        bundle: Dictionary containing model components
+        bundle: Dictionary containing model components, or a bundle manifest
         
     Raises:
         ValueError: If bundle is invalid
     """
+    if 'format_version' in bundle:
+        validate_bundle_manifest(bundle)
+        return
+
     required_keys = ['model', 'features', 'threshold']
     missing = [k for k in required_keys if k not in bundle]
     if missing:
         raise ValueError(f"Invalid model bundle. Missing keys: {missing}")
+
+def validate_bundle_manifest(manifest: Dict[str, Any]) -> None:
+    """
+    Validate the manifest of a bundle directory.
+
+    Args:
+        manifest: Parsed manifest.json contents
+
+    Raises:
+        ValueError: If the manifest is incomplete, inconsistent or from an unsupported format version
+    """
+    missing = [k for k in MANIFEST_REQUIRED_KEYS if k not in manifest]
+    if missing:
+        raise ValueError(f"Invalid bundle manifest. Missing keys: {missing}")
+
+    if manifest['format_version'] not in SUPPORTED_BUNDLE_FORMAT_VERSIONS:
+        raise ValueError(
+            f"Unsupported bundle format version {manifest['format_version']}. "
+            f"Supported versions: {SUPPORTED_BUNDLE_FORMAT_VERSIONS}"
+        )
+
+    unknown = [f for f in manifest['feature_ranges'] if f not in manifest['features']]
+    if unknown:
+        raise ValueError(f"Invalid bundle manifest. feature_ranges has unknown features: {unknown}")
+
+    for name, spec in manifest.get('arrays', {}).items():
+        shape = spec.get('shape', [])
+        if len(shape) != 2 or shape[-1] != len(manifest['features']):
+            raise ValueError(f"Invalid bundle manifest. Array '{name}' has shape {shape}, expected (n, {len(manifest['features'])})")
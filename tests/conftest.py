@@ -47,3 +47,12 @@ def sample_features():
         'country_risk': 0.1,
         'customer_age': 30
     }
+
+@pytest.fixture
+def trained_model_path(sample_data_path, temp_dir):
+    from explainable_aml.model.train_model import train_risk_model
+
+    model_path = str(temp_dir / "model_bundle")
+    # Train with sample data
+    train_risk_model(data_path=sample_data_path, model_path=model_path)
+    return model_path
@@ -0,0 +1,73 @@
+import pytest
+import json
+from datetime import datetime, timedelta
+from explainable_aml.utils.audit_store import AuditStore, query_events, read_segment_indexes
+from explainable_aml.utils.logging import AuditSink
+from explainable_aml.cli import main
+
+BASE_TIME = datetime(2024, 5, 14, 9, 0, 0)
+
+def _decision(i):
+    alert = i % 3 == 0
+    return {
+        'features': {'transaction_amount': float(i)},
+        'risk_score': 0.9 if alert else 0.1,
+        'alert_flag': alert,
+        'explanation': {'risk_band': 'High' if alert else 'Low', 'alert_flag': alert},
+        'nlp_explanation': {'pattern_id': 'ALERT_POS_COUNTRY_RISK' if alert else 'NO_ALERT_NEG_COUNTRY_RISK'},
+    }
+
+@pytest.fixture
+def store(temp_dir):
+    # Small segments and a dense offset index so rotation and seeking are exercised
+    store = AuditStore(temp_dir / "audit", max_segment_bytes=2000, index_stride=4)
+    for i in range(60):
+        event_type = 'decision_logged' if i % 2 == 0 else 'transaction_scored'
+        store.write_records([(BASE_TIME + timedelta(minutes=i), event_type, _decision(i))])
+    store.close()
+    return store
+
+def test_segments_are_rotated_and_indexed(store):
+    indexes = read_segment_indexes(store.root)
+    assert len(indexes) > 1
+    assert all(index['closed'] for index in indexes)
+    assert sum(index['n_records'] for index in indexes) == 60
+    assert all(index['min_ts'] <= index['max_ts'] for index in indexes)
+
+def test_query_filters(store):
+    start, end = BASE_TIME + timedelta(minutes=10), BASE_TIME + timedelta(minutes=29)
+    events = list(store.query(start=start, end=end))
+    assert [e['data']['features']['transaction_amount'] for e in events] == [float(i) for i in range(10, 30)]
+
+    decisions = list(store.query(event_type='decision_logged', alert_flag=True))
+    assert [e['data']['features']['transaction_amount'] for e in decisions] == [float(i) for i in range(0, 60, 6)]
+
+    high = list(store.query(risk_band='High', pattern_id='ALERT_POS_COUNTRY_RISK', limit=3))
+    assert len(high) == 3
+    assert list(store.query(pattern_id='UNKNOWN_PATTERN')) == []
+
+def test_sink_writes_to_store_and_cli_query(temp_dir, capsys):
+    store = AuditStore(temp_dir / "audit")
+    sink = AuditSink(store=store, flush_interval=0.01)
+    for i in range(5):
+        sink.emit('decision_logged', _decision(i))
+    sink.close()
+
+    main(['audit', 'query', '--store', str(temp_dir / "audit"), '--alert-flag', 'true'])
+    lines = capsys.readouterr().out.splitlines()
+    assert [json.loads(line)['data']['features']['transaction_amount'] for line in lines] == [0.0, 3.0]
+
+def test_query_bounds_and_out_of_order_records(temp_dir):
+    store = AuditStore(temp_dir / "audit", index_stride=2)
+    # Producer threads can hand records to the writer slightly out of order
+    minutes = [0, 1, 5, 2, 3, 8, 4, 6, 7, 9]
+    store.write_records([(BASE_TIME + timedelta(minutes=m), 'decision_logged', _decision(m)) for m in minutes])
+    store.write_records([(BASE_TIME + timedelta(days=1), 'decision_logged', _decision(99))])
+    store.close()
+
+    found = query_events(store.root, start=BASE_TIME + timedelta(minutes=4), end=BASE_TIME + timedelta(minutes=6))
+    assert sorted(e['data']['features']['transaction_amount'] for e in found) == [4.0, 5.0, 6.0]
+
+    # A date-only end covers that whole day
+    assert len(list(query_events(store.root, start='2024-05-14', end='2024-05-14'))) == len(minutes)
+    assert len(list(query_events(store.root, end='2024-05-15'))) == len(minutes) + 1
@@ -0,0 +1,118 @@
+import pytest
+import pandas as pd
+from explainable_aml.explainability import batch_score
+from explainable_aml.explainability.batch_score import score_file
+from explainable_aml.explainability.engine import get_engine, clear_engines
+from explainable_aml.cli import main
+from explainable_aml.config import CONFIG
+
+@pytest.fixture
+def input_path(sample_data, temp_dir):
+    path = temp_dir / "to_score.csv"
+    df = sample_data.copy()
+    df['transaction_id'] = [f"tx_{i}" for i in range(len(df))]
+    df.to_csv(path, index=False)
+    return path
+
+def test_score_file(trained_model_path, input_path, temp_dir):
+    output_path = temp_dir / "scored.csv"
+
+    try:
+        stats = score_file(input_path, output_path, model_path=trained_model_path, chunk_size=7, n_workers=1, include_nlp=True)
+        # Offline scoring is not live traffic for the drift monitor
+        assert get_engine(trained_model_path).drift.metrics()['rows'] == 0
+    finally:
+        clear_engines()
+
+    scored = pd.read_csv(output_path)
+    assert stats['rows'] == len(scored) == 20
+    assert stats['chunks'] == 3
+    assert list(scored['transaction_id']) == [f"tx_{i}" for i in range(20)]
+    for column in ['risk_score', 'alert_flag', 'risk_band', 'top_feature_1', 'top_contribution_1', 'ood_flag', 'nlp_text', 'pattern_id']:
+        assert column in scored.columns
+    assert not (temp_dir / "scored.csv.parts").exists()
+
+def _crash_before_concat(monkeypatch):
+    def crash(*args, **kwargs):
+        raise RuntimeError("crashed")
+    monkeypatch.setattr(batch_score, 'concat_files', crash)
+
+def test_score_file_parallel_resume(trained_model_path, input_path, temp_dir, monkeypatch):
+    output_path = temp_dir / "scored.csv"
+    score_file(input_path, output_path, model_path=trained_model_path, chunk_size=7, n_workers=2)
+    expected = pd.read_csv(output_path)
+
+    # Simulate a crash after the first chunk: only its part file is kept and skipped on resume
+    with monkeypatch.context() as m:
+        _crash_before_concat(m)
+        with pytest.raises(RuntimeError):
+            score_file(input_path, output_path, model_path=trained_model_path, chunk_size=7, n_workers=2)
+    parts_dir = temp_dir / "scored.csv.parts"
+    for index in (1, 2):
+        (parts_dir / f"part-{index:06d}.csv").unlink()
+
+    progress = []
+    stats = score_file(input_path, output_path, model_path=trained_model_path, chunk_size=7, n_workers=2,
+                       resume=True, progress=progress.append)
+    assert stats['skipped_chunks'] == 1
+    assert stats['chunks'] == 2
+    assert stats['rows'] == 13
+    assert [p['rows'] for p in progress] in ([6, 13], [7, 13])
+
+    resumed = pd.read_csv(output_path)
+    pd.testing.assert_frame_equal(resumed, expected)
+
+@pytest.mark.parametrize("change", ["chunk_size", "input", "options", "no_manifest"])
+def test_score_file_resume_refuses_other_run(trained_model_path, input_path, temp_dir, monkeypatch, change):
+    output_path = temp_dir / "scored.csv"
+    with monkeypatch.context() as m:
+        _crash_before_concat(m)
+        with pytest.raises(RuntimeError):
+            score_file(input_path, output_path, model_path=trained_model_path, chunk_size=7, n_workers=1)
+    parts_dir = temp_dir / "scored.csv.parts"
+
+    kwargs = {'chunk_size': 7}
+    if change == "chunk_size":
+        kwargs['chunk_size'] = 10
+    elif change == "input":
+        df = pd.read_csv(input_path)
+        pd.concat([df, df]).to_csv(input_path, index=False)
+    elif change == "options":
+        kwargs['top_k'] = 3
+    else:
+        (parts_dir / batch_score.RUN_MANIFEST).unlink()
+
+    try:
+        with pytest.raises(ValueError, match="Cannot resume"):
+            score_file(input_path, output_path, model_path=trained_model_path, n_workers=1, resume=True, **kwargs)
+    finally:
+        clear_engines()
+    assert not output_path.exists()
+    assert len(list(parts_dir.glob("part-*"))) == 3
+
+def test_score_cli_resume(trained_model_path, input_path, temp_dir):
+    output_path = temp_dir / "scored.csv"
+    main(['score', str(input_path), str(output_path), '--model-path', trained_model_path,
+          '--chunk-size', '7', '--workers', '2', '--resume'])
+    assert len(pd.read_csv(output_path)) == 20
+
+def test_score_file_parquet_mixed_chunks(trained_model_path, input_path, temp_dir, monkeypatch):
+    pytest.importorskip("pyarrow")
+    # Only out-of-range rows are explained, so the first chunk has no explanations at all
+    monkeypatch.setitem(CONFIG, 'explanation_policy',
+                        {'mode': 'tiered', 'explain_alerted': False, 'explain_risk_bands': [], 'explain_ood': True})
+    df = pd.read_csv(input_path)
+    df.loc[10:, 'transaction_amount'] = 1e12
+    df.to_csv(input_path, index=False)
+    output_path = temp_dir / "scored.parquet"
+
+    try:
+        stats = score_file(input_path, output_path, model_path=trained_model_path, chunk_size=10, n_workers=1, include_nlp=True)
+    finally:
+        clear_engines()
+
+    scored = pd.read_parquet(output_path)
+    assert stats['chunks'] == 2 and len(scored) == 20
+    assert list(scored['explained']) == [False] * 10 + [True] * 10
+    assert scored['top_feature_1'].isna().sum() == 10
+    assert scored.loc[10:, 'nlp_text'].str.startswith("This transaction").all()
@@ -0,0 +1,49 @@
+import pytest
+from explainable_aml.benchmarks import run_benchmarks, compare_results, write_results, read_results
+from explainable_aml.config import CONFIG
+from explainable_aml.utils.logging import log_event, flush_audit_log, set_audit_sink
+
+def _results(**values):
+    units = {'latency_ms': ('ms', 'lower'), 'rows_per_sec': ('rows/s', 'higher')}
+    return {'metrics': {name: {'value': v, 'unit': units[name][0], 'better': units[name][1]} for name, v in values.items()}}
+
+def test_compare_results():
+    baseline = _results(latency_ms=10.0, rows_per_sec=1000.0)
+
+    assert compare_results(baseline, _results(latency_ms=10.5, rows_per_sec=950.0), threshold_pct=10) == []
+
+    regressions = compare_results(baseline, _results(latency_ms=12.0, rows_per_sec=800.0), threshold_pct=10)
+    assert [r['metric'] for r in regressions] == ['latency_ms', 'rows_per_sec']
+    assert regressions[0]['change_pct'] == pytest.approx(20.0)
+    assert regressions[1]['change_pct'] == pytest.approx(20.0)
+
+    # Improvements and metrics missing from the baseline never count as regressions
+    assert compare_results(_results(latency_ms=10.0), _results(latency_ms=5.0, rows_per_sec=1.0)) == []
+
+def test_run_benchmarks(temp_dir, monkeypatch):
+    # A sink already in use by the process must not receive the benchmark's events
+    outside_log = temp_dir / "outside.log"
+    monkeypatch.setitem(CONFIG, 'log_path', outside_log)
+    monkeypatch.setitem(CONFIG, 'audit_log', {**CONFIG.get('audit_log', {}), 'store': 'file'})
+    previous_sink = set_audit_sink(None)
+    log_event('before_benchmark', {})
+
+    results = run_benchmarks(n_customers=200, batch_sizes=(1, 32), train_rows=(500,), repeats=1, n_single=10,
+                             suites=['batch', 'nlp', 'log_event'], work_dir=temp_dir / "bench")
+
+    assert results['meta']['suites'] == ['batch', 'nlp', 'log_event']
+    for name in ('explain_batch.rows_per_sec.bs_32', 'score_batch.rows_per_sec.bs_1',
+                 'generate_nlp_explanation.ops_per_sec', 'generate_nlp_explanations.rows_per_sec',
+                 'log_event.us_per_call'):
+        assert results['metrics'][name]['value'] > 0
+
+    flush_audit_log()
+    set_audit_sink(previous_sink).close()
+    assert 'benchmark_event' not in outside_log.read_text()
+    assert 'benchmark_event' in (temp_dir / "bench" / "logs" / "aml_events.log").read_text()
+
+    write_results(results, temp_dir / "bench.json")
+    assert compare_results(read_results(temp_dir / "bench.json"), results) == []
+
+    with pytest.raises(ValueError):
+        run_benchmarks(suites=['nope'])
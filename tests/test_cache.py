@@ -0,0 +1,53 @@
+import numpy as np
+from explainable_aml.explainability.cache import ExplanationCache, feature_keys
+from explainable_aml.explainability.engine import get_engine, clear_engines
+
+def test_feature_keys_are_canonical():
+    keys = feature_keys(np.array([[1000, -0.0, np.nan], [1000.0, 0.0, np.nan], [1000.5, 0.0, np.nan]]))
+    assert keys[0] == keys[1]
+    assert keys[0] != keys[2]
+
+def test_lru_eviction_and_ttl():
+    cache = ExplanationCache(max_entries=2, ttl_seconds=None)
+    for key in ('a', 'b'):
+        cache.put(key, np.arange(3.0))
+    assert cache.get('a') is not None  # 'a' becomes most recently used
+    cache.put('c', np.ones(3))
+
+    assert cache.get('b') is None
+    np.testing.assert_array_equal(cache.get('a'), np.arange(3.0))
+    metrics = cache.metrics()
+    assert (metrics['size'], metrics['hits'], metrics['misses'], metrics['evictions']) == (2, 2, 1, 1)
+
+    expiring = ExplanationCache(ttl_seconds=0)
+    expiring.put('a', np.ones(3))
+    assert expiring.get('a') is None
+    assert expiring.metrics()['expirations'] == 1
+
+def test_disk_tier_is_shared(temp_dir):
+    disk_path = temp_dir / "explanations.sqlite"
+    ExplanationCache(disk_path=disk_path).put(('v1', 'shap', b'row'), np.array([0.5, -0.25]))
+
+    other = ExplanationCache(disk_path=disk_path)
+    np.testing.assert_array_equal(other.get(('v1', 'shap', b'row')), [0.5, -0.25])
+    assert other.get(('v2', 'shap', b'row')) is None
+    assert other.metrics()['disk_hits'] == 1
+    other.clear()
+
+def test_engine_caches_explanations(trained_model_path, sample_data_path, sample_data):
+    try:
+        engine = get_engine(trained_model_path, sample_data_path, backend='xgboost')
+        engine.cache = ExplanationCache()
+        X = sample_data[engine.features].to_numpy(dtype=np.float64)
+
+        first = engine.explain_batch(X[:5])
+        second = engine.explain_batch(X[:5])
+        np.testing.assert_array_equal(first['shap_values'], second['shap_values'])
+        assert engine.cache.metrics()['hits'] == 5
+
+        # A different model version never reuses entries
+        engine.model_version = 'retrained'
+        engine.explain_batch(X[:5])
+        assert engine.cache.metrics()['misses'] == 10
+    finally:
+        clear_engines()
@@ -0,0 +1,108 @@
+import json
+import numpy as np
+import pytest
+import xgboost as xgb
+from explainable_aml.config import CONFIG
+from explainable_aml.model.bundle import load_model_bundle, save_model_bundle
+from explainable_aml.model.train_model import train_risk_model
+from explainable_aml.model.calibrate import threshold_curves, recommend_threshold, calibrate_threshold
+from explainable_aml.cli import main
+
+
+def _brute_force(y, scores, threshold):
+    alerted = scores > threshold
+    tp = int((alerted & (y == 1)).sum())
+    return int(alerted.sum()), tp
+
+
+def test_curves_match_brute_force():
+    rng = np.random.default_rng(0)
+    y = rng.integers(0, 2, 2000)
+    scores = np.round(np.clip(rng.normal(0.3 + 0.3 * y, 0.2), 0, 1), 2)  # Rounded: many ties
+    curves = threshold_curves(y, scores, cost_false_positive=1.0, cost_false_negative=5.0)
+
+    assert np.all(np.diff(curves['threshold']) > 0)
+    for i in rng.choice(len(curves['threshold']), 20, replace=False):
+        alerts, tp = _brute_force(y, scores, curves['threshold'][i])
+        assert curves['alerts'][i] == alerts
+        assert curves['tp'][i] == tp
+        assert curves['recall'][i] == tp / y.sum()
+        assert curves['cost'][i] == (alerts - tp) + 5.0 * (y.sum() - tp)
+
+
+def test_recommend_threshold_constraints():
+    rng = np.random.default_rng(1)
+    y = rng.integers(0, 2, 5000)
+    scores = rng.uniform(size=5000) * 0.5 + 0.5 * y * rng.uniform(size=5000)
+    curves = threshold_curves(y, scores)
+
+    budget = recommend_threshold(curves, alert_budget=0.1)
+    assert budget['alert_rate'] <= 0.1
+    assert (scores > budget['threshold']).mean() == budget['alert_rate']
+    # One step lower would exceed the budget
+    lower = curves['threshold'][np.searchsorted(curves['threshold'], budget['threshold']) - 1]
+    assert (scores > lower).mean() > 0.1
+
+    recall = recommend_threshold(curves, min_recall=0.8)
+    assert recall['recall'] >= 0.8
+    higher = curves['threshold'][np.searchsorted(curves['threshold'], recall['threshold']) + 1]
+    assert _brute_force(y, scores, higher)[1] / y.sum() < 0.8
+
+    cheapest = recommend_threshold(curves)
+    assert cheapest['cost'] == curves['cost'].min()
+
+    with pytest.raises(ValueError, match="No threshold"):
+        recommend_threshold(curves, alert_budget=0.01, min_recall=0.99)
+
+
+def test_calibrate_writes_threshold(trained_model_path, sample_data_path, temp_dir):
+    output_path = str(temp_dir / "calibrated_bundle")
+    result = calibrate_threshold(trained_model_path, data_path=sample_data_path, output_path=output_path,
+                                 min_recall=0.5, curves_path=temp_dir / "curves.json")
+
+    assert result['rows'] == 20
+    assert result['recommended']['recall'] >= 0.5
+    calibrated = load_model_bundle(output_path)
+    assert calibrated['threshold'] == result['recommended']['threshold']
+    assert calibrated['threshold_calibration']['min_recall'] == 0.5
+    assert load_model_bundle(trained_model_path)['threshold'] == result['previous']['threshold']
+    assert json.loads((temp_dir / "curves.json").read_text())['curves']['threshold']
+
+
+def test_calibrate_cli_dry_run(trained_model_path, sample_data_path, temp_dir, capsys):
+    before = load_model_bundle(trained_model_path)['threshold']
+    main(['calibrate', '--model-path', trained_model_path, '--data-path', sample_data_path, '--dry-run'])
+    out = capsys.readouterr().out
+    assert "Recommended threshold" in out and "written" not in out
+    assert load_model_bundle(trained_model_path)['threshold'] == before
+
+
+@pytest.mark.parametrize('mode', ['in_memory', 'streaming'])
+def test_default_calibration_rows_are_held_out(sample_data, sample_data_path, temp_dir, monkeypatch, mode):
+    monkeypatch.setitem(CONFIG, 'training', {**CONFIG.get('training', {}), 'mode': mode, 'chunk_size': 7})
+    monkeypatch.setitem(CONFIG, 'data_path', sample_data_path)
+    monkeypatch.setitem(CONFIG, 'calibration', {**CONFIG.get('calibration', {}), 'validation_path': None})
+    model_path = str(temp_dir / f"{mode}_bundle")
+    train_risk_model(data_path=sample_data_path, model_path=model_path)
+
+    scored = []
+    predict = xgb.Booster.inplace_predict
+    monkeypatch.setattr(xgb.Booster, 'inplace_predict', lambda self, X, *a, **k: scored.append(X) or predict(self, X, *a, **k))
+    result = calibrate_threshold(model_path, write=False, curves_path=temp_dir / "curves.json")
+
+    # With 20 rows the SHAP background holds every training row
+    training_rows = {tuple(row) for row in load_model_bundle(model_path)['background'].tolist()}
+    calibration_rows = {tuple(row) for row in np.concatenate(scored).astype(np.float32).tolist()}
+    assert len(training_rows) + result['rows'] == len(sample_data)
+    assert not training_rows & calibration_rows
+
+
+def test_calibration_needs_recorded_split(trained_model_path, sample_data_path, temp_dir, monkeypatch):
+    bundle = load_model_bundle(trained_model_path)
+    del bundle['eval_split']
+    save_model_bundle({k: v for k, v in bundle.items() if k != 'ood_stats'}, trained_model_path)
+    monkeypatch.setitem(CONFIG, 'data_path', sample_data_path)
+    monkeypatch.setitem(CONFIG, 'calibration', {**CONFIG.get('calibration', {}), 'validation_path': None})
+
+    with pytest.raises(ValueError, match="eval split"):
+        calibrate_threshold(trained_model_path, write=False, curves_path=temp_dir / "curves.json")
@@ -0,0 +1,48 @@
+import io
+import pandas as pd
+from explainable_aml.dashboard.case_queue import ScoringJob, read_uploaded_cases, filter_cases, page_cases, case_features
+from explainable_aml.explainability.engine import get_engine, clear_engines
+
+def test_scoring_job(trained_model_path, sample_data):
+    try:
+        engine = get_engine(trained_model_path)
+        cases = sample_data.copy()
+        cases['transaction_id'] = [f"tx_{i}" for i in range(len(cases))]
+
+        job = ScoringJob(cases, engine, chunk_size=7).start()
+        job.join(timeout=30)
+
+        assert job.done and job.error is None
+        assert job.progress == 1.0
+        assert len(job.result) == len(cases)
+        # An uploaded queue is historical data, not live traffic for the drift monitor
+        assert engine.drift.metrics()['rows'] == 0
+        pd.testing.assert_series_equal(
+            job.result['risk_score'], pd.Series(engine.score_batch(cases)['risk_score'], name='risk_score')
+        )
+        assert case_features(job.result, 3, engine.features) == cases[engine.features].iloc[3].to_dict()
+    finally:
+        clear_engines()
+
+def test_filter_and_page_cases():
+    cases = pd.DataFrame({
+        'transaction_id': [f"tx_{i}" for i in range(10)],
+        'risk_score': [0.1 * i for i in range(10)],
+        'alert_flag': [i >= 4 for i in range(10)],
+        'risk_band': ['Low'] * 3 + ['Borderline'] * 4 + ['High'] * 3,
+        'ood_flag': [i == 9 for i in range(10)],
+    })
+
+    assert list(filter_cases(cases, risk_bands=['High'])['transaction_id']) == ['tx_7', 'tx_8', 'tx_9']
+    assert list(filter_cases(cases, alert_only=True, ood_only=True).index) == [9]
+    assert list(filter_cases(cases, search='TX_1').index) == [1]
+
+    page, n_pages = page_cases(cases, page=2, page_size=4)
+    assert n_pages == 3
+    assert list(page['transaction_id']) == ['tx_5', 'tx_4', 'tx_3', 'tx_2']
+    # Out-of-range pages are clamped
+    assert list(page_cases(cases, page=99, page_size=4)[0].index) == [1, 0]
+
+def test_read_uploaded_cases(sample_data):
+    buffer = io.BytesIO(sample_data.to_csv(index=False).encode())
+    pd.testing.assert_frame_equal(read_uploaded_cases(buffer, 'queue.csv'), sample_data)
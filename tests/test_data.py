@@ -0,0 +1,40 @@
+import pytest
+import pandas as pd
+from explainable_aml.data.generate_data import generate_synthetic_data, iter_synthetic_data, write_synthetic_data
+from explainable_aml.utils.io import read_file_metadata
+
+def test_generate_synthetic_data():
+    df = generate_synthetic_data(n_customers=200, max_tx_per_customer=10, version="2.0", seed=7)
+
+    assert df['customer_id'].nunique() == 200
+    assert df['transaction_id'].is_unique
+    assert df['transaction_amount'].min() >= 10
+    assert df['country_risk'].between(0, 1).all()
+    assert set(df['is_money_laundering'].unique()) <= {0, 1}
+    assert 'generation_timestamp' not in df.columns
+    assert df.attrs['data_version'] == "2.0"
+
+    # Frequency is the number of the customer's transactions on the same day
+    same_day = df.groupby(['customer_id', 'transaction_date'])['transaction_id'].transform('count')
+    assert (df['transaction_frequency'] == same_day).all()
+
+    # Seeded generator is reproducible
+    again = generate_synthetic_data(n_customers=200, max_tx_per_customer=10, version="2.0", seed=7)
+    pd.testing.assert_frame_equal(df.drop(columns='transaction_date'), again.drop(columns='transaction_date'))
+
+def test_iter_synthetic_data_blocks():
+    blocks = list(iter_synthetic_data(n_customers=250, customers_per_block=100))
+    assert [b['customer_id'].nunique() for b in blocks] == [100, 100, 50]
+
+@pytest.mark.parametrize("file_name", ["transactions.csv", "transactions.parquet"])
+def test_write_synthetic_data(temp_dir, file_name):
+    if file_name.endswith(".parquet"):
+        pytest.importorskip("pyarrow")
+    path = temp_dir / file_name
+
+    metadata = write_synthetic_data(path, n_customers=50, version="3.0", customers_per_block=20)
+
+    df = pd.read_csv(path) if file_name.endswith(".csv") else pd.read_parquet(path)
+    assert len(df) == metadata['n_rows']
+    assert df['customer_id'].nunique() == 50
+    assert read_file_metadata(path)['data_version'] == "3.0"
@@ -0,0 +1,92 @@
+import numpy as np
+from explainable_aml.model.bundle import load_model_bundle
+from explainable_aml.model.drift import (
+    DriftMonitor, build_drift_reference, population_stability_index, ks_statistic, SCORE_SERIES
+)
+from explainable_aml.explainability.engine import ScoringEngine, clear_engines
+import explainable_aml.model.drift as drift_module
+
+FEATURES = ['a', 'b']
+
+
+def _reference(n=5000, seed=0):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(n, 2))
+    return build_drift_reference(X, 1 / (1 + np.exp(-X[:, 0])), FEATURES, n_bins=10)
+
+
+def test_reference_is_equal_frequency():
+    reference = _reference()
+    assert set(reference['series']) == {'a', 'b', SCORE_SERIES}
+    counts = np.array(reference['series']['a']['counts'])
+    assert len(counts) == 10 and abs(counts.max() - counts.min()) <= 2
+    assert abs(reference['series']['a']['quantiles']['p50']) < 0.1
+
+
+def test_psi_and_ks():
+    expected = np.array([100, 100, 100, 100])
+    assert population_stability_index(expected, expected * 3) == 0.0
+    assert ks_statistic(expected, expected) == 0.0
+    assert population_stability_index(expected, np.array([10, 40, 150, 200])) > 0.2
+    assert ks_statistic(expected, np.array([0, 0, 0, 400])) == 0.75
+
+
+def test_monitor_detects_shift_and_alerts(monkeypatch):
+    events = []
+    monkeypatch.setattr(drift_module, 'log_event', lambda event_type, data: events.append((event_type, data)))
+    rng = np.random.default_rng(1)
+    monitor = DriftMonitor(_reference(), window_seconds=60, n_windows=5)
+    now = 1_000_000.0
+
+    X = rng.normal(size=(2000, 2))
+    monitor.update(X, 1 / (1 + np.exp(-X[:, 0])), now=now)
+    metrics = monitor.check(now)
+    assert metrics['rows'] == 2000 and metrics['drifted'] == []
+    assert not events
+
+    # 'b' shifts by one standard deviation
+    X = rng.normal(size=(2000, 2)) + [0, 1]
+    monitor.update(X, 1 / (1 + np.exp(-X[:, 0])), now=now + 60)
+    metrics = monitor.check(now + 60)
+    assert metrics['drifted'] == ['b']
+    assert metrics['series']['a']['psi'] < 0.05
+    assert events[-1][0] == 'drift_detected' and events[-1][1]['drifted'] == ['b']
+
+    # Repeated checks with the same drift do not repeat the alert
+    monitor.check(now + 61)
+    assert len(events) == 1
+
+    # The shifted window slides out of the horizon
+    assert monitor.metrics(now + 60 * 6)['rows'] == 0
+
+
+def test_drained_counts_merge():
+    reference = _reference()
+    rng = np.random.default_rng(2)
+    X = rng.normal(size=(3000, 2))
+    scores = rng.uniform(size=3000)
+    now = 5_000_000.0
+
+    whole = DriftMonitor(reference, window_seconds=60, n_windows=5)
+    whole.update(X, scores, now=now)
+
+    parent = DriftMonitor(reference, window_seconds=60, n_windows=5)
+    for part in np.array_split(np.arange(3000), 3):
+        worker = parent.worker_copy()
+        worker.update(X[part], scores[part], now=now)
+        parent.merge(worker.drain())
+        assert worker.metrics(now)['rows'] == 0
+
+    assert parent.metrics(now) == whole.metrics(now)
+
+
+def test_trained_bundle_feeds_engine_monitor(trained_model_path, sample_data):
+    bundle = load_model_bundle(trained_model_path)
+    assert set(bundle['drift_reference']['series']) == set(bundle['features']) | {SCORE_SERIES}
+
+    engine = ScoringEngine(trained_model_path)
+    try:
+        engine.score_batch(sample_data[engine.features])
+        assert engine.drift.metrics()['rows'] == len(sample_data)
+    finally:
+        clear_engines()
@@ -1,15 +1,13 @@
+import copy
+import json
+import pickle
 import pytest
 import numpy as np
 from explainable_aml.model.train_model import train_risk_model
-from explainable_aml.explainability.explain import explain_transaction
+from explainable_aml.explainability.explain import explain_transaction, explain_batch
+from explainable_aml.explainability.engine import get_engine, clear_engines, batch_to_explanations
 from explainable_aml.config import CONFIG
-
-@pytest.fixture
-def trained_model_path(sample_data_path, temp_dir):
-    model_path = str(temp_dir / "model.pkl")
-    # Train with sample data
-    train_risk_model(data_path=sample_data_path, model_path=model_path)
-    return model_path
+from explainable_aml.utils.logging import AuditSink, set_audit_sink
 
 def test_explain_transaction(trained_model_path, sample_data_path, sample_features):
     # Reduce sampling for test data (which is small)
@@ -31,3 +29,199 @@ def test_explain_transaction(trained_model_path, sample_data_path, sample_featur
         assert isinstance(explanation["alert_flag"], (bool, np.bool_))
     finally:
         CONFIG['shap_background_samples'] = original_samples
+
+def test_engine_is_reused(trained_model_path, sample_data_path, sample_features):
+    original_samples = CONFIG['shap_background_samples']
+    CONFIG['shap_background_samples'] = 5
+
+    try:
+        engine = get_engine(trained_model_path, sample_data_path)
+        assert get_engine(trained_model_path, sample_data_path) is engine
+
+        first = engine.explain(sample_features)
+        second = explain_transaction(sample_features, model_path=trained_model_path, data_path=sample_data_path)
+        assert first == second
+
+        # Retraining the bundle in place invalidates the cached engine
+        train_risk_model(data_path=sample_data_path, model_path=trained_model_path)
+        assert get_engine(trained_model_path, sample_data_path) is not engine
+    finally:
+        CONFIG['shap_background_samples'] = original_samples
+        clear_engines()
+
+def test_explain_batch_matches_single(trained_model_path, sample_data_path, sample_data):
+    original_samples = CONFIG['shap_background_samples']
+    CONFIG['shap_background_samples'] = 5
+
+    try:
+        engine = get_engine(trained_model_path, sample_data_path)
+        X = sample_data[engine.features]
+        # Push one row outside the training range to exercise the OOD mask
+        X.loc[0, 'customer_age'] = 200
+
+        batch = explain_batch(X, model_path=trained_model_path, data_path=sample_data_path, top_k=3)
+        assert batch['risk_score'].shape == (len(X),)
+        assert batch['top_feature_indices'].shape == (len(X), 3)
+        assert batch['ood_flag'][0]
+
+        # NumPy input in bundle feature order gives the same result
+        array_batch = engine.explain_batch(X.to_numpy())
+        np.testing.assert_allclose(array_batch['risk_score'], batch['risk_score'])
+
+        batch_rows = batch_to_explanations(engine.explain_batch(X))
+        for i, row in enumerate(X.to_dict(orient='records')):
+            single = engine.explain(row)
+            assert single['risk_score'] == pytest.approx(batch_rows[i]['risk_score'])
+            assert single['risk_band'] == batch_rows[i]['risk_band']
+            assert single['ood_features'] == batch_rows[i]['ood_features']
+            assert [f['feature'] for f in single['top_features']] == [f['feature'] for f in batch_rows[i]['top_features']]
+    finally:
+        CONFIG['shap_background_samples'] = original_samples
+        clear_engines()
+
+def test_backend_parity(trained_model_path, sample_data_path, sample_data, temp_dir):
+    import shap
+    import xgboost as xgb
+    from explainable_aml.model.bundle import load_model_bundle, save_model_bundle
+
+    original_samples = CONFIG['shap_background_samples']
+    CONFIG['shap_background_samples'] = 5
+
+    try:
+        shap_engine = get_engine(trained_model_path, sample_data_path, backend='shap')
+        xgb_engine = get_engine(trained_model_path, sample_data_path, backend='xgboost')
+        X = sample_data[shap_engine.features].to_numpy(dtype=np.float64)
+
+        shap_batch = shap_engine.explain_batch(X)
+        xgb_batch = xgb_engine.explain_batch(X)
+
+        # Agree: scores, alerts, bands and OOD flags do not depend on the explanation backend
+        np.testing.assert_allclose(shap_batch['risk_score'], xgb_batch['risk_score'], rtol=1e-6)
+        np.testing.assert_array_equal(shap_batch['alert_flag'], xgb_batch['alert_flag'])
+        np.testing.assert_array_equal(shap_batch['risk_band'], xgb_batch['risk_band'])
+        assert batch_to_explanations(shap_batch)[0].keys() == batch_to_explanations(xgb_batch)[0].keys()
+
+        # Agree: native pred_contribs is exact path-dependent TreeSHAP
+        path_dependent = shap.TreeExplainer(shap_engine.model, feature_perturbation='tree_path_dependent').shap_values(X)
+        np.testing.assert_allclose(xgb_batch['shap_values'], path_dependent, atol=1e-5)
+
+        # Differ: the 'shap' backend is interventional over the background sample, so per-feature
+        # values (and the base value) differ; each backend is still additive against its own base
+        margin = xgb_engine.booster.predict(xgb.DMatrix(X, feature_names=xgb_engine.features), output_margin=True)
+        np.testing.assert_allclose(shap_batch['shap_values'].sum(axis=1) + shap_engine.explainer.expected_value, margin, atol=1e-4)
+        bias = xgb_engine.booster.predict(xgb.DMatrix(X, feature_names=xgb_engine.features), pred_contribs=True)[:, -1]
+        np.testing.assert_allclose(xgb_batch['shap_values'].sum(axis=1) + bias, margin, atol=1e-4)
+        assert not np.allclose(shap_batch['shap_values'], xgb_batch['shap_values'], atol=1e-6)
+
+        # Differ, provably: with a one-row background z, the interventional base value is the margin
+        # at z and z's own attributions are all zero, while path-dependent TreeSHAP keeps the
+        # training-cover base value and attributes margin(z) - base to z's features. Pick the z
+        # whose margin is farthest from that base, so the two cannot coincide.
+        assert np.ptp(margin) > 0
+        z = int(np.argmax(np.abs(margin - bias[0])))
+        bundle = load_model_bundle(trained_model_path)
+        bundle['background'] = X[[z]].astype(np.float32)
+        one_row_path = save_model_bundle(bundle, temp_dir / "one_row_background")
+        one_row = get_engine(str(one_row_path), sample_data_path, backend='shap')
+        x = bundle['background'].astype(np.float64)
+
+        interventional = one_row.explain_batch(x)['shap_values'][0]
+        path_dependent = xgb_engine.explain_batch(x)['shap_values'][0]
+        np.testing.assert_allclose(interventional, 0, atol=1e-6)
+        assert abs(path_dependent.sum()) > 1e-3
+        assert not np.isclose(one_row.explainer.expected_value, bias[0], atol=1e-3)
+    finally:
+        CONFIG['shap_background_samples'] = original_samples
+        clear_engines()
+
+def test_engine_uses_bundle_background(trained_model_path, sample_data_path, sample_features, temp_dir):
+    import joblib
+    from explainable_aml.model.bundle import load_model_bundle
+
+    original_samples = CONFIG['shap_background_samples']
+
+    try:
+        # The background stored in the bundle means no dataset is needed at inference time
+        engine = get_engine(trained_model_path, str(temp_dir / "missing.csv"))
+        assert not engine.uses_data_file
+        assert engine.explain(sample_features)['risk_score'] >= 0
+
+        # Legacy bundles without a stored background still sample it from the dataset
+        bundle = load_model_bundle(trained_model_path, mmap=False)
+        del bundle['background']
+        del bundle['ood_stats']
+        legacy_path = str(temp_dir / "legacy_model.pkl")
+        joblib.dump(bundle, legacy_path)
+        CONFIG['shap_background_samples'] = 5
+        legacy_engine = get_engine(legacy_path, sample_data_path)
+        assert legacy_engine.uses_data_file
+        assert legacy_engine.explain(sample_features)['risk_score'] >= 0
+    finally:
+        CONFIG['shap_background_samples'] = original_samples
+        clear_engines()
+
+def test_tiered_explanation(trained_model_path, sample_data_path, sample_data, sample_features):
+    try:
+        engine = get_engine(trained_model_path, sample_data_path, backend='xgboost')
+        X = sample_data[engine.features].to_numpy(dtype=np.float64)
+        full = engine.explain_batch(X)
+        policy = {'mode': 'tiered', 'explain_alerted': True, 'explain_risk_bands': ['High']}
+
+        # Only alerted / High-band rows go through SHAP; the rest keep placeholders
+        screened = engine.screen_batch(X, policy=policy)
+        expected = full['alert_flag'] | (full['risk_band'] == 'High')
+        np.testing.assert_array_equal(screened['explained'], expected)
+        np.testing.assert_allclose(screened['shap_values'][expected], full['shap_values'][expected])
+        assert np.isnan(screened['top_contributions'][~expected]).all()
+        assert (screened['top_feature_indices'][~expected] == -1).all()
+
+        # Explicitly requested rows are explained whatever the policy says
+        requested = np.zeros(len(X), dtype=bool)
+        requested[0] = True
+        assert engine.screen_batch(X, requested=requested, policy={'mode': 'tiered', 'explain_alerted': False})['explained'].tolist() == requested.tolist()
+
+        # Deferred top_features are computed on first access and match the eager result
+        rows = batch_to_explanations(screened, loader=engine.top_features_loader(X))
+        eager = batch_to_explanations(full)
+        for row, eager_row in zip(rows, eager):
+            assert 'top_features' in row
+            assert row['top_features'] == eager_row['top_features']
+            assert row.explained
+            assert list(row) == list(eager_row)
+
+        lazy = engine.explain(sample_features, requested=False)
+        assert lazy['top_features'] == engine.explain(sample_features, requested=True)['top_features']
+    finally:
+        clear_engines()
+
+def test_deferred_explanation_keeps_schema(trained_model_path, sample_data_path, sample_features, temp_dir, monkeypatch):
+    monkeypatch.setitem(CONFIG, 'explanation_policy', {'mode': 'tiered', 'explain_alerted': False, 'explain_risk_bands': [], 'explain_ood': False})
+    log_path = temp_dir / "audit.log"
+    previous = set_audit_sink(AuditSink(path=log_path, asynchronous=False))
+    try:
+        engine = get_engine(trained_model_path, sample_data_path)
+        eager = engine.explain(sample_features, requested=True)
+
+        # Serializing or copying a deferred explanation computes top_features first
+        for convert in (dict, lambda e: {**e}, lambda e: json.loads(json.dumps(e)), lambda e: pickle.loads(pickle.dumps(e)),
+                        lambda e: dict(zip(e.keys(), e.values())), lambda e: dict(e.items()), copy.copy):
+            lazy = engine.explain(sample_features)
+            assert not lazy.explained
+            assert convert(lazy) == eager
+            assert lazy.explained
+        assert engine.explain(sample_features) == eager
+        assert len(engine.explain(sample_features)) == len(eager)
+
+        # The scored record has no top_features until they are computed, then a follow-up record carries them
+        lazy = engine.explain(sample_features)
+        lazy['top_features']
+        with open(log_path) as f:
+            events = [json.loads(line.split(' - INFO - ', 1)[1]) for line in f]
+        scored, explained = events[-2:]
+        assert scored['event_type'] == 'transaction_scored' and 'top_features' not in scored['data']
+        assert explained['event_type'] == 'transaction_explained'
+        assert explained['data']['top_features'] == eager['top_features']
+        assert explained['data']['features'] == sample_features
+    finally:
+        set_audit_sink(previous).close()
+        clear_engines()
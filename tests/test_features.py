@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+from datetime import datetime, timedelta
+from explainable_aml.features.streaming import CustomerFeatureEngine
+
+
+def _transactions(n=300, seed=0):
+    rng = np.random.default_rng(seed)
+    start = datetime(2024, 1, 1)
+    df = pd.DataFrame({
+        'customer_id': rng.integers(0, 15, n),
+        'transaction_amount': rng.uniform(10, 5000, n),
+        'timestamp': [start + timedelta(hours=int(h)) for h in np.sort(rng.integers(0, 24 * 7, n))],
+        'country_risk': rng.uniform(0, 1, n),
+        'customer_age': rng.integers(18, 90, n),
+    })
+    return df
+
+
+def test_streamed_features_match_full_history(temp_dir):
+    df = _transactions()
+    engine = CustomerFeatureEngine(max_customers=100, idle_days=None)
+    streamed = pd.DataFrame([engine.process(event) for event in df.to_dict('records')])
+
+    # Reference from full history: mean of earlier amounts, same-day count so far
+    prior_mean = df.groupby('customer_id')['transaction_amount'].transform(lambda s: s.expanding().mean().shift())
+    expected_deviation = (df['transaction_amount'] - prior_mean).abs().fillna(0.0)
+    day = df['timestamp'].dt.date
+    expected_frequency = df.groupby(['customer_id', day]).cumcount() + 1
+
+    np.testing.assert_allclose(streamed['amount_deviation'], expected_deviation, rtol=1e-9, atol=1e-6)
+    assert (streamed['transaction_frequency'].values == expected_frequency.values).all()
+    assert list(streamed.columns) == ['transaction_amount', 'amount_deviation', 'transaction_frequency',
+                                      'country_risk', 'customer_age']
+    assert len(engine) == df['customer_id'].nunique()
+
+
+def test_eviction_bounds_memory():
+    engine = CustomerFeatureEngine(max_customers=2, idle_days=1)
+    engine.update('a', 100, datetime(2024, 1, 1), 0.1, 30)
+    engine.update('b', 100, datetime(2024, 1, 3), 0.1, 30)
+    engine.update('a', 200, datetime(2024, 1, 3), 0.1, 30)  # 'a' is now the most recent
+    engine.update('c', 100, datetime(2024, 1, 3), 0.1, 30)  # evicts 'b'
+
+    assert len(engine) == 2 and 'b' not in engine and 'a' in engine
+    assert engine.evictions == 1
+
+    assert engine.evict_idle(now=datetime(2024, 1, 5)) == 2
+    assert len(engine) == 0
+    # An evicted customer starts over
+    assert engine.update('a', 500, datetime(2024, 1, 5), 0.1, 30)['amount_deviation'] == 0.0
+
+
+def test_snapshot_restore_round_trip(temp_dir):
+    df = _transactions(seed=1)
+    events = df.to_dict('records')
+    half = len(events) // 2
+
+    continuous = CustomerFeatureEngine(max_customers=100)
+    expected = [continuous.process(event) for event in events]
+
+    engine = CustomerFeatureEngine(max_customers=100)
+    for event in events[:half]:
+        engine.process(event)
+    path = temp_dir / 'features' / 'state.json'
+    engine.snapshot(path)
+
+    restored = CustomerFeatureEngine.restore(path)
+    assert len(restored) == len(engine)
+    assert [restored.process(event) for event in events[half:]] == expected[half:]
@@ -0,0 +1,83 @@
+import numpy as np
+import pandas as pd
+from datetime import datetime, timedelta
+from explainable_aml.model.feedback import FeedbackStore, feedback_label, retrain_from_feedback
+from explainable_aml.model.bundle import load_model_bundle
+from explainable_aml.utils.logging import format_audit_line
+from explainable_aml.config import CONFIG
+
+FEATURES = ['transaction_amount', 'amount_deviation', 'transaction_frequency', 'country_risk', 'customer_age']
+
+def _write_feedback(log_path, df, start, alert_flags, verdicts):
+    with open(log_path, 'a') as f:
+        for i, (row, alert, verdict) in enumerate(zip(df[FEATURES].to_dict(orient='records'), alert_flags, verdicts)):
+            f.write(format_audit_line(start + timedelta(seconds=i), 'transaction_scored', {'risk_score': 0.1}))
+            f.write(format_audit_line(start + timedelta(seconds=i), 'feedback_provided', {
+                'features': row, 'risk_score': 0.5, 'alert_flag': bool(alert), 'feedback': verdict}))
+
+def test_feedback_label():
+    assert feedback_label({'alert_flag': True, 'feedback': 'Valid'}) == 1
+    assert feedback_label({'alert_flag': True, 'feedback': 'Invalid'}) == 0
+    assert feedback_label({'alert_flag': False, 'feedback': 'Invalid'}) == 1
+    assert feedback_label({'feedback': 'Valid'}) is None
+
+def test_feedback_store_sync_is_incremental(temp_dir, sample_data):
+    log_path = temp_dir / "aml_events.log"
+    store = FeedbackStore(temp_dir / "feedback.csv", source='file', log_path=log_path)
+    assert store.sync() == 0
+
+    start = datetime(2024, 5, 1)
+    _write_feedback(log_path, sample_data.head(5), start, [True] * 5, ['Valid', 'Invalid'] * 2 + ['Valid'])
+    assert store.sync() == 5
+    assert store.sync() == 0
+
+    _write_feedback(log_path, sample_data.iloc[5:8], start + timedelta(days=1), [False] * 3, ['Invalid'] * 3)
+    assert store.sync() == 3
+
+    cases = store.load()
+    assert len(cases) == 8
+    assert cases['is_money_laundering'].tolist() == [1, 0, 1, 0, 1, 1, 1, 1]
+    assert len(store.load(since=(start + timedelta(hours=1)).isoformat())) == 3
+
+def test_retrain_from_feedback(temp_dir):
+    from explainable_aml.data.generate_data import generate_synthetic_data
+    from explainable_aml.model.train_model import train_risk_model
+
+    df = generate_synthetic_data(n_customers=400, seed=3)
+    data_path = temp_dir / "transactions.csv"
+    df.to_csv(data_path, index=False)
+    model_path = temp_dir / "model_bundle"
+    train_risk_model(str(data_path), str(model_path))
+    base = load_model_bundle(model_path)
+
+    # Analysts report a new typology the model misses: high country risk alone is suspicious
+    cases = df.sample(200, random_state=0)
+    labels = cases['country_risk'] > 0.5
+    alert_flags = base['model'].predict_proba(cases[FEATURES])[:, 1] >= base['threshold']
+    verdicts = np.where(alert_flags == labels, 'Valid', 'Invalid')
+    log_path = temp_dir / "aml_events.log"
+    _write_feedback(log_path, cases, datetime(2024, 5, 1), alert_flags, verdicts)
+    store = FeedbackStore(temp_dir / "feedback.csv", source='file', log_path=log_path)
+
+    # A gate that demands a large improvement keeps the current bundle
+    saved = CONFIG.get('feedback')
+    CONFIG['feedback'] = {**(saved or {}), 'tolerance': -1.0}
+    try:
+        result = retrain_from_feedback(str(model_path), store=store)
+    finally:
+        CONFIG['feedback'] = saved
+    assert result['status'] == 'rejected'
+    assert load_model_bundle(model_path)['trained_at'] == base['trained_at']
+
+    output_path = temp_dir / "model_bundle_v2"
+    result = retrain_from_feedback(str(model_path), str(output_path), store=store, rounds=20)
+    assert result['status'] == 'accepted', result
+    assert result['n_cases'] == 200
+    updated = load_model_bundle(output_path)
+    n_base = base['model'].get_booster().num_boosted_rounds()
+    assert updated['model'].get_booster().num_boosted_rounds() == n_base + 20
+    assert updated['feedback_cases'] == 200
+    assert updated['parent_version'].startswith(base['trained_at'])
+
+    # Cases already folded into the new version are not used again
+    assert retrain_from_feedback(str(output_path), store=store)['status'] == 'skipped'
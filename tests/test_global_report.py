@@ -0,0 +1,145 @@
+import json
+import pytest
+import numpy as np
+import pandas as pd
+from explainable_aml.explainability.engine import RISK_BAND_EDGES, clear_engines, get_engine
+from explainable_aml.explainability.global_report import (
+    build_global_report, GlobalShapAggregate, histogram_quantiles, contribution_bounds, contribution_edges
+)
+from explainable_aml.cli import main
+
+
+def test_global_report_matches_full_pass(trained_model_path, sample_data_path, temp_dir):
+    output_path = temp_dir / "report.json"
+    try:
+        report = build_global_report(sample_data_path, output_path, model_path=trained_model_path, chunk_size=6, n_workers=1)
+        engine = get_engine(trained_model_path)
+        X = pd.read_csv(sample_data_path)[engine.features].to_numpy(dtype=np.float64)
+        shap_values = engine._compute_shap_values(X)
+        risk_score = engine.score_batch(X)['risk_score']
+    finally:
+        clear_engines()
+
+    assert report['rows'] == 20
+    assert sum(report['band_counts'].values()) == 20
+    assert json.loads(output_path.read_text())['rows'] == 20
+
+    expected = np.abs(shap_values).mean(axis=0)
+    by_feature = {f['feature']: f for f in report['features']}
+    for j, feature in enumerate(engine.features):
+        summary = by_feature[feature]
+        assert np.isclose(summary['mean_abs_shap'], expected[j])
+        assert np.isclose(summary['min_shap'], shap_values[:, j].min())
+        assert sum(summary['dependence']['count']) == 20
+        assert sum(sum(b['histogram']) for b in summary['bands'].values()) == 20
+    assert [f['rank'] for f in report['features']] == [1, 2, 3, 4, 5]
+    assert report['features'][0]['mean_abs_shap'] == max(expected)
+
+    bands = np.searchsorted(RISK_BAND_EDGES, risk_score, side='right')
+    assert report['band_counts']['High'] == int((bands == 2).sum())
+
+
+def test_parallel_report_matches_serial(trained_model_path, sample_data_path, temp_dir):
+    try:
+        serial = build_global_report(sample_data_path, temp_dir / "serial.json", model_path=trained_model_path,
+                                     chunk_size=6, n_workers=1)
+    finally:
+        clear_engines()
+    parallel = build_global_report(sample_data_path, temp_dir / "parallel.json", model_path=trained_model_path,
+                                   chunk_size=6, n_workers=2)
+    clear_engines()
+
+    for s, p in zip(serial['features'], parallel['features']):
+        assert s['feature'] == p['feature']
+        assert np.isclose(s['mean_abs_shap'], p['mean_abs_shap'])
+        assert s['dependence']['count'] == p['dependence']['count']
+        for band in s['bands']:
+            assert s['bands'][band]['histogram'] == p['bands'][band]['histogram']
+
+
+def test_aggregate_merge_and_quantiles():
+    rng = np.random.default_rng(0)
+    X, shap_values = rng.normal(size=(1000, 2)), rng.normal(size=(1000, 2))
+    bands = rng.integers(0, 3, 1000)
+    shap_edges = np.tile(np.linspace(-5, 5, 101), (2, 1))
+    value_edges = [np.linspace(-4, 4, 9)] * 2
+
+    whole = GlobalShapAggregate(shap_edges, value_edges)
+    whole.update(X, shap_values, bands)
+    merged = GlobalShapAggregate(shap_edges, value_edges)
+    for part in np.array_split(np.arange(1000), 4):
+        piece = GlobalShapAggregate(shap_edges, value_edges)
+        piece.update(X[part], shap_values[part], bands[part])
+        merged.merge(piece)
+
+    assert (merged.histograms == whole.histograms).all()
+    assert np.allclose(merged.sum_abs, whole.sum_abs)
+    quantiles = histogram_quantiles(whole.histograms.sum(axis=0)[0], shap_edges[0], (0.5, 0.95))
+    assert abs(quantiles['p50'] - np.median(shap_values[:, 0])) < 0.1
+    assert abs(quantiles['p95'] - np.quantile(shap_values[:, 0], 0.95)) < 0.1
+
+
+def test_report_cli(trained_model_path, sample_data_path, temp_dir, capsys):
+    output_path = temp_dir / "cli_report.json"
+    try:
+        main(['report', sample_data_path, '--output', str(output_path), '--model-path', trained_model_path, '--workers', '1'])
+    finally:
+        clear_engines()
+    assert output_path.exists()
+    assert "Summarized 20 rows" in capsys.readouterr().out
+
+
+def test_report_skips_drift_and_explains_each_chunk_once(trained_model_path, sample_data_path, temp_dir, monkeypatch):
+    try:
+        engine = get_engine(trained_model_path)
+        calls = []
+        compute = engine._compute_shap_values
+        monkeypatch.setattr(engine, '_compute_shap_values', lambda X: calls.append(len(X)) or compute(X))
+
+        build_global_report(sample_data_path, temp_dir / "report.json", model_path=trained_model_path, chunk_size=6, n_workers=1)
+        assert calls[1:] == [6, 6, 6, 2]  # After warm_up's single row
+        assert engine.drift.metrics()['rows'] == 0
+    finally:
+        clear_engines()
+
+
+@pytest.mark.parametrize("backend", ["shap", "xgboost"])
+def test_contribution_bounds_hold_for_any_input(trained_model_path, sample_data_path, backend):
+    try:
+        engine = get_engine(trained_model_path, sample_data_path, backend=backend)
+        X = pd.read_csv(sample_data_path)[engine.features].to_numpy(dtype=np.float64)
+        X = np.vstack([X, X * 1000, -X, np.zeros_like(X)])
+        shap_values = engine._compute_shap_values(X)
+        bounds = contribution_bounds(engine.model.get_booster(), engine.features)
+    finally:
+        clear_engines()
+
+    assert (np.abs(shap_values) <= bounds + 1e-6).all()
+    edges = contribution_edges(bounds, 4, 1e-4)
+    assert (edges[:, 0] <= -bounds).all() and (edges[:, -1] >= bounds).all()
+    assert (np.diff(edges, axis=1) > 0).all()
+
+def test_report_histograms_do_not_depend_on_first_chunk(trained_model_path, sample_data_path, temp_dir):
+    # Later chunks reach far outside the first chunk's feature values (and so its contributions)
+    df = pd.read_csv(sample_data_path)
+    wide = df.copy()
+    wide['transaction_amount'] *= 1000
+    wide['amount_deviation'] = -wide['amount_deviation']
+    input_path = temp_dir / "wide.csv"
+    pd.concat([df.iloc[:6].assign(transaction_amount=df['transaction_amount'].median()), wide]).to_csv(input_path, index=False)
+
+    try:
+        report = build_global_report(input_path, temp_dir / "report.json", model_path=trained_model_path, chunk_size=6, n_workers=1)
+        engine = get_engine(trained_model_path)
+        shap_values = engine._compute_shap_values(pd.read_csv(input_path)[engine.features].to_numpy(dtype=np.float64))
+    finally:
+        clear_engines()
+
+    for summary in report['features']:
+        j = engine.features.index(summary['feature'])
+        edges = np.array(summary['shap_bin_edges'])
+        assert summary['clipped_shap'] == 0
+        expected = np.bincount(np.searchsorted(edges, shap_values[:, j], side='right') - 1, minlength=len(edges) - 1)
+        histogram = np.sum([b['histogram'] for b in summary['bands'].values()], axis=0)
+        assert histogram.tolist() == expected.tolist()
+    assert sum(f['dependence']['clipped'] for f in report['features']) > 0
@@ -0,0 +1,53 @@
+import numpy as np
+from explainable_aml.utils.metrics import MetricsRegistry, Histogram, get_metrics
+from explainable_aml.explainability.explain import explain_transaction
+from explainable_aml.explainability.engine import clear_engines
+
+def test_histogram_quantiles():
+    values = np.random.default_rng(0).exponential(0.01, 10000)
+    histogram = Histogram()
+    for value in values:
+        histogram.observe(value)
+
+    for q in (0.5, 0.95, 0.99):
+        assert abs(histogram.quantile(q) - np.quantile(values, q)) / np.quantile(values, q) < 0.1
+    assert histogram.count == len(values)
+
+    merged = Histogram()
+    merged.merge(histogram)
+    merged.merge(histogram)
+    assert merged.count == 2 * len(values)
+    assert merged.quantile(0.5) == histogram.quantile(0.5)
+
+def test_registry_export(temp_dir):
+    registry = MetricsRegistry()
+    with registry.span('predict'):
+        pass
+    registry.increment('transactions', 4)
+    registry.increment('ood')
+
+    snapshot = registry.snapshot()
+    assert snapshot['stages']['predict']['count'] == 1
+    assert snapshot['ood_rate'] == 0.25
+
+    registry.dump(temp_dir / "metrics.prom")
+    text = (temp_dir / "metrics.prom").read_text()
+    assert 'explainable_aml_stage_seconds_count{stage="predict"} 1' in text
+    assert 'explainable_aml_transactions_total 4' in text
+
+    disabled = MetricsRegistry(enabled=False)
+    with disabled.span('predict'):
+        disabled.increment('errors')
+    assert disabled.snapshot() == {'stages': {}, 'counters': {}, 'alert_rate': 0.0, 'ood_rate': 0.0}
+
+def test_explain_transaction_is_instrumented(trained_model_path, sample_features):
+    metrics = get_metrics()
+    metrics.reset()
+    try:
+        explain_transaction(sample_features, model_path=trained_model_path)
+        snapshot = metrics.snapshot()
+        for stage in ('bundle_load', 'explainer_build', 'predict', 'ood_check', 'audit_log', 'explain_transaction'):
+            assert snapshot['stages'][stage]['count'] == 1
+        assert snapshot['counters']['transactions'] == 1
+    finally:
+        clear_engines()
@@ -1,6 +1,11 @@
 import pytest
 import os
-from explainable_aml.model.train_model import train_risk_model
+import time
+import threading
+import numpy as np
+from explainable_aml.model.train_model import train_risk_model, train_risk_model_streaming
+from explainable_aml.model import bundle as bundle_module
+from explainable_aml.model.bundle import load_model_bundle, save_model_bundle, bundle_signature
 from explainable_aml.config import CONFIG
 
 def test_train_risk_model(sample_data_path, temp_dir):
@@ -21,3 +26,96 @@ def test_train_risk_model(sample_data_path, temp_dir):
     # Check model works
     model = bundle["model"]
     assert hasattr(model, "predict")
+
+def test_bundle_background(sample_data_path, temp_dir):
+    bundle = train_risk_model(data_path=sample_data_path, model_path=str(temp_dir / "model.pkl"))
+
+    background = bundle["background"]
+    assert background.dtype == np.float32
+    assert background.shape[1] == len(bundle["features"])
+    assert 0 < len(background) <= CONFIG['shap_background_samples']
+
+def test_bundle_directory_round_trip(sample_data_path, temp_dir):
+    model_path = temp_dir / "model_bundle"
+    bundle = train_risk_model(data_path=sample_data_path, model_path=str(model_path))
+
+    assert (model_path / "manifest.json").exists()
+    assert (model_path / "model.ubj").exists()
+
+    loaded = load_model_bundle(model_path)
+    assert loaded["features"] == bundle["features"]
+    assert loaded["threshold"] == bundle["threshold"]
+    assert loaded["trained_at"] == bundle["trained_at"]
+    assert isinstance(loaded["background"], np.memmap)
+    np.testing.assert_array_equal(loaded["background"], bundle["background"])
+    assert loaded["ood_stats"].shape == (2, len(bundle["features"]))
+
+    X = bundle["background"]
+    np.testing.assert_allclose(loaded["model"].predict_proba(X), bundle["model"].predict_proba(X), rtol=1e-6)
+
+    # Legacy joblib bundles are still readable
+    train_risk_model(data_path=sample_data_path, model_path=str(temp_dir / "model.pkl"))
+    legacy = load_model_bundle(temp_dir / "model.pkl")
+    assert legacy["features"] == bundle["features"]
+    assert hasattr(legacy["model"], "predict_proba")
+
+def test_readers_wait_out_bundle_replacement(sample_data_path, temp_dir, monkeypatch):
+    model_path = temp_dir / "model_bundle"
+    bundle = train_risk_model(data_path=sample_data_path, model_path=str(model_path))
+
+    # Pause the writer between moving the old bundle aside and renaming the new one in
+    moved_aside = threading.Event()
+    rename = os.rename
+
+    def slow_rename(src, dst):
+        rename(src, dst)
+        if '.old-' in str(dst):
+            moved_aside.set()
+            time.sleep(0.3)
+    monkeypatch.setattr(bundle_module.os, 'rename', slow_rename)
+
+    writer = threading.Thread(target=save_model_bundle, args=({**bundle, 'threshold': 0.9}, model_path))
+    writer.start()
+    assert moved_aside.wait(timeout=10)
+    assert not model_path.exists()
+    assert bundle_signature(model_path)
+    assert load_model_bundle(model_path)['threshold'] == 0.9
+    writer.join()
+
+    # A bundle that is simply missing still fails at once
+    start = time.monotonic()
+    with pytest.raises(FileNotFoundError):
+        load_model_bundle(temp_dir / "missing_bundle")
+    assert time.monotonic() - start < bundle_module.SWAP_WAIT_SECONDS
+
+def test_streaming_training_matches_in_memory(temp_dir):
+    from explainable_aml.data.generate_data import generate_synthetic_data
+
+    data_path = temp_dir / "transactions.csv"
+    df = generate_synthetic_data(n_customers=300)
+    df.to_csv(data_path, index=False)
+
+    in_memory = train_risk_model(data_path=str(data_path), model_path=str(temp_dir / "in_memory"))
+    streamed = train_risk_model_streaming(data_path=str(data_path), model_path=str(temp_dir / "streamed"), chunk_size=250, n_jobs=2)
+
+    # Ranges are accumulated chunk by chunk over the same rows
+    for feature, bounds in in_memory['feature_ranges'].items():
+        assert streamed['feature_ranges'][feature] == pytest.approx(bounds)
+    assert streamed['background'].shape == (CONFIG['shap_background_samples'], len(streamed['features']))
+
+    loaded = load_model_bundle(temp_dir / "streamed")
+    X = df[streamed['features']]
+    np.testing.assert_allclose(loaded['model'].predict_proba(X)[:, 1], streamed['model'].predict_proba(X)[:, 1], rtol=1e-6)
+    # Both models learn the same signal
+    agreement = ((loaded['model'].predict_proba(X)[:, 1] > 0.5) == (in_memory['model'].predict_proba(X)[:, 1] > 0.5)).mean()
+    assert agreement > 0.95
+
+def test_streaming_training_custom_max_bin(temp_dir, sample_data, monkeypatch):
+    # The booster, training and eval matrices must all use the configured bin count
+    monkeypatch.setitem(CONFIG, 'training', {**CONFIG.get('training', {}), 'max_bin': 64})
+    data_path = temp_dir / "transactions.csv"
+    sample_data.sample(200, replace=True, random_state=0).to_csv(data_path, index=False)
+
+    bundle = train_risk_model_streaming(data_path=str(data_path), model_path=str(temp_dir / "streamed"), chunk_size=50)
+    scores = bundle['model'].predict_proba(sample_data[bundle['features']])[:, 1]
+    assert scores.shape == (len(sample_data),)
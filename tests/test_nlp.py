@@ -1,5 +1,9 @@
+import numpy as np
 import pytest
-from explainable_aml.nlp.generate_explanation import generate_nlp_explanation
+from explainable_aml.explainability.engine import batch_to_explanations
+from explainable_aml.nlp.generate_explanation import (
+    generate_nlp_explanation, generate_nlp_explanations, GENERATOR_VERSION
+)
 
 def test_generate_nlp_explanation(sample_features):
     explanation_input = {
@@ -20,3 +24,95 @@ def test_generate_nlp_explanation(sample_features):
     assert "pattern_id" in nlp_result
     assert "0.8" in nlp_result["text"]
     assert "High" in nlp_result["text"]
+
+
+def _explained_batch(n=300, seed=0):
+    rng = np.random.default_rng(seed)
+    features = ['transaction_amount', 'amount_deviation', 'transaction_frequency', 'country_risk', 'customer_age']
+    contributions = rng.normal(size=(n, 3))
+    contributions[::5] = 0.0  # All-zero rows
+    contributions[::7, 1] = 0.0
+    ood_mask = rng.random((n, len(features))) < 0.1
+    explained = rng.random(n) < 0.8
+    batch = {
+        'features': features,
+        'risk_score': rng.random(n),
+        'alert_flag': rng.random(n) < 0.3,
+        'risk_band': np.array(['Low', 'Medium', 'High'], dtype=object)[rng.integers(0, 3, n)],
+        'ood_mask': ood_mask,
+        'ood_flag': ood_mask.any(axis=1),
+        'top_feature_indices': np.where(explained[:, None], np.argsort(rng.random((n, len(features))), axis=1)[:, :3], -1),
+        'top_contributions': np.where(explained[:, None], contributions, np.nan),
+        'explained': explained,
+    }
+    return batch, rng.normal(size=(n, len(features))) * 100
+
+
+def test_batch_matches_single_generator():
+    batch, X = _explained_batch()
+    narratives = generate_nlp_explanations(batch, X)
+
+    for i, explanation in enumerate(batch_to_explanations(batch)):
+        if not batch['explained'][i]:
+            assert narratives[i] is None
+            continue
+        expected = generate_nlp_explanation(explanation, dict(zip(batch['features'], X[i].tolist())))
+        assert narratives[i] == expected
+        assert expected['text'].count("The primary factors") <= 1
+        assert expected['generator_version'] == GENERATOR_VERSION
+
+
+def test_lazy_narratives_render_on_read():
+    batch, X = _explained_batch()
+    eager = generate_nlp_explanations(batch, X)
+    lazy = generate_nlp_explanations(batch, X, lazy=True)
+
+    i = int(np.flatnonzero(batch['explained'])[0])
+    assert not lazy[i].rendered and 'text' in lazy[i]
+    assert lazy[i]['pattern_id'] is eager[i]['pattern_id']  # Interned
+    assert lazy[i]['text'] == eager[i]['text']
+    assert lazy[i].rendered and list(lazy[i]) == list(eager[i])
+
+
+def test_batch_requires_explanations():
+    batch, X = _explained_batch()
+    score_only = {k: v for k, v in batch.items() if k not in ('top_feature_indices', 'top_contributions', 'explained')}
+    with pytest.raises(ValueError):
+        generate_nlp_explanations(score_only, X)
+
+
+def test_v1_1_text_is_pinned(sample_features):
+    explanation = {
+        "risk_score": 0.8123,
+        "alert_flag": True,
+        "risk_band": "High",
+        "top_features": [
+            {'feature': 'transaction_amount', 'contribution': 0.5},
+            {'feature': 'country_risk', 'contribution': -0.25},
+        ],
+        "ood_flag": False,
+        "ood_features": [],
+    }
+    result = generate_nlp_explanation(explanation, sample_features)
+    assert result["text"] == (
+        "This transaction received a model risk score of 0.8123 (High risk band). "
+        "Based on the configured threshold, the model flagged this transaction as higher risk. "
+        "The primary factors influencing this score were:\n"
+        "- The feature 'transaction amount' with a value of 100.00 increased the model’s risk score by 0.5000.\n"
+        "- The feature 'country risk' with a value of 0.10 decreased the model’s risk score by 0.2500.\n"
+    )
+    assert result["pattern_id"] == "ALERT_POS_TRANSACTION_AMOUNT_NEG_COUNTRY_RISK"
+
+    zero = {**explanation, "risk_score": 0.01, "alert_flag": False, "risk_band": "Low",
+            "top_features": [{'feature': 'customer_age', 'contribution': 0.0}],
+            "ood_flag": True, "ood_features": ["customer_age"]}
+    assert generate_nlp_explanation(zero, sample_features)["text"] == (
+        "This transaction received a model risk score of 0.0100 (Low risk band). "
+        "Based on the configured threshold, the model did not flag this transaction. "
+        "Warning: The following features have values outside the range observed during training: customer_age. "
+        "As a result, the model's assessment may be unreliable. "
+        "The primary factors influencing this score were:\n"
+        "The model assigned a low risk score, but none of the input features materially influenced this result. "
+        "This typically occurs when feature values fall outside the range observed during training, "
+        "limiting the model’s ability to assess risk reliably.\n"
+    )
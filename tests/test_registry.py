@@ -0,0 +1,84 @@
+import threading
+import numpy as np
+import pytest
+from explainable_aml.model.registry import ModelRegistry
+from explainable_aml.model.train_model import train_risk_model
+from explainable_aml.explainability.engine import EngineManager, get_engine, clear_engines
+from explainable_aml.config import CONFIG
+
+def test_publish_and_activate(trained_model_path, temp_dir):
+    registry = ModelRegistry(temp_dir / "registry")
+    assert registry.versions() == []
+    assert registry.active_version() is None
+    with pytest.raises(FileNotFoundError):
+        registry.active_path()
+
+    assert registry.publish(trained_model_path) == "v0001"
+    assert registry.active_version() is None
+    assert registry.publish(trained_model_path, activate=True) == "v0002"
+    assert registry.versions() == ["v0001", "v0002"]
+    assert registry.active_path() == registry.path("v0002")
+
+    registry.activate("v0001")
+    assert registry.active_version() == "v0001"
+    with pytest.raises(FileNotFoundError):
+        registry.activate("v0009")
+    assert registry.active_version() == "v0001"
+
+def test_engine_manager_hot_swap(sample_data_path, trained_model_path, temp_dir):
+    registry = ModelRegistry(temp_dir / "registry")
+    registry.publish(trained_model_path, activate=True)
+    manager = EngineManager(registry=registry, poll_interval=0)
+    old_engine = manager.current()
+    assert manager.check() is False
+
+    # Score continuously while a new version is published and swapped in
+    X = np.asarray(old_engine.bundle['background'][:4], dtype=np.float64)
+    stop, errors, n_scored = threading.Event(), [], [0]
+
+    def score():
+        while not stop.is_set():
+            try:
+                manager.current().score_batch(X)
+                n_scored[0] += 1
+            except Exception as e:
+                errors.append(e)
+
+    thread = threading.Thread(target=score)
+    thread.start()
+    try:
+        train_risk_model(data_path=sample_data_path, model_path=str(temp_dir / "new_bundle"))
+        registry.publish(temp_dir / "new_bundle", activate=True)
+        assert manager.check() is True
+    finally:
+        stop.set()
+        thread.join()
+    assert errors == []
+    assert n_scored[0] > 0
+
+    assert manager.swaps == 1
+    assert manager.current() is not old_engine
+    assert manager.current().model_path == registry.path("v0002")
+    # Requests holding the old engine can still finish on it
+    assert len(old_engine.score_batch(X)['risk_score']) == 4
+
+    # A broken version is skipped and the live engine kept
+    (registry.path("v0001") / "model.ubj").write_text("corrupt")
+    registry.activate("v0001")
+    live = manager.current()
+    assert manager.check() is False
+    assert manager.current() is live
+    assert manager.last_error is not None
+
+def test_get_engine_serves_active_version(trained_model_path, temp_dir):
+    registry = ModelRegistry(temp_dir / "registry")
+    registry.publish(trained_model_path, activate=True)
+    saved = CONFIG.get('model_registry')
+    CONFIG['model_registry'] = {'path': str(registry.root), 'poll_interval_seconds': 0}
+    try:
+        engine = get_engine()
+        assert engine.model_path.resolve() == registry.path("v0001").resolve()
+        assert get_engine() is engine
+    finally:
+        CONFIG['model_registry'] = saved
+        clear_engines()
@@ -0,0 +1,98 @@
+import pytest
+import asyncio
+import numpy as np
+from explainable_aml.serving.server import ScoringService
+from explainable_aml.serving.loadgen import HttpClient, run_load
+from explainable_aml.explainability.engine import clear_engines
+
+@pytest.fixture
+def service_factory(trained_model_path):
+    yield lambda **kwargs: ScoringService(model_path=trained_model_path, **kwargs)
+    clear_engines()
+
+def test_service_endpoints(service_factory, sample_data, sample_features):
+    async def scenario():
+        service = service_factory(max_batch_size=8, max_wait_ms=20)
+        await service.start('127.0.0.1', 0)
+        client = HttpClient('127.0.0.1', service.port)
+        try:
+            status, health = await client.request('GET', '/health')
+            assert status == 200 and health['status'] == 'ok'
+
+            status, scored = await client.request('POST', '/score', sample_features)
+            assert status == 200
+            assert set(scored) == {'risk_score', 'alert_flag', 'risk_band', 'ood_flag', 'ood_features'}
+
+            transactions = sample_data[service.engine.features].to_dict(orient='records')
+            status, explained = await client.request('POST', '/explain', {'transactions': transactions})
+            assert status == 200
+            expected = service.engine.explain_batch(sample_data[service.engine.features])
+            np.testing.assert_allclose([r['risk_score'] for r in explained['results']], expected['risk_score'])
+            assert all(len(r['top_features']) == 5 for r in explained['results'])
+
+            status, error = await client.request('POST', '/score', {'transaction_amount': 1.0})
+            assert status == 400 and 'Missing required features' in error['error']
+            status, _ = await client.request('GET', '/nope')
+            assert status == 404
+
+            status, metrics = await client.request('GET', '/metrics')
+            assert status == 200
+            assert 'explainable_aml_stage_seconds{stage="predict",quantile="0.99"}' in metrics
+            assert 'explainable_aml_transactions_total' in metrics
+        finally:
+            await client.close()
+            await service.stop()
+
+    asyncio.run(scenario())
+
+def test_concurrent_requests_are_micro_batched(service_factory):
+    async def scenario():
+        service = service_factory(max_batch_size=16, max_wait_ms=20)
+        await service.start('127.0.0.1', 0)
+        try:
+            stats = await run_load('127.0.0.1', service.port, '/explain', n_requests=64, concurrency=16)
+        finally:
+            await service.stop()
+        return service, stats
+
+    service, stats = asyncio.run(scenario())
+    assert stats['requests'] == 64 and stats['errors'] == 0
+    assert service.explain_batcher.rows == 64
+    # Concurrent callers share batches instead of one engine call per request
+    assert service.explain_batcher.batches < 64
+
+def test_service_with_worker_pool(service_factory):
+    async def scenario():
+        service = service_factory(max_batch_size=8, max_wait_ms=5, n_workers=2)
+        await service.start('127.0.0.1', 0)
+        client = HttpClient('127.0.0.1', service.port)
+        try:
+            stats = await run_load('127.0.0.1', service.port, '/explain', n_requests=48, concurrency=12)
+            status, health = await client.request('GET', '/health')
+        finally:
+            await client.close()
+            await service.stop()
+        return stats, status, health
+
+    stats, status, health = asyncio.run(scenario())
+    assert stats['requests'] == 48 and stats['errors'] == 0
+    assert status == 200
+    assert len(health['workers']) == 2
+    assert sum(w['rows'] for w in health['workers']) == 48
+
+def test_health_does_not_run_drift_alerts(service_factory):
+    checks = []
+
+    async def scenario():
+        service = service_factory()
+        await service.start('127.0.0.1', 0)
+        service.engine.drift.check = lambda *args: checks.append(args)
+        try:
+            return await HttpClient('127.0.0.1', service.port).request('GET', '/health')
+        finally:
+            await service.stop()
+
+    status, health = asyncio.run(scenario())
+    assert status == 200
+    assert health['drift']['rows'] == 0
+    assert checks == []
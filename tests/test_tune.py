@@ -0,0 +1,44 @@
+import json
+import numpy as np
+from explainable_aml.model.tune import sample_configurations, tune_risk_model
+from explainable_aml.model.bundle import load_model_bundle
+from explainable_aml.config import CONFIG
+
+def test_sample_configurations():
+    space = {'max_depth': [3, 4, 6], 'learning_rate': [0.1, 0.3]}
+
+    configurations = sample_configurations(space, n_trials=4, seed=0)
+    assert len(configurations) == 4
+    assert len({tuple(sorted(c.items())) for c in configurations}) == 4
+    assert all(c['max_depth'] in space['max_depth'] for c in configurations)
+
+    # Asking for more trials than the grid has returns the whole grid
+    assert len(sample_configurations(space, n_trials=50)) == 6
+    assert sample_configurations(space, 4, seed=1) == sample_configurations(space, 4, seed=1)
+
+def test_tune_risk_model(temp_dir):
+    from explainable_aml.data.generate_data import generate_synthetic_data
+
+    data_path = temp_dir / "transactions.csv"
+    generate_synthetic_data(n_customers=300, seed=7).to_csv(data_path, index=False)
+    saved = CONFIG.get('tuning')
+    CONFIG['tuning'] = {**(saved or {}), 'min_rounds': 5, 'max_rounds': 45, 'early_stopping_rounds': 5}
+    try:
+        for n_workers in (1, 2):
+            model_path = temp_dir / f"model_{n_workers}"
+            summary = tune_risk_model(str(data_path), str(model_path), n_trials=6, n_workers=n_workers)
+
+            # 6 -> 2 -> 1 configurations over 5, 15 and 45 rounds
+            assert [r['rung'] for r in summary['leaderboard']].count(0) == 6
+            assert max(r['rung'] for r in summary['leaderboard']) == 2
+            assert 0 < summary['best_score'] <= 1
+
+            with open(model_path.parent / "tuning_results.json") as f:
+                assert json.load(f)['best_params'] == summary['best_params']
+
+            bundle = load_model_bundle(model_path)
+            assert bundle['model_params']['n_estimators'] == summary['best_iteration'] + 1
+            scores = bundle['model'].predict_proba(bundle['background'])[:, 1]
+            assert np.all((scores >= 0) & (scores <= 1))
+    finally:
+        CONFIG['tuning'] = saved
@@ -1,6 +1,10 @@
 import pytest
+import json
+import numpy as np
 from pathlib import Path
-from explainable_aml.utils.validation import validate_features, validate_file_exists
+from explainable_aml.utils.logging import AuditSink
+from explainable_aml.utils.audit_store import AuditStore, query_events
+from explainable_aml.utils.validation import validate_features, validate_file_exists, validate_model_bundle
 
 def test_validate_features():
     features = {'a': 1, 'b': 2}
@@ -17,3 +21,73 @@ def test_validate_file_exists(temp_dir):
     
     with pytest.raises(FileNotFoundError):
         validate_file_exists(temp_dir / "nonexistent.txt")
+
+def test_validate_bundle_manifest():
+    manifest = {
+        'format_version': 1,
+        'features': ['a', 'b'],
+        'threshold': 0.35,
+        'feature_ranges': {'a': {'min': 0, 'max': 1}},
+        'training_data_version': 'data_v1',
+        'trained_at': '2024-01-01T00:00:00',
+        'arrays': {'background': {'file': 'background.npy', 'dtype': 'float32', 'shape': [10, 2]}}
+    }
+    validate_model_bundle(manifest)  # Should pass
+
+    with pytest.raises(ValueError):
+        validate_model_bundle({**manifest, 'format_version': 99})
+
+    with pytest.raises(ValueError):
+        validate_model_bundle({k: v for k, v in manifest.items() if k != 'trained_at'})
+
+    with pytest.raises(ValueError):
+        validate_model_bundle({**manifest, 'arrays': {'background': {'file': 'background.npy', 'shape': [10, 3]}}})
+
+def _read_audit_entries(path):
+    with open(path) as f:
+        return [json.loads(line.split(' - INFO - ', 1)[1]) for line in f]
+
+def test_audit_sink_batches_and_flushes_on_close(temp_dir):
+    path = temp_dir / "audit.log"
+    sink = AuditSink(path=path, batch_size=3, flush_interval=0.05)
+
+    for i in range(7):
+        sink.emit('transaction_scored', {'risk_score': np.float32(0.5), 'alert_flag': np.bool_(i % 2), 'ood': np.array([i])})
+    sink.close()
+
+    entries = _read_audit_entries(path)
+    assert sink.written == len(entries) == 7
+    assert entries[0]['event_type'] == 'transaction_scored'
+    assert entries[1]['data'] == {'risk_score': 0.5, 'alert_flag': True, 'ood': [1]}
+
+@pytest.mark.parametrize("segmented", [False, True])
+def test_audit_sink_skips_only_unserializable_records(temp_dir, segmented):
+    store = AuditStore(temp_dir / "audit") if segmented else None
+    sink = AuditSink(path=temp_dir / "audit.log", batch_size=10, flush_interval=0.05, store=store)
+
+    data = {'x': 1}
+    sink.emit('event', data)
+    data['x'] = 2  # The sink keeps its own copy of the payload
+    sink.emit('event', {'x': object()})
+    sink.emit('event', {'x': 3})
+    sink.close()
+
+    entries = list(query_events(temp_dir / "audit")) if segmented else _read_audit_entries(temp_dir / "audit.log")
+    assert [e['data'] for e in entries] == [{'x': 1}, {'x': 3}]
+    assert sink.written == 2
+    assert sink.failed == 1
+
+def test_audit_sink_drop_policy(temp_dir):
+    sink = AuditSink(path=temp_dir / "audit.log", queue_size=1, flush_interval=0.01, overflow='drop')
+
+    # Hold the writer lock so the writer thread cannot drain the queue
+    with sink._lock:
+        for i in range(10):
+            sink.emit('transaction_scored', {'i': i})
+        assert sink.dropped >= 8
+    sink.close()
+
+    assert sink.written + sink.dropped == 10
+
+    with pytest.raises(ValueError):
+        AuditSink(path=temp_dir / "audit.log", overflow='ignore')
@@ -0,0 +1,78 @@
+import gc
+import os
+import signal
+import time
+import numpy as np
+import pytest
+from explainable_aml.explainability.engine import get_engine, clear_engines
+from explainable_aml.explainability.worker_pool import ScoringWorkerPool, WorkerCrashed
+
+@pytest.fixture
+def engine(trained_model_path, sample_data_path):
+    yield get_engine(trained_model_path, sample_data_path)
+    clear_engines()
+
+def test_map_returns_results_in_order(engine, sample_data):
+    X = sample_data[engine.features].to_numpy(dtype=np.float64)
+    batches = [X[i:i + 3] for i in range(0, len(X), 3)]
+
+    with ScoringWorkerPool(engine, n_workers=3) as pool:
+        results = list(pool.map(batches, 'explain_batch'))
+        health = pool.health()
+    # Drift counts from the workers are merged into the parent's monitor
+    assert engine.drift.metrics()['rows'] == len(X)
+
+    # Workers predict single-threaded, which can round the float32 scores differently in the last bit
+    expected = [engine.explain_batch(batch) for batch in batches]
+    for result, reference in zip(results, expected):
+        np.testing.assert_allclose(result['risk_score'], reference['risk_score'], rtol=1e-6)
+        np.testing.assert_allclose(result['top_contributions'], reference['top_contributions'])
+    assert len(health) == 3
+    assert sum(w['tasks'] for w in health) == len(batches)
+    assert sum(w['rows'] for w in health) == len(X)
+    assert all(w['alive'] and w['state'] == 'idle' and w['errors'] == 0 for w in health)
+
+def test_failed_batch_does_not_kill_worker(engine):
+    with ScoringWorkerPool(engine, n_workers=1) as pool:
+        with pytest.raises(RuntimeError, match="Expected a 2-D array"):
+            pool.submit(np.zeros((2, 3)), 'score_batch').result()
+        assert len(pool.submit(np.zeros((2, len(engine.features))), 'score_batch').result()['risk_score']) == 2
+        assert pool.health()[0]['errors'] == 1
+        with pytest.raises(ValueError):
+            pool.submit(np.zeros((1, len(engine.features))), 'explain')
+
+def test_dead_workers_are_replaced(engine, sample_data):
+    X = sample_data[engine.features].to_numpy(dtype=np.float64)
+
+    with ScoringWorkerPool(engine, n_workers=2, max_tasks_per_worker=2) as pool:
+        os.kill(pool.health()[0]['pid'], signal.SIGKILL)
+        deadline = time.monotonic() + 10
+        while pool.health()[0]['restarts'] == 0 and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert pool.health()[0]['restarts'] == 1
+        assert pool.health()[0]['alive']
+
+        # Workers are also recycled gracefully after max_tasks_per_worker batches
+        results = list(pool.map([X] * 8, 'score_batch'))
+        assert len(results) == 8
+        deadline = time.monotonic() + 10
+        while sum(w['restarts'] for w in pool.health()) < 4 and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert sum(w['restarts'] for w in pool.health()) >= 4
+
+def test_crash_fails_only_the_running_batch(engine):
+    big = np.tile(np.zeros((1, len(engine.features))), (400_000, 1))
+    with ScoringWorkerPool(engine, n_workers=1) as pool:
+        future = pool.submit(big, 'explain_batch')
+        deadline = time.monotonic() + 10
+        while pool.health()[0]['state'] != 'busy' and time.monotonic() < deadline:
+            time.sleep(0.01)
+        os.kill(pool.health()[0]['pid'], signal.SIGKILL)
+        with pytest.raises(WorkerCrashed):
+            future.result(timeout=30)
+        assert len(pool.submit(np.zeros((1, len(engine.features))), 'score_batch').result()['risk_score']) == 1
+
+
+def test_pool_leaves_parent_gc_unfrozen(engine):
+    with ScoringWorkerPool(engine, n_workers=2):
+        assert gc.get_freeze_count() == 0